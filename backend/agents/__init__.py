@@ -8,8 +8,12 @@ agents placed in separate modules.
 from .legacy import (
     validate_provider,
     extract_from_pdf,
+    extract_from_pdfs,
+    ocr_documents,
+    ocr_candidates,
     enrich_provider,
     qa_evaluate,
+    qa_evaluate_batch,
     apply_updates,
     _confidence_for_candidates,
 )
@@ -22,8 +26,12 @@ from .information_enrichment_agent import (
 __all__ = [
     "validate_provider",
     "extract_from_pdf",
+    "extract_from_pdfs",
+    "ocr_documents",
+    "ocr_candidates",
     "enrich_provider",
     "qa_evaluate",
+    "qa_evaluate_batch",
     "apply_updates",
     "_confidence_for_candidates",
     "DataValidationAgent",
@@ -8,40 +8,34 @@ matching, conflict reasoning, and unified confidence scoring.
 
 from __future__ import annotations
 
+import json
 import logging
 import os
-from dataclasses import dataclass, field
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, object_session
 
 from ..db import FieldConfidence, Provider
-from ..external.npi_client import fetch_npi_data
-from ..llm.gemini_client import call_gemini
+from ..external.nppes_ingest import lookup_local_npi
+from ..external.sources import (
+    ProviderSnapshot,
+    SourceAdapter,
+    get_fetcher,
+    registered_sources,
+    source_weight,
+)
+from ..llm.gemini_client import LLMUnavailableError, call_gemini, llm_available
+from ..utils.normalize import normalize_value
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on field groups packed into one batched reconciliation prompt.
+LLM_BATCH_MAX_ITEMS = int(os.getenv("LLM_BATCH_MAX_ITEMS", "60"))
 
-# ---------------------------------------------------------------------------
-# Lightweight directory loaders (used when real APIs are unavailable)
-# ---------------------------------------------------------------------------
-
-DATA_DIR = Path(__file__).resolve().parent.parent / "data"
-
-
-def _load_json(path: Path) -> Dict[str, Any]:
-    if not path.exists():
-        return {}
-    import json
-
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-MAPS_DIR = _load_json(DATA_DIR / "maps_directory.json")
-STATE_BOARD = _load_json(DATA_DIR / "state_board.json")
-HOSPITAL_DIR = _load_json(DATA_DIR / "hospital_directory.json")
+# Probability that a single source at score_hint 1.0 reports a correct value;
+# used to turn independent agreeing sources into a confidence (noisy-OR).
+AGREEMENT_SOURCE_RELIABILITY = 0.9
 
 
 # ---------------------------------------------------------------------------
@@ -72,30 +66,50 @@ class DataValidationAgent:
     the best value with a confidence score per field.
     """
 
-    def __init__(self, use_live_npi: bool = False):
+    def __init__(
+        self,
+        use_live_npi: bool = False,
+        use_local_nppes: Optional[bool] = None,
+        batch_reconcile: bool = False,
+        sources: Optional[List[str]] = None,
+    ):
         self.use_live_npi = use_live_npi
-        self.llm_enabled = bool(os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"))
+        self.batch_reconcile = batch_reconcile
+        if use_local_nppes is None:
+            use_local_nppes = os.getenv("USE_LOCAL_NPPES", "false").lower() == "true"
+        self.use_local_nppes = use_local_nppes
+        # Restrict to these registered source names (default: every enabled source).
+        self.source_names = sources
+        self.llm_enabled = llm_available()
+
+    def _source_adapters(self, provider: Provider) -> List[SourceAdapter]:
+        adapters = []
+        for adapter in registered_sources():
+            if self.source_names is not None:
+                enabled = adapter.name in self.source_names
+            else:
+                enabled = adapter.default_enabled or (
+                    adapter.name == "npi" and (self.use_live_npi or self.use_local_nppes)
+                )
+            if not enabled:
+                continue
+            if adapter.name == "npi" and self.use_local_nppes:
+                # The NPPES table lives in our own database; query it on the
+                # caller's session instead of the API.
+                session = object_session(provider)
+                adapter = replace(
+                    adapter,
+                    fetch=lambda snapshot: lookup_local_npi(session, snapshot.external_id),
+                    run_inline=True,
+                )
+            adapters.append(adapter)
+        return adapters
 
     def _fetch_sources(self, provider: Provider) -> Dict[str, Any]:
-        external_id = provider.external_id
-
-        npi_payload = fetch_npi_data(external_id) if self.use_live_npi else {}
-        board_payload = STATE_BOARD.get(external_id, {})
-        maps_payload = MAPS_DIR.get(external_id, {})
-        hospital_payload = HOSPITAL_DIR.get(external_id, {})
-
+        snapshot = ProviderSnapshot.from_provider(provider)
+        sources = get_fetcher().fetch_all(snapshot, self._source_adapters(provider))
         logger.info("Fetched external signals for provider %s", provider.id)
-        return {
-            "npi": npi_payload,
-            "state_board": board_payload,
-            "maps": maps_payload,
-            "hospital": hospital_payload,
-            "original": {
-                "phone": provider.phone,
-                "address": provider.address,
-                "specialty": provider.specialty,
-            },
-        }
+        return sources
 
     def _gather_candidates(self, provider: Provider, sources: Dict[str, Any]) -> Dict[str, List[Candidate]]:
         candidates: Dict[str, List[Candidate]] = {
@@ -104,14 +118,6 @@ class DataValidationAgent:
             "specialty": [],
         }
 
-        default_scores = {
-            "npi": 1.0,
-            "state_board": 0.9,
-            "hospital": 0.8,
-            "maps": 0.6,
-            "original": 0.4,
-        }
-
         for src, payload in sources.items():
             if not payload:
                 continue
@@ -119,12 +125,50 @@ class DataValidationAgent:
                 value = payload.get(field)
                 if value:
                     candidates[field].append(
-                        Candidate(value=value, source=src, score_hint=default_scores.get(src, 0.3))
+                        Candidate(value=value, source=src, score_hint=source_weight(src))
                     )
 
         logger.debug("Candidate aggregation complete for provider %s", provider.id)
         return candidates
 
+    @staticmethod
+    def _fallback_choice(candidates: List[Candidate]) -> Dict[str, Any]:
+        """Deterministic choice used whenever the LLM is unavailable or unparseable."""
+        top = max(candidates, key=lambda c: c.score_hint)
+        return {"value": top.value, "confidence": 0.6, "sources": [top.source]}
+
+    @staticmethod
+    def _resolve_locally(field_name: str, candidates: List[Candidate]) -> Optional[Dict[str, Any]]:
+        """
+        When every candidate normalizes to the same value (including a lone
+        candidate) there is no conflict to reason about: pick the most trusted
+        formatting and derive the confidence from how many independent sources
+        agree.
+        """
+        if not candidates:
+            return None
+        if len({normalize_value(field_name, c.value) for c in candidates}) != 1:
+            return None
+
+        doubt = 1.0
+        for c in candidates:
+            doubt *= 1.0 - AGREEMENT_SOURCE_RELIABILITY * min(1.0, c.score_hint)
+        top = max(candidates, key=lambda c: c.score_hint)
+        return {
+            "value": top.value,
+            "confidence": round(1.0 - doubt, 4),
+            "sources": [c.source for c in candidates],
+        }
+
+    @staticmethod
+    def _accept_llm_choice(parsed: Any, candidates: List[Candidate]) -> Optional[Dict[str, Any]]:
+        if not isinstance(parsed, dict) or "value" not in parsed:
+            return None
+        # Ensure sources list exists
+        parsed.setdefault("sources", [c.source for c in candidates])
+        parsed.setdefault("confidence", 0.5)
+        return parsed
+
     def get_best_value_with_llm(self, field_name: str, candidates: List[Candidate]) -> Optional[Dict[str, Any]]:
         """
         Use the LLM to pick the best candidate with fuzzy matching and reasoning.
@@ -133,10 +177,14 @@ class DataValidationAgent:
         if not candidates:
             return None
 
+        # Formatting-only differences are settled without the LLM.
+        local = self._resolve_locally(field_name, candidates)
+        if local:
+            return local
+
         # If no LLM key, fall back deterministically to top-scoring candidate.
         if not self.llm_enabled:
-            top = max(candidates, key=lambda c: c.score_hint)
-            return {"value": top.value, "confidence": 0.6, "sources": [top.source]}
+            return self._fallback_choice(candidates)
 
         # Prepare a prompt that instructs the LLM how to decide.
         prompt = f"""
@@ -155,44 +203,122 @@ Respond in JSON with keys: value, confidence, sources.
         try:
             llm_response = call_gemini(prompt)
         except Exception as exc:
-            # Silently fallback for quota errors to avoid log spam
-            from ..llm.gemini_client import QuotaExceededError
-            if not isinstance(exc, QuotaExceededError):
+            # Quota/circuit-open errors fall back silently to avoid log spam
+            if not isinstance(exc, LLMUnavailableError):
                 logger.warning("LLM call failed for field %s: %s", field_name, str(exc)[:100])
-            top = max(candidates, key=lambda c: c.score_hint)
-            return {"value": top.value, "confidence": 0.6, "sources": [top.source]}
+            return self._fallback_choice(candidates)
 
         # Basic safety parsing: expect a JSON-like response; if parsing fails, fallback.
-        import json
-
-        parsed = None
         try:
             parsed = json.loads(llm_response)
         except Exception:
             # If the model returned plain text, fallback to first candidate
             logger.warning("LLM response not JSON for field %s: %s", field_name, llm_response)
-            top = max(candidates, key=lambda c: c.score_hint)
-            return {"value": top.value, "confidence": 0.6, "sources": [top.source]}
+            return self._fallback_choice(candidates)
 
-        if not isinstance(parsed, dict) or "value" not in parsed:
-            top = max(candidates, key=lambda c: c.score_hint)
-            return {"value": top.value, "confidence": 0.6, "sources": [top.source]}
+        return self._accept_llm_choice(parsed, candidates) or self._fallback_choice(candidates)
 
-        # Ensure sources list exists
-        parsed.setdefault("sources", [c.source for c in candidates])
-        parsed.setdefault("confidence", 0.5)
-        return parsed
-
-    def validate_provider(self, db: Session, provider_id: int) -> ValidationResult:
+    def reconcile_batch(self, items: List[Tuple[str, str, List[Candidate]]]) -> Dict[str, Dict[str, Any]]:
         """
-        Main entry: fetch external signals, run LLM reasoning, persist confidence.
+        Reconcile many (item_id, field_name, candidates) groups with a single
+        LLM round-trip. Each item of the JSON array response is validated on
+        its own; missing or malformed items fall back to the score-hint choice.
         """
+        results: Dict[str, Dict[str, Any]] = {}
+        conflicts: List[Tuple[str, str, List[Candidate]]] = []
+        for item_id, field_name, cands in items:
+            if not cands:
+                continue
+            local = self._resolve_locally(field_name, cands)
+            if local:
+                results[item_id] = local
+            elif not self.llm_enabled:
+                results[item_id] = self._fallback_choice(cands)
+            else:
+                conflicts.append((item_id, field_name, cands))
+
+        # Only real conflicts are sent to the LLM.
+        items = conflicts
+        if not items:
+            return results
+
+        payload = [
+            {
+                "id": item_id,
+                "field": field_name,
+                "candidates": [{"value": c.value, "source": c.source, "score_hint": c.score_hint} for c in cands],
+            }
+            for item_id, field_name, cands in items
+        ]
+        prompt = f"""
+You are a healthcare data validation assistant.
+Reconcile each item below independently.
+Items: {json.dumps(payload, default=str)}
+
+Tasks for every item:
+- Normalize and compare values (fuzzy match addresses/phones/specialties).
+- Prefer sources with higher score_hint but reconcile conflicts logically.
+- Return the single best value and a confidence between 0 and 1.
+- Return the contributing sources list.
+
+Respond with a JSON array containing one object per item with keys: id, value, confidence, sources.
+"""
+        answers: Dict[str, Any] = {}
+        try:
+            llm_response = call_gemini(prompt)
+            cleaned = llm_response.replace("```json", "").replace("```", "").strip()
+            parsed = json.loads(cleaned)
+            if isinstance(parsed, dict) and len(items) == 1:
+                parsed = [dict(parsed, id=items[0][0])]
+            if isinstance(parsed, list):
+                answers = {str(a.get("id")): a for a in parsed if isinstance(a, dict)}
+            else:
+                logger.warning("Batched LLM response is not a JSON array (%s items)", len(items))
+        except Exception as exc:
+            if not isinstance(exc, LLMUnavailableError):
+                logger.warning("Batched LLM reconciliation failed for %s items: %s", len(items), str(exc)[:100])
+
+        for item_id, _, cands in items:
+            answer = answers.get(item_id)
+            if isinstance(answer, dict):
+                answer = {k: v for k, v in answer.items() if k != "id"}
+            results[item_id] = self._accept_llm_choice(answer, cands) or self._fallback_choice(cands)
+        return results
+
+    def _prepare(self, db: Session, provider_id: int) -> Tuple[Dict[str, Any], Dict[str, List[Candidate]]]:
         provider = db.get(Provider, provider_id)
         if not provider:
             raise ValueError(f"Provider {provider_id} not found")
 
         sources = self._fetch_sources(provider)
         candidates = self._gather_candidates(provider, sources)
+        return sources, candidates
+
+    @staticmethod
+    def _record(db: Session, provider_id: int, field_name: str, best: Dict[str, Any], validated_fields: Dict[str, Dict[str, Any]]) -> None:
+        validated_fields[field_name] = {
+            "value": best.get("value"),
+            "confidence": float(best.get("confidence", 0.0)),
+            "sources": best.get("sources", []),
+        }
+
+        db.add(
+            FieldConfidence(
+                provider_id=provider_id,
+                field_name=field_name,
+                confidence=float(best.get("confidence", 0.0)),
+                sources=best.get("sources", []),
+            )
+        )
+
+    def validate_provider(self, db: Session, provider_id: int) -> ValidationResult:
+        """
+        Main entry: fetch external signals, run LLM reasoning, persist confidence.
+        """
+        if self.batch_reconcile:
+            return self.validate_providers(db, [provider_id])[provider_id]
+
+        sources, candidates = self._prepare(db, provider_id)
 
         validated_fields: Dict[str, Dict[str, Any]] = {}
         raw_evidence: Dict[str, Any] = {"candidates": candidates, "sources": sources}
@@ -201,21 +327,7 @@ Respond in JSON with keys: value, confidence, sources.
             best = self.get_best_value_with_llm(field_name, field_candidates)
             if not best:
                 continue
-
-            validated_fields[field_name] = {
-                "value": best.get("value"),
-                "confidence": float(best.get("confidence", 0.0)),
-                "sources": best.get("sources", []),
-            }
-
-            db.add(
-                FieldConfidence(
-                    provider_id=provider_id,
-                    field_name=field_name,
-                    confidence=float(best.get("confidence", 0.0)),
-                    sources=best.get("sources", []),
-                )
-            )
+            self._record(db, provider_id, field_name, best, validated_fields)
 
         db.commit()
 
@@ -225,6 +337,46 @@ Respond in JSON with keys: value, confidence, sources.
             raw_evidence=raw_evidence,
         )
 
+    def validate_providers(
+        self,
+        db: Session,
+        provider_ids: List[int],
+        max_items_per_prompt: int = LLM_BATCH_MAX_ITEMS,
+    ) -> Dict[int, ValidationResult]:
+        """
+        Batched variant of `validate_provider`: every field of every provider
+        is packed into prompts of at most `max_items_per_prompt` items, so a
+        run needs a handful of LLM round-trips instead of one per field.
+        """
+        prepared = {pid: self._prepare(db, pid) for pid in provider_ids}
+
+        items: List[Tuple[str, str, List[Candidate]]] = []
+        for pid, (_, candidates) in prepared.items():
+            for field_name, field_candidates in candidates.items():
+                if field_candidates:
+                    items.append((f"{pid}:{field_name}", field_name, field_candidates))
+
+        choices: Dict[str, Dict[str, Any]] = {}
+        step = max(1, max_items_per_prompt)
+        for start in range(0, len(items), step):
+            choices.update(self.reconcile_batch(items[start:start + step]))
+
+        results: Dict[int, ValidationResult] = {}
+        for pid, (sources, candidates) in prepared.items():
+            validated_fields: Dict[str, Dict[str, Any]] = {}
+            for field_name in candidates:
+                best = choices.get(f"{pid}:{field_name}")
+                if best:
+                    self._record(db, pid, field_name, best, validated_fields)
+            results[pid] = ValidationResult(
+                provider_id=pid,
+                validated_fields=validated_fields,
+                raw_evidence={"candidates": candidates, "sources": sources},
+            )
+
+        db.commit()
+        return results
+
 
 __all__ = ["DataValidationAgent", "ValidationResult", "Candidate"]
 
@@ -8,7 +8,6 @@ and web-like sources, then normalizes the fields.
 from __future__ import annotations
 
 import logging
-import os
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List
@@ -16,7 +15,8 @@ from typing import Any, Dict, List
 from sqlalchemy.orm import Session
 
 from ..db import Provider
-from ..llm.gemini_client import call_gemini
+from ..external.source_store import get_store
+from ..llm.gemini_client import LLMUnavailableError, call_gemini, llm_available
 
 logger = logging.getLogger(__name__)
 
@@ -24,16 +24,7 @@ logger = logging.getLogger(__name__)
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
 
-def _load_json(path: Path) -> Dict[str, Any]:
-    if not path.exists():
-        return {}
-    import json
-
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-HOSPITAL_DIR = _load_json(DATA_DIR / "hospital_directory.json")
+HOSPITAL_DIR = get_store("hospital_directory.json", DATA_DIR)
 
 
 @dataclass
@@ -49,7 +40,7 @@ class InformationEnrichmentAgent:
     """
 
     def __init__(self):
-        self.llm_enabled = bool(os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"))
+        self.llm_enabled = llm_available()
 
     def _fallback_extract(self, snippets: List[str]) -> Dict[str, Any]:
         summary = " ".join(snippets)[:240] if snippets else ""
@@ -100,11 +91,13 @@ Keep empty lists/strings if not found.
             cleaned = response.replace("```json", "").replace("```", "").strip()
             parsed = json.loads(cleaned)
         except Exception as exc:
-            # Silently fallback for quota errors
-            from ..llm.gemini_client import QuotaExceededError
-            if not isinstance(exc, QuotaExceededError):
+            # Quota/circuit-open errors fall back silently
+            if not isinstance(exc, LLMUnavailableError):
                 logger.warning("LLM enrichment failed for provider %s: %s", provider.id, str(exc)[:100])
-            return self._fallback_extract(snippets)
+            extracted = self._fallback_extract(snippets)
+            # Flag the degraded result so it is not stored as a fresh LLM answer.
+            extracted["llm_fallback"] = True
+            return extracted
 
         if not isinstance(parsed, dict):
             return {}
@@ -123,6 +116,7 @@ Keep empty lists/strings if not found.
 
         snippets = self._fetch_directory_blurbs(provider)
         extracted = self._llm_structured_extract(provider, snippets)
+        llm_fallback = bool(extracted.pop("llm_fallback", False))
 
         enriched_fields: Dict[str, Any] = {}
         if extracted.get("certifications"):
@@ -139,6 +133,7 @@ Keep empty lists/strings if not found.
         raw_evidence = {
             "snippets": snippets,
             "llm_extracted": extracted,
+            "llm_fallback": llm_fallback,
         }
 
         logger.info("Enrichment complete for provider %s", provider.id)
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import logging
 import os
-import json
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
-import pytesseract
-from PIL import Image
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from ..external.npi_client import fetch_npi_data
+from ..external.npi_cache import cached_fetch_npi_data
+from ..external.npi_client import NpiLookupError
+from ..external.nppes_ingest import lookup_local_npi
+from ..external.source_store import get_store
+from ..ocr import content_hash, file_stat, get_ocr_pool, ocr_version
+from ..utils.normalize import normalize_value, values_agree
 from ..db import (
     Provider,
     Document,
@@ -18,6 +25,8 @@ from ..db import (
     ManualReviewItem,
 )
 
+logger = logging.getLogger(__name__)
+
 # -------------------------------------------------
 # Config / Data
 # -------------------------------------------------
@@ -27,20 +36,20 @@ DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 SOURCE_PRIORITY = ["npi", "state_board", "hospital", "maps", "original"]
 
 USE_REAL_NPI = os.getenv("USE_REAL_NPI", "false").lower() == "true"
+# Read NPI candidates from the locally ingested NPPES table instead of the API.
+USE_LOCAL_NPPES = os.getenv("USE_LOCAL_NPPES", "false").lower() == "true"
+# License fields parsed from OCR below this confidence are not offered to QA.
+OCR_MIN_FIELD_CONFIDENCE = float(os.getenv("OCR_MIN_FIELD_CONFIDENCE", "0.6"))
+# Parsed OCR field -> provider field it is a candidate for.
+OCR_QA_FIELDS = {"license_no": "license_no", "expiry_date": "license_expiry"}
 
 
-def _load_json(name: str) -> Any:
-    path = DATA_DIR / name
-    if not path.exists():
-        return {}
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-NPI_REGISTRY = _load_json("npi_registry.json")
-STATE_BOARD = _load_json("state_board.json")
-MAPS_DIR = _load_json("maps_directory.json")
-HOSPITAL_DIR = _load_json("hospital_directory.json")
+# Directory lookups go through the shared, lazily indexed source store so
+# every agent reads the same on-disk copy.
+NPI_REGISTRY = get_store("npi_registry.json", DATA_DIR)
+STATE_BOARD = get_store("state_board.json", DATA_DIR)
+MAPS_DIR = get_store("maps_directory.json", DATA_DIR)
+HOSPITAL_DIR = get_store("hospital_directory.json", DATA_DIR)
 
 
 # -------------------------------------------------
@@ -62,8 +71,14 @@ def validate_provider(db: Session, provider_id: int) -> Dict[str, Any]:
 
     external_id = provider.external_id
 
-    if USE_REAL_NPI and looks_like_npi(external_id):
-        npi = fetch_npi_data(external_id)
+    if USE_LOCAL_NPPES and looks_like_npi(external_id):
+        npi = lookup_local_npi(db, external_id)
+    elif USE_REAL_NPI and looks_like_npi(external_id):
+        try:
+            npi = cached_fetch_npi_data(external_id)
+        except NpiLookupError as exc:
+            logger.warning("%s", exc)
+            npi = {}
     else:
         npi = NPI_REGISTRY.get(external_id, {})
 
@@ -112,45 +127,142 @@ def validate_provider(db: Session, provider_id: int) -> Dict[str, Any]:
 # OCR
 # -------------------------------------------------
 
-def extract_from_pdf(db: Session, provider_id: int) -> Dict[str, Any]:
-    doc = (
+def _license_documents(db: Session, provider_ids: List[int]) -> Dict[int, Document]:
+    """The most recently added license document of each provider."""
+    docs: Dict[int, Document] = {}
+    rows = (
         db.query(Document)
-        .filter(Document.provider_id == provider_id, Document.doc_type == "license")
-        .first()
+        .filter(Document.provider_id.in_(provider_ids), Document.doc_type == "license")
+        .order_by(Document.id.desc())
     )
+    for doc in rows:
+        docs.setdefault(doc.provider_id, doc)
+    return docs
 
-    if not doc or not doc.path:
-        return {}
 
-    img_path = Path(doc.path)
-    if not img_path.exists():
-        return {}
+def _ocr_fields(doc: Document) -> Dict[str, Any]:
+    parsed = doc.ocr_fields or {}
+    return {
+        "license_no": parsed.get("license_no"),
+        "expiry_date": parsed.get("expiry_date"),
+        "name": parsed.get("name"),
+        "field_confidences": parsed.get("field_confidences", {}),
+        "ocr_confidence": doc.ocr_confidence,
+    }
 
-    image = Image.open(img_path)
 
-    try:
-        ocr_result = pytesseract.image_to_data(
-            image, output_type=pytesseract.Output.DICT
+def _stored_ocr_is_current(doc: Document, version: str, size: int, mtime: float) -> bool:
+    """True if doc's stored OCR came from this exact file under this OCR version.
+
+    Size and mtime are checked first; the file is only hashed when they
+    differ but could still hold the same bytes (a copy or a touch).
+    """
+    if doc.ocr_version != version or not doc.content_hash:
+        return False
+    if doc.file_size == size and doc.file_mtime == mtime:
+        return True
+    if doc.file_size == size and content_hash(doc.path) == doc.content_hash:
+        doc.file_mtime = mtime
+        return True
+    return False
+
+
+def _copy_ocr(source: Document, doc: Document) -> None:
+    doc.ocr_text, doc.ocr_confidence = source.ocr_text, source.ocr_confidence
+    doc.ocr_page, doc.ocr_page_confidences = source.ocr_page, source.ocr_page_confidences
+    doc.ocr_fields = source.ocr_fields
+    doc.content_hash, doc.ocr_version = source.content_hash, source.ocr_version
+
+
+def ocr_documents(db: Session, docs: List[Document]) -> Dict[int, Dict[str, Any]]:
+    """OCR documents on the OCR pool, by document id; the caller commits.
+
+    A document whose file and OCR version match its stored fingerprint keeps
+    its stored result. So does one whose content another document has
+    already OCRed under this version (the same scan filed for several
+    providers). Only the remaining documents go to Tesseract.
+    """
+    docs = [doc for doc in docs if doc.path and Path(doc.path).exists()]
+    if not docs:
+        return {}
+
+    version = ocr_version()
+    extracted: Dict[int, Dict[str, Any]] = {}
+    stale: List[Tuple[Document, int, float]] = []
+    for doc in docs:
+        size, mtime = file_stat(doc.path)
+        if _stored_ocr_is_current(doc, version, size, mtime):
+            extracted[doc.id] = _ocr_fields(doc)
+        else:
+            stale.append((doc, size, mtime))
+    if not stale:
+        return extracted
+
+    digests = {doc.path: content_hash(doc.path) for doc, _, _ in stale}
+    stale_ids = [doc.id for doc, _, _ in stale]
+    donors = {
+        donor.content_hash: donor
+        for donor in db.query(Document).filter(
+            Document.content_hash.in_(set(digests.values())),
+            Document.ocr_version == version,
+            Document.id.notin_(stale_ids),
         )
-        text = " ".join(ocr_result.get("text", []))
-        confidences = [
-            float(c) for c in ocr_result.get("conf", []) if c not in ("-1", -1)
-        ]
-        ocr_conf = sum(confidences) / len(confidences) / 100.0 if confidences else 0.0
-    except Exception:
-        text = "OCR Unavailable"
-        ocr_conf = 0.7
-
-    doc.ocr_text = text
-    doc.ocr_confidence = ocr_conf
+    }
+    to_ocr = []
+    for doc, size, mtime in stale:
+        doc.file_size, doc.file_mtime = size, mtime
+        donor = donors.get(digests[doc.path])
+        if donor is not None:
+            _copy_ocr(donor, doc)
+            extracted[doc.id] = _ocr_fields(doc)
+        else:
+            to_ocr.append(doc)
+
+    logger.info(
+        "OCR: %d document(s) to OCR, %d reused, %d unchanged",
+        len(to_ocr), len(stale) - len(to_ocr), len(docs) - len(stale),
+    )
+    results = get_ocr_pool().run_many(doc.path for doc in to_ocr) if to_ocr else {}
+    for doc in to_ocr:
+        result = results[doc.path]
+        if result.ok:
+            doc.ocr_text, doc.ocr_confidence = result.text, result.confidence
+            doc.ocr_page, doc.ocr_page_confidences = result.page, result.page_confidences
+            doc.ocr_fields = result.fields
+            doc.content_hash, doc.ocr_version = digests[doc.path], version
+        else:
+            logger.debug("OCR failed for %s: %s", doc.path, result.error)
+            doc.ocr_text = "OCR Unavailable"
+            doc.ocr_confidence = 0.7
+            doc.ocr_page, doc.ocr_page_confidences = None, None
+            doc.ocr_fields = None
+            # Leave the fingerprint unset so the next run tries again.
+            doc.content_hash, doc.ocr_version = None, None
+        extracted[doc.id] = _ocr_fields(doc)
+    return extracted
+
+
+def extract_from_pdfs(db: Session, provider_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """OCR the license documents of many providers at once, keyed by provider id."""
+    docs = _license_documents(db, provider_ids)
+    by_doc = ocr_documents(db, list(docs.values()))
     db.commit()
+    return {pid: by_doc[doc.id] for pid, doc in docs.items() if doc.id in by_doc}
 
-    return {
-        "license_no": None,
-        "expiry_date": None,
-        "name": None,
-        "ocr_confidence": ocr_conf,
-    }
+
+def extract_from_pdf(db: Session, provider_id: int) -> Dict[str, Any]:
+    return extract_from_pdfs(db, [provider_id]).get(provider_id, {})
+
+
+def ocr_candidates(ocr_data: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """QA candidates (source "ocr") for the license fields read confidently off the scan."""
+    confidences = ocr_data.get("field_confidences", {})
+    candidates: Dict[str, List[Dict[str, Any]]] = {}
+    for ocr_field, qa_field in OCR_QA_FIELDS.items():
+        value = ocr_data.get(ocr_field)
+        if value and confidences.get(ocr_field, 0.0) >= OCR_MIN_FIELD_CONFIDENCE:
+            candidates[qa_field] = [{"source": "ocr", "value": value}]
+    return candidates
 
 
 # -------------------------------------------------
@@ -179,31 +291,63 @@ def enrich_provider(
 # Confidence Engine (NO LLM)
 # -------------------------------------------------
 
-def _confidence_for_candidates(candidates: list) -> Dict[str, Any]:
+SOURCE_WEIGHTS = {
+    "npi": 1.0,
+    "state_board": 0.9,
+    "hospital": 0.7,
+    "maps": 0.5,
+    "original": 0.3,
+}
+DEFAULT_SOURCE_WEIGHT = 0.2
+
+# _MAX_POSSIBLE[n] == sum(sorted(weights, reverse=True)[:n]): the best score
+# n agreeing sources could reach. Accumulated in the same order as sum() so
+# the confidences are bit-for-bit identical to summing the slice per call.
+_SORTED_WEIGHTS = sorted(SOURCE_WEIGHTS.values(), reverse=True)
+_MAX_POSSIBLE = [1.0] + list(accumulate(_SORTED_WEIGHTS))
+
+QA_FIELDS = ["phone", "address", "specialty", "license_no", "license_expiry"]
+AUTO_UPDATE_THRESHOLD = 0.70  # >70% confidence for auto-update per requirements
+
+
+@lru_cache(maxsize=65536)
+def _cached_group_key(field: Optional[str], value: Any) -> Optional[str]:
+    return normalize_value(field, value)
+
+
+def _group_key(field: Optional[str], value: Any) -> Optional[str]:
+    # The same phone/address strings recur across sources and runs.
+    try:
+        return _cached_group_key(field, value)
+    except TypeError:  # unhashable value
+        return normalize_value(field, value)
+
+
+def _confidence_for_candidates(candidates: list, field: Optional[str] = None) -> Dict[str, Any]:
     if not candidates:
         return {"best": None, "confidence": 0.0, "sources": []}
 
-    scores = {
-        "npi": 1.0,
-        "state_board": 0.9,
-        "hospital": 0.7,
-        "maps": 0.5,
-        "original": 0.3,
-    }
-
     grouped: Dict[str, Dict[str, Any]] = {}
 
+    # Candidates vote by normalized value, so "(555) 123-4567" and
+    # "555-123-4567" agree; the group reports the raw value from its most
+    # trusted source.
     for c in candidates:
-        key = c["value"]
-        if key not in grouped:
-            grouped[key] = {"value": key, "sources": [], "score": 0.0}
-        grouped[key]["sources"].append(c["source"])
-        grouped[key]["score"] += scores.get(c["source"], 0.2)
+        key = _group_key(field, c["value"])
+        weight = SOURCE_WEIGHTS.get(c["source"], DEFAULT_SOURCE_WEIGHT)
+        group = grouped.get(key)
+        if group is None:
+            grouped[key] = {"value": c["value"], "sources": [c["source"]], "score": weight, "top": weight}
+            continue
+        if weight > group["top"]:
+            group["value"] = c["value"]
+            group["top"] = weight
+        group["sources"].append(c["source"])
+        group["score"] += weight
 
     best = max(grouped.values(), key=lambda x: x["score"])
-    max_possible = sum(
-        sorted(scores.values(), reverse=True)[: len(best["sources"])] or [1.0]
-    )
+    n = len(best["sources"])
+    max_possible = _MAX_POSSIBLE[min(n, len(_SORTED_WEIGHTS))]
     confidence = min(1.0, best["score"] / max_possible)
 
     return {
@@ -217,100 +361,132 @@ def _confidence_for_candidates(candidates: list) -> Dict[str, Any]:
 # QA Evaluation (LLM-FREE)
 # -------------------------------------------------
 
-def qa_evaluate(
-    db: Session,
-    provider_id: int,
-    external_data: Dict[str, Any],
-    enrichment: Dict[str, Any],
-):
-    provider = db.get(Provider, provider_id)
-    candidates = external_data.get("candidates", {}) if external_data else {}
-
-    decisions = {
-        "auto_updates": {},
-        "manual_reviews": [],
-        "explanation_inputs": {},  # 👈 store inputs, NOT LLM text
-    }
-
-    threshold = 0.70  # >70% confidence for auto-update per requirements
+@dataclass
+class QABatchResult:
+    decisions: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+    # Plain dicts for a single executemany insert into field_confidences.
+    confidence_rows: List[Dict[str, Any]] = field(default_factory=list)
+    manual_review_items: List[ManualReviewItem] = field(default_factory=list)
+
+
+def score_qa_batch(
+    providers: Dict[int, Provider],
+    items: List[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+) -> QABatchResult:
+    """
+    Score every (provider_id, external_data, enrichment) item without
+    touching the session. Decisions match what qa_evaluate produced per
+    provider; confidence rows and review items are returned for bulk writes.
+    """
+    result = QABatchResult()
+
+    for provider_id, external_data, enrichment in items:
+        provider = providers[provider_id]
+        candidates = external_data.get("candidates", {}) if external_data else {}
+
+        decisions = {
+            "auto_updates": {},
+            "manual_reviews": [],
+            "explanation_inputs": {},  # 👈 store inputs, NOT LLM text
+        }
 
-    for field in [
-        "phone",
-        "address",
-        "specialty",
-        "license_no",
-        "license_expiry",
-    ]:
-        field_candidates = candidates.get(field, [])
-        result = _confidence_for_candidates(field_candidates)
+        for field_name in QA_FIELDS:
+            field_candidates = candidates.get(field_name, [])
+            scored = _confidence_for_candidates(field_candidates, field_name)
 
-        best = result["best"]
-        conf = result["confidence"]
-        sources = result["sources"]
+            best = scored["best"]
+            conf = scored["confidence"]
 
-        db.add(
-            FieldConfidence(
-                provider_id=provider_id,
-                field_name=field,
-                confidence=conf,
-                sources=sources,
+            result.confidence_rows.append(
+                {
+                    "provider_id": provider_id,
+                    "field_name": field_name,
+                    "confidence": conf,
+                    "sources": scored["sources"],
+                }
             )
-        )
 
-        current_value = getattr(provider, field)
+            current_value = getattr(provider, field_name)
 
-        if best is None or best == current_value:
-            continue
+            # A formatting-only difference is not worth an update or a review.
+            if best is None or best == current_value or values_agree(field_name, best, current_value):
+                continue
 
-        explanation_payload = {
-            "field": field,
-            "current_value": current_value,
-            "candidates": field_candidates,
-            "chosen_value": best,
-            "confidence": conf,
-        }
-
-        if conf >= threshold:
-            decisions["auto_updates"][field] = {
-                "from": current_value,
-                "to": best,
+            explanation_payload = {
+                "field": field_name,
+                "current_value": current_value,
+                "candidates": field_candidates,
+                "chosen_value": best,
                 "confidence": conf,
             }
-            explanation_payload["decision"] = "auto_update"
-        else:
-            item = ManualReviewItem(
-                provider_id=provider_id,
-                field_name=field,
-                current_value=current_value,
-                suggested_value=best,
-                reason=f"low confidence ({conf:.2f})",
-            )
-            db.add(item)
-            decisions["manual_reviews"].append(item)
-            explanation_payload["decision"] = "manual_review"
-
-        decisions["explanation_inputs"][field] = explanation_payload
-
-    # Enrichment (still deterministic)
-    if enrichment.get("affiliations") and not provider.affiliations:
-        decisions["auto_updates"]["affiliations"] = {
-            "from": provider.affiliations,
-            "to": enrichment["affiliations"],
-            "confidence": 0.8,
-        }
-        decisions["explanation_inputs"]["affiliations"] = {
-            "field": "affiliations",
-            "current_value": provider.affiliations,
-            "candidates": [
-                {"source": "enrichment_agent", "value": enrichment["affiliations"]}
-            ],
-            "chosen_value": enrichment["affiliations"],
-            "confidence": 0.8,
-            "decision": "auto_update",
-        }
 
+            if conf >= AUTO_UPDATE_THRESHOLD:
+                decisions["auto_updates"][field_name] = {
+                    "from": current_value,
+                    "to": best,
+                    "confidence": conf,
+                }
+                explanation_payload["decision"] = "auto_update"
+            else:
+                item = ManualReviewItem(
+                    provider_id=provider_id,
+                    field_name=field_name,
+                    current_value=current_value,
+                    suggested_value=best,
+                    reason=f"low confidence ({conf:.2f})",
+                )
+                result.manual_review_items.append(item)
+                decisions["manual_reviews"].append(item)
+                explanation_payload["decision"] = "manual_review"
+
+            decisions["explanation_inputs"][field_name] = explanation_payload
+
+        # Enrichment (still deterministic)
+        if enrichment.get("affiliations") and not provider.affiliations:
+            decisions["auto_updates"]["affiliations"] = {
+                "from": provider.affiliations,
+                "to": enrichment["affiliations"],
+                "confidence": 0.8,
+            }
+            decisions["explanation_inputs"]["affiliations"] = {
+                "field": "affiliations",
+                "current_value": provider.affiliations,
+                "candidates": [
+                    {"source": "enrichment_agent", "value": enrichment["affiliations"]}
+                ],
+                "chosen_value": enrichment["affiliations"],
+                "confidence": 0.8,
+                "decision": "auto_update",
+            }
+
+        result.decisions[provider_id] = decisions
+
+    return result
+
+
+def qa_evaluate_batch(
+    db: Session,
+    items: List[Tuple[int, Dict[str, Any], Dict[str, Any]]],
+) -> Dict[int, Dict[str, Any]]:
+    """QA a whole run: one provider query, one FieldConfidence insert, one commit."""
+    ids = [provider_id for provider_id, _, _ in items]
+    providers = {p.id: p for p in db.query(Provider).filter(Provider.id.in_(ids))} if ids else {}
+
+    result = score_qa_batch(providers, items)
+    if result.confidence_rows:
+        db.execute(insert(FieldConfidence), result.confidence_rows)
+    db.add_all(result.manual_review_items)
     db.commit()
-    return decisions
+    return result.decisions
+
+
+def qa_evaluate(
+    db: Session,
+    provider_id: int,
+    external_data: Dict[str, Any],
+    enrichment: Dict[str, Any],
+):
+    return qa_evaluate_batch(db, [(provider_id, external_data, enrichment)])[provider_id]
 
 
 # -------------------------------------------------
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from pathlib import Path
 
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, JSON, create_engine
+from sqlalchemy import Column, Index, Integer, String, DateTime, Float, Boolean, ForeignKey, JSON, create_engine, inspect, text
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker, Session
 
 DB_PATH = Path(__file__).resolve().parent / "provider_directory.db"
@@ -23,11 +23,11 @@ class Provider(Base):
     name = Column(String, nullable=False)
     phone = Column(String)
     address = Column(String)
-    specialty = Column(String)
+    specialty = Column(String, index=True)
     license_no = Column(String)
     license_expiry = Column(String)
     affiliations = Column(String)
-    last_verified_at = Column(DateTime)
+    last_verified_at = Column(DateTime, index=True)
     last_changed_at = Column(DateTime)
 
     scores = relationship("ProviderScore", back_populates="provider", uselist=False)
@@ -43,6 +43,18 @@ class Document(Base):
     path = Column(String)
     ocr_text = Column(String)
     ocr_confidence = Column(Float)
+    # Page (1-based) the OCR text and confidence come from, and the
+    # confidence of every page scanned to find it.
+    ocr_page = Column(Integer)
+    ocr_page_confidences = Column(JSON)
+    # License fields parsed from that page (license_parser.LicenseFields.as_dict()).
+    ocr_fields = Column(JSON)
+    # Fingerprint of the file the stored OCR came from; OCR reruns only when
+    # the file or the OCR engine/config (ocr_version) changes.
+    content_hash = Column(String)
+    file_size = Column(Integer)
+    file_mtime = Column(Float)
+    ocr_version = Column(String)
 
 
 class ValidationRun(Base):
@@ -66,15 +78,19 @@ class ManualReviewItem(Base):
     current_value = Column(String)
     suggested_value = Column(String)
     reason = Column(String)
-    status = Column(String, default="pending")
+    status = Column(String, default="pending", index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Lease held by the reviewer who claimed the item; free once expired.
+    claimed_by = Column(String)
+    lease_token = Column(String, index=True)
+    lease_expires_at = Column(DateTime)
 
 
 class FieldConfidence(Base):
     __tablename__ = "field_confidence"
 
     id = Column(Integer, primary_key=True)
-    provider_id = Column(Integer, ForeignKey("providers.id"))
+    provider_id = Column(Integer, ForeignKey("providers.id"), index=True)
     field_name = Column(String)
     confidence = Column(Float)
     sources = Column(JSON)
@@ -99,6 +115,12 @@ class ProviderScore(Base):
 
     provider = relationship("Provider", back_populates="scores")
 
+    # Provider list pages sort by (pcs, provider_id), optionally within a band.
+    __table_args__ = (
+        Index("ix_provider_scores_pcs_provider", "pcs", "provider_id"),
+        Index("ix_provider_scores_band_pcs_provider", "band", "pcs", "provider_id"),
+    )
+
 
 class DriftScore(Base):
     __tablename__ = "drift_scores"
@@ -111,12 +133,17 @@ class DriftScore(Base):
 
     provider = relationship("Provider", back_populates="drift")
 
+    __table_args__ = (
+        Index("ix_drift_scores_score_provider", "score", "provider_id"),
+        Index("ix_drift_scores_bucket_score_provider", "bucket", "score", "provider_id"),
+    )
+
 
 class AuditLog(Base):
     __tablename__ = "audit_log"
 
     id = Column(Integer, primary_key=True)
-    provider_id = Column(Integer, ForeignKey("providers.id"))
+    provider_id = Column(Integer, ForeignKey("providers.id"), index=True)
     field_name = Column(String)
     old_value = Column(String)
     new_value = Column(String)
@@ -125,8 +152,105 @@ class AuditLog(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 
+class NppesRecord(Base):
+    """Flattened NPPES dissemination row, one per NPI, for offline NPI lookups."""
+
+    __tablename__ = "nppes_records"
+
+    npi = Column(String, primary_key=True)
+    entity_type = Column(String)
+    phone = Column(String)
+    address = Column(String)
+    specialty = Column(String)
+    taxonomy_code = Column(String)
+    license_no = Column(String)
+    deactivated = Column(Boolean, default=False)
+    source_file = Column(String)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class DuplicateCluster(Base):
+    """Providers the entity-resolution job believes are the same clinician."""
+
+    __tablename__ = "duplicate_clusters"
+
+    id = Column(Integer, primary_key=True)
+    score = Column(Float)  # weakest link: lowest best-match score among members
+    size = Column(Integer)
+    reasons = Column(JSON)  # matched signals, e.g. ["name", "phone"]
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    members = relationship("DuplicateClusterMember", back_populates="cluster", cascade="all, delete-orphan")
+
+
+class DuplicateClusterMember(Base):
+    __tablename__ = "duplicate_cluster_members"
+
+    id = Column(Integer, primary_key=True)
+    cluster_id = Column(Integer, ForeignKey("duplicate_clusters.id"), index=True)
+    provider_id = Column(Integer, ForeignKey("providers.id"), index=True)
+    score = Column(Float)  # best pair score against another member
+
+    cluster = relationship("DuplicateCluster", back_populates="members")
+
+
+class ProviderEnrichment(Base):
+    """Last enrichment output per provider, so detail views need no LLM call."""
+
+    __tablename__ = "provider_enrichments"
+
+    id = Column(Integer, primary_key=True)
+    provider_id = Column(Integer, ForeignKey("providers.id"), unique=True, index=True)
+    fields = Column(JSON)  # summary, certifications, affiliations, education, secondary_specialties
+    # Hash of the inputs the fields were produced from; a mismatch means stale.
+    fingerprint = Column(String)
+    refreshed_at = Column(DateTime)
+
+
+class StatsSnapshot(Base):
+    """Dashboard/report aggregates, recomputed after runs and review actions (single row)."""
+
+    __tablename__ = "stats_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    computed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    latest_run = Column(JSON)
+    trend = Column(JSON)  # last runs, oldest first
+    scored_providers = Column(Integer, default=0)
+    avg_pcs = Column(Float)
+    pcs_distribution = Column(JSON)
+    drift_distribution = Column(JSON)
+    pending_reviews = Column(Integer, default=0)
+    document_count = Column(Integer, default=0)
+    avg_ocr_confidence = Column(Float)
+
+
+def _add_missing_columns() -> None:
+    # create_all() does not alter existing tables; add nullable columns that
+    # were introduced after a database file was created.
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable and not column.primary_key:
+                    col_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {col_type}'))
+
+
+def _add_missing_indexes() -> None:
+    # Likewise for indexes declared after a table was created.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _add_missing_indexes()
 
 
 def get_db():
@@ -0,0 +1,282 @@
+"""
+Duplicate-provider detection (entity resolution).
+
+Comparing every pair of providers is quadratic, so each provider is first
+assigned blocking keys — NPI digits, license number, normalized phone,
+phonetic name (Soundex of the surname + first initial) and address word
+n-grams — and only providers sharing a key are compared. Blocks larger than
+`DEDUP_MAX_BLOCK_SIZE` (a shared switchboard number, a common street) carry
+little signal and are skipped. Pairs scoring at least `DEDUP_MIN_SCORE` are
+joined into clusters with union-find and written to `duplicate_clusters`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from .db import DuplicateCluster, DuplicateClusterMember, Provider
+from .utils.normalize import normalize_address, normalize_value
+
+logger = logging.getLogger(__name__)
+
+DEDUP_MAX_BLOCK_SIZE = int(os.getenv("DEDUP_MAX_BLOCK_SIZE", "50"))
+DEDUP_MIN_SCORE = float(os.getenv("DEDUP_MIN_SCORE", "0.6"))
+ADDRESS_NGRAM = 3
+
+# Signal weights; a pair's score is their sum, capped at 1. Name + phone or
+# name + address clears the default threshold, while a shared phone and
+# address alone (colleagues in one practice) does not.
+MATCH_WEIGHTS = {"license": 0.3, "name": 0.4, "phone": 0.25, "address": 0.2}
+NPI_MATCH_SCORE = 0.95
+
+_NAME_TITLES = {"DR", "DOCTOR", "MR", "MRS", "MS", "PROF"}
+_NAME_SUFFIXES = {"MD", "DO", "NP", "PA", "RN", "PHD", "MBBS", "DDS", "JR", "SR", "II", "III"}
+_NAME_TOKEN = re.compile(r"[A-Z]+")
+_NON_ALNUM = re.compile(r"[^A-Z0-9]")
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+
+def soundex(word: str) -> str:
+    """American Soundex code (e.g. Robert/Rupert -> R163)."""
+    word = "".join(ch for ch in word.upper() if ch.isalpha())
+    if not word:
+        return ""
+    code = word[0]
+    previous = _SOUNDEX_CODES.get(word[0])
+    for ch in word[1:]:
+        digit = _SOUNDEX_CODES.get(ch)
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "HW":
+            # H and W do not separate letters with the same code.
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def name_tokens(name: Optional[str]) -> List[str]:
+    """Given names then surname, without titles/credentials ("Verma, Rohan MD" -> [ROHAN, VERMA])."""
+    if not name:
+        return []
+    parts = [p for p in str(name).upper().split(",")]
+    tokens_by_part = [[t for t in _NAME_TOKEN.findall(p) if t not in _NAME_TITLES | _NAME_SUFFIXES] for p in parts]
+    tokens_by_part = [t for t in tokens_by_part if t]
+    if len(tokens_by_part) >= 2:
+        # "Surname, Given" ordering.
+        return tokens_by_part[1] + tokens_by_part[0]
+    return tokens_by_part[0] if tokens_by_part else []
+
+
+def npi_key(external_id: Optional[str]) -> Optional[str]:
+    digits = re.sub(r"\D", "", str(external_id or ""))
+    return digits if len(digits) == 10 else None
+
+
+def license_key(license_no: Optional[str]) -> Optional[str]:
+    key = _NON_ALNUM.sub("", str(license_no or "").upper())
+    return key or None
+
+
+@dataclass
+class ProviderRecord:
+    id: int
+    npi: Optional[str]
+    license: Optional[str]
+    name: List[str]
+    phone: Optional[str]
+    address: Optional[str]
+
+    @classmethod
+    def from_provider(cls, p: Provider) -> "ProviderRecord":
+        return cls(
+            id=p.id,
+            npi=npi_key(p.external_id),
+            license=license_key(p.license_no),
+            name=name_tokens(p.name),
+            phone=normalize_value("phone", p.phone) if p.phone else None,
+            address=normalize_address(p.address),
+        )
+
+    def blocking_keys(self) -> Set[str]:
+        keys: Set[str] = set()
+        if self.npi:
+            keys.add(f"npi:{self.npi}")
+        if self.license:
+            keys.add(f"license:{self.license}")
+        if self.phone:
+            keys.add(f"phone:{self.phone}")
+        if self.name:
+            keys.add(f"name:{soundex(self.name[-1])}{self.name[0][0]}")
+        if self.address:
+            words = self.address.split()
+            for i in range(max(1, len(words) - ADDRESS_NGRAM + 1)):
+                keys.add("addr:" + " ".join(words[i : i + ADDRESS_NGRAM]))
+        return keys
+
+
+def score_pair(a: ProviderRecord, b: ProviderRecord) -> Tuple[float, List[str]]:
+    """Match score in [0, 1] and the signals that contributed."""
+    if a.npi and a.npi == b.npi:
+        return NPI_MATCH_SCORE, ["npi"]
+
+    score = 0.0
+    reasons: List[str] = []
+    if a.license and a.license == b.license:
+        score += MATCH_WEIGHTS["license"]
+        reasons.append("license")
+    if a.name and b.name:
+        similarity = SequenceMatcher(None, " ".join(a.name), " ".join(b.name)).ratio()
+        if similarity >= 0.85:
+            score += MATCH_WEIGHTS["name"] * similarity
+            reasons.append("name")
+    if a.phone and a.phone == b.phone:
+        score += MATCH_WEIGHTS["phone"]
+        reasons.append("phone")
+    if a.address and b.address:
+        wa, wb = set(a.address.split()), set(b.address.split())
+        overlap = len(wa & wb) / len(wa | wb)
+        if overlap >= 0.6:
+            score += MATCH_WEIGHTS["address"] * overlap
+            reasons.append("address")
+    return min(1.0, round(score, 4)), reasons
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+@dataclass
+class Cluster:
+    provider_ids: List[int]
+    member_scores: Dict[int, float]
+    reasons: List[str]
+    score: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.score = min(self.member_scores.values())
+
+
+def build_blocks(records: Iterable[ProviderRecord]) -> Dict[str, List[int]]:
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for record in records:
+        for key in record.blocking_keys():
+            blocks[key].append(record.id)
+    return blocks
+
+
+def find_duplicate_clusters(
+    records: List[ProviderRecord],
+    max_block_size: int = DEDUP_MAX_BLOCK_SIZE,
+    min_score: float = DEDUP_MIN_SCORE,
+) -> Tuple[List[Cluster], Dict[str, int]]:
+    by_id = {r.id: r for r in records}
+    blocks = build_blocks(records)
+
+    pairs: Set[Tuple[int, int]] = set()
+    oversized = 0
+    for key, ids in blocks.items():
+        if len(ids) < 2:
+            continue
+        if len(ids) > max_block_size and not key.startswith("npi:"):
+            oversized += 1
+            continue
+        pairs.update(combinations(sorted(ids), 2))
+
+    uf = _UnionFind()
+    best: Dict[int, float] = {}
+    reasons: Dict[int, Set[str]] = defaultdict(set)
+    for a, b in pairs:
+        score, why = score_pair(by_id[a], by_id[b])
+        if score < min_score:
+            continue
+        uf.union(a, b)
+        for pid in (a, b):
+            best[pid] = max(best.get(pid, 0.0), score)
+            reasons[pid].update(why)
+
+    grouped: Dict[int, List[int]] = defaultdict(list)
+    for pid in best:
+        grouped[uf.find(pid)].append(pid)
+    clusters = [
+        Cluster(
+            provider_ids=sorted(ids),
+            member_scores={pid: best[pid] for pid in ids},
+            reasons=sorted(set().union(*(reasons[pid] for pid in ids))),
+        )
+        for ids in grouped.values()
+    ]
+    clusters.sort(key=lambda c: (-c.score, c.provider_ids[0]))
+
+    stats = {
+        "providers": len(records),
+        "blocks": sum(1 for ids in blocks.values() if len(ids) >= 2),
+        "oversized_blocks": oversized,
+        "pairs_compared": len(pairs),
+        "clusters": len(clusters),
+    }
+    return clusters, stats
+
+
+def detect_duplicates(
+    db: Session,
+    max_block_size: int = DEDUP_MAX_BLOCK_SIZE,
+    min_score: float = DEDUP_MIN_SCORE,
+) -> Dict[str, int]:
+    """Rebuild the duplicate_clusters table from the current providers."""
+    rows = db.query(
+        Provider.id, Provider.external_id, Provider.name, Provider.phone, Provider.address, Provider.license_no
+    ).yield_per(5_000)
+    records = [ProviderRecord.from_provider(row) for row in rows]
+    clusters, stats = find_duplicate_clusters(records, max_block_size, min_score)
+
+    db.query(DuplicateClusterMember).delete()
+    db.query(DuplicateCluster).delete()
+    for cluster in clusters:
+        db.add(
+            DuplicateCluster(
+                score=cluster.score,
+                size=len(cluster.provider_ids),
+                reasons=cluster.reasons,
+                members=[
+                    DuplicateClusterMember(provider_id=pid, score=cluster.member_scores[pid])
+                    for pid in cluster.provider_ids
+                ],
+            )
+        )
+    db.commit()
+    logger.info("Duplicate detection: %s", stats)
+    return stats
+
+
+__all__ = ["detect_duplicates", "find_duplicate_clusters", "score_pair", "soundex", "ProviderRecord"]
@@ -0,0 +1,192 @@
+"""
+Content-addressed store for uploaded provider documents.
+
+Uploads are streamed to a temporary file in fixed-size chunks while being
+hashed, then moved to `<store>/<sha256[:2]>/<sha256[2:4]>/<sha256><ext>`.
+A file whose hash is already stored is dropped, so a license resubmitted by
+many provider offices takes disk space once. The file type is sniffed from
+the first bytes rather than trusted from the client.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Callable, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from .agents import ocr_documents
+from .db import Document, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_STORE_DIR = Path(os.getenv("DOCUMENT_STORE_DIR", str(Path(__file__).resolve().parent / "data" / ".store")))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+WRITE_CHUNK = 1 << 20
+
+# Leading bytes -> stored extension. Only formats the OCR pipeline reads.
+_SIGNATURES = [
+    (b"%PDF-", ".pdf"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"II*\x00", ".tiff"),
+    (b"MM\x00*", ".tiff"),
+]
+_SNIFF_BYTES = max(len(sig) for sig, _ in _SIGNATURES)
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class UnsupportedDocumentType(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredFile:
+    path: Path
+    content_hash: str
+    size: int
+    created: bool  # False if identical content was already stored
+
+
+def sniff_extension(head: bytes) -> Optional[str]:
+    for signature, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+def content_path(content_hash: str, extension: str, root: Optional[Path] = None) -> Path:
+    root = root or DOCUMENT_STORE_DIR
+    return root / content_hash[:2] / content_hash[2:4] / f"{content_hash}{extension}"
+
+
+def _open_temp(tmp_dir: Path) -> Tuple[BinaryIO, str]:
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+    return os.fdopen(fd, "wb"), tmp_name
+
+
+def _write(fh: BinaryIO, digest: Any, data: bytes) -> None:
+    digest.update(data)
+    fh.write(data)
+
+
+def _commit_file(tmp_name: str, content_hash: str, extension: str, size: int, root: Path) -> StoredFile:
+    final = content_path(content_hash, extension, root)
+    if final.exists():
+        os.unlink(tmp_name)
+        return StoredFile(final, content_hash, size, created=False)
+    final.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp_name, final)
+    return StoredFile(final, content_hash, size, created=True)
+
+
+def _discard(tmp_name: str) -> None:
+    if os.path.exists(tmp_name):
+        os.unlink(tmp_name)
+
+
+async def store_stream(
+    chunks: AsyncIterator[bytes],
+    max_bytes: Optional[int] = None,
+    root: Optional[Path] = None,
+) -> StoredFile:
+    """Write an async byte stream into the store without holding it in memory.
+
+    Hashing and file I/O run in the threadpool, one `WRITE_CHUNK` at a time,
+    so a large upload does not stall the event loop.
+    """
+    root = root or DOCUMENT_STORE_DIR
+    max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    buffer = bytearray()
+    fh, tmp_name = await run_in_threadpool(_open_temp, root / "tmp")
+    try:
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+                if len(head) < _SNIFF_BYTES:
+                    head += chunk[: _SNIFF_BYTES - len(head)]
+                buffer += chunk
+                if len(buffer) >= WRITE_CHUNK:
+                    data, buffer = bytes(buffer), bytearray()
+                    await run_in_threadpool(_write, fh, digest, data)
+            await run_in_threadpool(_write, fh, digest, bytes(buffer))
+        finally:
+            await run_in_threadpool(fh.close)
+
+        extension = sniff_extension(head)
+        if extension is None:
+            raise UnsupportedDocumentType("expected a PDF, PNG, JPEG or TIFF document")
+
+        stored = await run_in_threadpool(_commit_file, tmp_name, digest.hexdigest(), extension, size, root)
+        tmp_name = None
+        return stored
+    finally:
+        if tmp_name is not None:
+            await run_in_threadpool(_discard, tmp_name)
+
+
+def attach_document(db: Session, provider_id: int, doc_type: str, stored: StoredFile) -> Tuple[Document, bool]:
+    """Link a stored file to a provider; resubmitting the same file is a no-op.
+
+    Returns the document and whether it was newly created.
+    """
+    path = str(stored.path)
+    existing = (
+        db.query(Document)
+        .filter(Document.provider_id == provider_id, Document.doc_type == doc_type, Document.path == path)
+        .order_by(Document.id.desc())
+        .first()
+    )
+    if existing is not None:
+        return existing, False
+    doc = Document(provider_id=provider_id, doc_type=doc_type, path=path)
+    db.add(doc)
+    db.commit()
+    db.refresh(doc)
+    return doc, True
+
+
+def ocr_in_background(document_id: int, session_factory: Optional[Callable[[], Session]] = None) -> None:
+    """Background task body: OCR one uploaded document on its own session."""
+    db = (session_factory or SessionLocal)()
+    try:
+        doc = db.get(Document, document_id)
+        if doc is not None:
+            ocr_documents(db, [doc])
+            db.commit()
+    except Exception as exc:
+        logger.warning("Background OCR failed for document %s: %s", document_id, exc)
+        db.rollback()
+    finally:
+        db.close()
+
+
+__all__ = [
+    "DOCUMENT_STORE_DIR",
+    "StoredFile",
+    "UploadTooLarge",
+    "UnsupportedDocumentType",
+    "sniff_extension",
+    "content_path",
+    "store_stream",
+    "attach_document",
+    "ocr_in_background",
+]
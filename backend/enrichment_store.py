@@ -0,0 +1,152 @@
+"""
+Persisted provider enrichment.
+
+Enrichment can mean a live LLM call, so its output is stored per provider in
+`provider_enrichments` together with when it was produced and a fingerprint
+of its inputs (name, specialty, directory snippets and whether the LLM was
+used). Detail views read the stored row and queue a background refresh when
+it is older than `ENRICHMENT_TTL_HOURS` or its inputs have changed; batch
+runs store the enrichment they compute anyway.
+
+When the LLM is enabled but the call failed (quota, open circuit), the agent
+returns its deterministic fallback flagged as such. That result never
+replaces a stored row, and for a provider without one it is stored with the
+fingerprint of a non-LLM run, so it reads as stale and is retried.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from .agents.information_enrichment_agent import EnrichmentResult, InformationEnrichmentAgent
+from .db import Provider, ProviderEnrichment, SessionLocal
+from .search import index_providers
+
+logger = logging.getLogger(__name__)
+
+ENRICHMENT_TTL = timedelta(hours=float(os.getenv("ENRICHMENT_TTL_HOURS", "24")))
+ENRICHMENT_FIELDS = ["summary", "certifications", "affiliations", "education", "secondary_specialties"]
+
+_in_flight: Set[int] = set()
+_in_flight_lock = threading.Lock()
+
+
+def enrichment_fingerprint(provider: Provider, snippets: List[str], llm_enabled: bool) -> str:
+    payload = json.dumps(
+        {"name": provider.name, "specialty": provider.specialty, "snippets": snippets, "llm": llm_enabled},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def current_fingerprint(provider: Provider, agent: Optional[InformationEnrichmentAgent] = None) -> str:
+    """Fingerprint of the inputs enrichment would use right now (local lookups only)."""
+    agent = agent or InformationEnrichmentAgent()
+    return enrichment_fingerprint(provider, agent._fetch_directory_blurbs(provider), agent.llm_enabled)
+
+
+def is_stale(row: Optional[ProviderEnrichment], fingerprint: str, now: Optional[datetime] = None) -> bool:
+    if row is None or row.refreshed_at is None or row.fingerprint != fingerprint:
+        return True
+    now = now or datetime.now(timezone.utc)
+    return now - row.refreshed_at.replace(tzinfo=timezone.utc) > ENRICHMENT_TTL
+
+
+def save_enrichments(
+    db: Session,
+    results: Iterable[Tuple[Provider, EnrichmentResult]],
+    llm_enabled: bool,
+) -> List[ProviderEnrichment]:
+    """Upsert enrichment results (one lookup query); the caller commits.
+
+    LLM fallback results are only stored for providers without a row, and as stale.
+    """
+    results = list(results)
+    ids = [provider.id for provider, _ in results]
+    existing = (
+        {row.provider_id: row for row in db.query(ProviderEnrichment).filter(ProviderEnrichment.provider_id.in_(ids))}
+        if ids
+        else {}
+    )
+    now = datetime.now(timezone.utc)
+    rows = []
+    for provider, result in results:
+        row = existing.get(provider.id)
+        fallback = llm_enabled and result.raw_evidence.get("llm_fallback", False)
+        if row is None:
+            row = ProviderEnrichment(provider_id=provider.id)
+            db.add(row)
+        elif fallback:
+            rows.append(row)
+            continue
+        row.fields = {key: result.enriched_fields.get(key) for key in ENRICHMENT_FIELDS}
+        row.fingerprint = enrichment_fingerprint(
+            provider, result.raw_evidence.get("snippets", []), llm_enabled and not fallback
+        )
+        row.refreshed_at = now
+        rows.append(row)
+    return rows
+
+
+def refresh_enrichment(
+    db: Session, provider_id: int, agent: Optional[InformationEnrichmentAgent] = None
+) -> ProviderEnrichment:
+    agent = agent or InformationEnrichmentAgent()
+    result = agent.enrich_provider(db, provider_id)
+    [row] = save_enrichments(db, [(db.get(Provider, provider_id), result)], agent.llm_enabled)
+    db.flush()
+    index_providers(db, [provider_id])
+    db.commit()
+    return row
+
+
+def claim_refresh(provider_id: int) -> bool:
+    """Mark a refresh as queued; False if one is already queued or running."""
+    with _in_flight_lock:
+        if provider_id in _in_flight:
+            return False
+        _in_flight.add(provider_id)
+        return True
+
+
+def refresh_in_background(provider_id: int, session_factory: Optional[Callable[[], Session]] = None) -> None:
+    """Background task body: refresh one provider on its own session."""
+    db = (session_factory or SessionLocal)()
+    try:
+        refresh_enrichment(db, provider_id)
+    except Exception as exc:
+        logger.warning("Background enrichment refresh failed for provider %s: %s", provider_id, exc)
+        db.rollback()
+    finally:
+        db.close()
+        with _in_flight_lock:
+            _in_flight.discard(provider_id)
+
+
+def enrichment_payload(row: Optional[ProviderEnrichment], stale: bool) -> Dict[str, Any]:
+    fields = (row.fields or {}) if row else {}
+    payload: Dict[str, Any] = {key: fields.get(key) for key in ENRICHMENT_FIELDS}
+    payload["refreshed_at"] = row.refreshed_at if row else None
+    payload["stale"] = stale
+    return payload
+
+
+__all__ = [
+    "ENRICHMENT_TTL",
+    "enrichment_fingerprint",
+    "current_fingerprint",
+    "is_stale",
+    "save_enrichments",
+    "refresh_enrichment",
+    "claim_refresh",
+    "refresh_in_background",
+    "enrichment_payload",
+]
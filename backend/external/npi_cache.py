@@ -0,0 +1,202 @@
+"""
+Persistent TTL cache in front of the NPI Registry.
+
+Entries are stored in a small SQLite file keyed by NPI number, so lookups made
+by yesterday's batch are still warm today and shared across workers.
+
+- Fresh entries (younger than the TTL) are served directly.
+- Stale entries (within the stale window) are served immediately while a
+  background refresh fetches a new copy (stale-while-revalidate). If the
+  registry is down, stale data keeps being served.
+- "Not found" answers are cached with a shorter TTL; invalid numbers never
+  reach the network.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from backend.utils.npi import is_valid_npi
+
+from .npi_client import NpiLookupError, fetch_npi_data
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CACHE_DIR = Path(os.getenv("CACHE_DIR", str(DATA_DIR / ".cache")))
+NPI_CACHE_PATH = Path(os.getenv("NPI_CACHE_PATH", str(CACHE_DIR / "npi_cache.sqlite")))
+
+NPI_CACHE_TTL = float(os.getenv("NPI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+NPI_CACHE_NEGATIVE_TTL = float(os.getenv("NPI_CACHE_NEGATIVE_TTL_SECONDS", str(24 * 3600)))
+NPI_CACHE_STALE_TTL = float(os.getenv("NPI_CACHE_STALE_TTL_SECONDS", str(30 * 24 * 3600)))
+NPI_CACHE_REFRESH_WORKERS = int(os.getenv("NPI_CACHE_REFRESH_WORKERS", "4"))
+
+COUNTERS = ("hits", "stale_hits", "negative_hits", "misses", "invalid", "refreshes", "errors")
+
+
+class NpiCache:
+    def __init__(
+        self,
+        path: Path = NPI_CACHE_PATH,
+        ttl: float = NPI_CACHE_TTL,
+        negative_ttl: float = NPI_CACHE_NEGATIVE_TTL,
+        stale_ttl: float = NPI_CACHE_STALE_TTL,
+        fetcher: Callable[[str], Dict[str, Any]] = fetch_npi_data,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.fetcher = fetcher
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._counters = {name: 0 for name in COUNTERS}
+        self._refreshing: Set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS npi_cache ("
+            " npi TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " found INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    # -- storage -------------------------------------------------------------
+
+    def _read(self, npi: str) -> Optional[Tuple[Dict[str, Any], bool, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, found, fetched_at FROM npi_cache WHERE npi = ?", (npi,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), bool(row[1]), row[2]
+
+    def _write(self, npi: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO npi_cache (npi, payload, found, fetched_at) VALUES (?, ?, ?, ?)",
+                (npi, json.dumps(payload), int(bool(payload)), self.clock()),
+            )
+            self._conn.commit()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    # -- fetching ------------------------------------------------------------
+
+    def _fetch_and_store(self, npi: str) -> Dict[str, Any]:
+        payload = self.fetcher(npi)
+        self._write(npi, payload)
+        return payload
+
+    def _background_refresh(self, npi: str) -> None:
+        try:
+            self._fetch_and_store(npi)
+            self._count("refreshes")
+        except NpiLookupError as exc:
+            self._count("errors")
+            logger.info("Background NPI refresh failed, keeping stale entry: %s", exc)
+        finally:
+            with self._lock:
+                self._refreshing.discard(npi)
+
+    def _schedule_refresh(self, npi: str) -> None:
+        with self._lock:
+            if npi in self._refreshing:
+                return
+            self._refreshing.add(npi)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=NPI_CACHE_REFRESH_WORKERS, thread_name_prefix="npi-refresh"
+                )
+            executor = self._executor
+        executor.submit(self._background_refresh, npi)
+
+    def get(self, npi: str) -> Dict[str, Any]:
+        """
+        Same contract as `fetch_npi_data`: `{}` for invalid/unknown numbers,
+        `NpiLookupError` only when the registry fails and nothing is cached.
+        """
+        if not is_valid_npi(npi):
+            self._count("invalid")
+            return {}
+
+        cached = self._read(npi)
+        if cached is not None:
+            payload, found, fetched_at = cached
+            age = self.clock() - fetched_at
+            ttl = self.ttl if found else self.negative_ttl
+            if age < ttl:
+                self._count("hits" if found else "negative_hits")
+                return payload
+            if age < ttl + self.stale_ttl:
+                self._count("stale_hits")
+                self._schedule_refresh(npi)
+                return payload
+
+        self._count("misses")
+        try:
+            return self._fetch_and_store(npi)
+        except NpiLookupError:
+            self._count("errors")
+            if cached is not None:
+                # Stale-if-error: an old answer beats no answer.
+                return cached[0]
+            raise
+
+    def invalidate(self, npi: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM npi_cache WHERE npi = ?", (npi,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = self._conn.execute("SELECT COUNT(*) FROM npi_cache").fetchone()[0]
+        served = counters["hits"] + counters["stale_hits"] + counters["negative_hits"]
+        lookups = served + counters["misses"]
+        counters["entries"] = entries
+        counters["hit_rate"] = served / lookups if lookups else 0.0
+        return counters
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+_cache: Optional[NpiCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_npi_cache() -> NpiCache:
+    """Return the process-wide NPI cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = NpiCache()
+        return _cache
+
+
+def cached_fetch_npi_data(npi_number: str) -> Dict[str, Any]:
+    """Drop-in replacement for `fetch_npi_data` that goes through the shared cache."""
+    return get_npi_cache().get(npi_number)
+
+
+__all__ = ["NpiCache", "get_npi_cache", "cached_fetch_npi_data"]
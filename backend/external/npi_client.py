@@ -1,9 +1,50 @@
+"""
+Client for the CMS NPI Registry API v2.1.
+
+`NpiClient` keeps a pooled keep-alive session, caps the number of in-flight
+requests and retries 429/5xx responses with jittered exponential backoff.
+`AsyncNpiClient` offers the same behaviour for concurrent lookups.
+
+Lookups return `{}` when the number is invalid or the registry has no record
+for it, and raise `NpiLookupError` when the registry could not answer, so
+callers can tell "not found" apart from "failed".
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Union
+
+import httpx
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+
 from backend.utils.npi import is_valid_npi
 
-NPI_API_URL = "https://npiregistry.cms.hhs.gov/api/"
-TIMEOUT = 5
+logger = logging.getLogger(__name__)
+
+NPI_API_URL = os.getenv("NPI_API_URL", "https://npiregistry.cms.hhs.gov/api/")
+TIMEOUT = float(os.getenv("NPI_TIMEOUT", "5"))
+MAX_IN_FLIGHT = int(os.getenv("NPI_MAX_IN_FLIGHT", "8"))
+MAX_RETRIES = int(os.getenv("NPI_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("NPI_BACKOFF_BASE", "0.25"))
+BACKOFF_CAP = float(os.getenv("NPI_BACKOFF_CAP", "8"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class NpiLookupError(RuntimeError):
+    """The registry could not be reached or kept failing (not the same as "not found")."""
+
+    def __init__(self, npi_number: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"NPI lookup failed for {npi_number}: {message}")
+        self.npi_number = npi_number
+        self.status_code = status_code
 
 
 def _pick_primary_address(addresses: list) -> Optional[dict]:
@@ -28,31 +69,8 @@ def _pick_primary_taxonomy(taxonomies: list) -> Optional[dict]:
     return taxonomies[0]
 
 
-def fetch_npi_data(npi_number: str) -> Dict[str, Any]:
-    """
-    Fetch provider data from CMS NPI Registry API v2.1
-    """
-    if not is_valid_npi(npi_number):
-        return {}
-    params = {
-        "number": npi_number,
-        "version": "2.1",
-        "limit": 1,
-    }
-
-    try:
-        resp = requests.get(NPI_API_URL, params=params, timeout=TIMEOUT)
-        resp.raise_for_status()
-        payload = resp.json()
-    except Exception:
-        return {}
-
-    results = payload.get("results", [])
-    if not results:
-        return {}
-
-    provider = results[0]
-
+def _parse_result(provider: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten one registry result into the candidate fields used by validation."""
     # Address
     addr = _pick_primary_address(provider.get("addresses", []))
     phone = addr.get("telephone_number") if addr else None
@@ -80,3 +98,181 @@ def fetch_npi_data(npi_number: str) -> Dict[str, Any]:
         # IMPORTANT: NPI DOES NOT PROVIDE LICENSE EXPIRY
         "license_expiry": None,
     }
+
+
+def _parse_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    results = payload.get("results", []) if isinstance(payload, dict) else []
+    if not results:
+        return {}
+    return _parse_result(results[0])
+
+
+def _params(npi_number: str) -> Dict[str, str]:
+    return {
+        "number": npi_number,
+        "version": "2.1",
+        "limit": "1",
+    }
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, never shorter than a server Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, BACKOFF_CAP))
+    return delay
+
+
+class NpiClient:
+    """Thread-safe, pooled NPI Registry client."""
+
+    def __init__(
+        self,
+        base_url: str = NPI_API_URL,
+        timeout: float = TIMEOUT,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def lookup(self, npi_number: str) -> Dict[str, Any]:
+        if not is_valid_npi(npi_number):
+            return {}
+
+        last_error = "no attempts made"
+        status_code = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                with self._slots:
+                    resp = self.session.get(self.base_url, params=_params(npi_number), timeout=self.timeout)
+                status_code = resp.status_code
+                if status_code in RETRY_STATUSES:
+                    last_error = f"HTTP {status_code}"
+                    retry_after = _retry_after_seconds(resp.headers.get("Retry-After"))
+                else:
+                    resp.raise_for_status()
+                    return _parse_payload(resp.json())
+            except requests.HTTPError as exc:
+                # 4xx other than 429 will not get better on retry.
+                raise NpiLookupError(npi_number, str(exc), status_code) from exc
+            except (requests.RequestException, ValueError) as exc:
+                last_error = f"{type(exc).__name__}: {exc}"
+                status_code = None
+
+            if attempt < self.max_retries:
+                delay = _backoff_delay(attempt, retry_after)
+                logger.debug("Retrying NPI %s in %.2fs after %s", npi_number, delay, last_error)
+                time.sleep(delay)
+
+        raise NpiLookupError(npi_number, last_error, status_code)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncNpiClient:
+    """asyncio variant of `NpiClient` for fanning out many lookups at once."""
+
+    def __init__(
+        self,
+        base_url: str = NPI_API_URL,
+        timeout: float = TIMEOUT,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight),
+        )
+
+    async def lookup(self, npi_number: str) -> Dict[str, Any]:
+        if not is_valid_npi(npi_number):
+            return {}
+
+        last_error = "no attempts made"
+        status_code = None
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self._slots:
+                    resp = await self._client.get(self.base_url, params=_params(npi_number))
+                status_code = resp.status_code
+                if status_code in RETRY_STATUSES:
+                    last_error = f"HTTP {status_code}"
+                    retry_after = _retry_after_seconds(resp.headers.get("Retry-After"))
+                else:
+                    resp.raise_for_status()
+                    return _parse_payload(resp.json())
+            except httpx.HTTPStatusError as exc:
+                raise NpiLookupError(npi_number, str(exc), status_code) from exc
+            except (httpx.HTTPError, ValueError) as exc:
+                last_error = f"{type(exc).__name__}: {exc}"
+                status_code = None
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(_backoff_delay(attempt, retry_after))
+
+        raise NpiLookupError(npi_number, last_error, status_code)
+
+    async def lookup_many(self, npi_numbers: Iterable[str]) -> Dict[str, Union[Dict[str, Any], NpiLookupError]]:
+        """Look up many NPIs concurrently; failures are returned, not raised."""
+        numbers = list(dict.fromkeys(npi_numbers))
+        results = await asyncio.gather(*(self.lookup(n) for n in numbers), return_exceptions=True)
+        out: Dict[str, Union[Dict[str, Any], NpiLookupError]] = {}
+        for number, result in zip(numbers, results):
+            if isinstance(result, BaseException) and not isinstance(result, NpiLookupError):
+                result = NpiLookupError(number, f"{type(result).__name__}: {result}")
+            out[number] = result
+        return out
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncNpiClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+
+_client: Optional[NpiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> NpiClient:
+    """Return the process-wide pooled client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NpiClient()
+        return _client
+
+
+def fetch_npi_data(npi_number: str) -> Dict[str, Any]:
+    """
+    Fetch provider data from CMS NPI Registry API v2.1
+
+    Returns `{}` for invalid or unknown numbers; raises `NpiLookupError` when
+    the registry is unreachable or keeps failing after retries.
+    """
+    return get_client().lookup(npi_number)
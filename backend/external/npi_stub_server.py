@@ -0,0 +1,196 @@
+"""
+Local stand-in for the CMS NPI Registry API, for offline development and
+load-testing `npi_client`.
+
+Answers `GET /api/?number=...&version=2.1` with registry-shaped JSON. Records
+come from `data/npi_registry.json` when the number is listed there and are
+otherwise synthesized deterministically from the number. Latency, error and
+not-found rates are configurable:
+
+    python -m backend.external.npi_stub_server --port 8765 --latency-ms 40 --error-rate 0.05
+    NPI_API_URL=http://127.0.0.1:8765/api/ USE_REAL_NPI=true uvicorn backend.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from backend.utils.npi import is_valid_npi
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+SPECIALTIES = ["Cardiology", "Dermatology", "Pediatrics", "Internal Medicine", "Family Medicine", "Neurology"]
+CITIES = [("Springfield", "IL", "62701"), ("Columbus", "OH", "43004"), ("Austin", "TX", "73301"), ("Denver", "CO", "80014")]
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0          # fraction of requests answered with 503
+    throttle_rate: float = 0.0       # fraction answered with 429 + Retry-After
+    not_found_rate: float = 0.0      # fraction of synthetic numbers with no record
+    failing: Set[str] = field(default_factory=set)  # numbers always answered with 500
+    fixture: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+
+def _load_fixture() -> Dict[str, Dict[str, Any]]:
+    path = DATA_DIR / "npi_registry.json"
+    if not path.exists():
+        return {}
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _result_from_fixture(number: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "number": number,
+        "addresses": [
+            {
+                "address_purpose": "LOCATION",
+                "address_1": entry.get("address"),
+                "telephone_number": entry.get("phone"),
+            }
+        ],
+        "taxonomies": [
+            {"desc": entry.get("specialty"), "license": entry.get("license_no"), "primary": True}
+        ],
+    }
+
+
+def _synthetic_result(number: str, not_found_rate: float) -> Optional[Dict[str, Any]]:
+    digest = int(hashlib.sha256(number.encode()).hexdigest(), 16)
+    if (digest % 10_000) / 10_000 < not_found_rate:
+        return None
+    city, state, postal = CITIES[digest % len(CITIES)]
+    return {
+        "number": number,
+        "addresses": [
+            {
+                "address_purpose": "MAILING",
+                "address_1": f"PO Box {digest % 9000 + 100}",
+                "city": city,
+                "state": state,
+                "postal_code": postal,
+            },
+            {
+                "address_purpose": "LOCATION",
+                "address_1": f"{digest % 9000 + 100} Main St",
+                "city": city,
+                "state": state,
+                "postal_code": postal,
+                "telephone_number": f"{200 + digest % 700:03d}-555-{digest % 10_000:04d}",
+            },
+        ],
+        "taxonomies": [
+            {"desc": SPECIALTIES[digest % len(SPECIALTIES)], "license": f"{state}{digest % 1_000_000:06d}", "primary": True}
+        ],
+    }
+
+
+def make_handler(config: StubConfig):
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            pass
+
+        def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self) -> None:  # noqa: N802
+            with rng_lock:
+                delay = max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms))
+                roll = rng.random()
+            if delay:
+                time.sleep(delay / 1000.0)
+
+            if roll < config.error_rate:
+                self._send(503, {"Errors": [{"description": "Service unavailable (injected)"}]})
+                return
+            if roll < config.error_rate + config.throttle_rate:
+                self._send(429, {"Errors": [{"description": "Too many requests (injected)"}]}, {"Retry-After": "0"})
+                return
+
+            query = parse_qs(urlparse(self.path).query)
+            number = (query.get("number") or [""])[0]
+            if not is_valid_npi(number):
+                self._send(200, {"Errors": [{"description": "Invalid NPI number", "field": "number"}]})
+                return
+
+            if number in config.failing:
+                self._send(500, {"Errors": [{"description": "Internal error (injected)"}]})
+                return
+            if number in config.fixture:
+                result = _result_from_fixture(number, config.fixture[number])
+            else:
+                result = _synthetic_result(number, config.not_found_rate)
+            results = [result] if result else []
+            self._send(200, {"result_count": len(results), "results": results})
+
+    return Handler
+
+
+def start_stub_server(config: Optional[StubConfig] = None, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub in a daemon thread. Returns the server and its API base URL."""
+    server = ThreadingHTTPServer((host, port), make_handler(config or StubConfig()))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}/api/"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline NPI Registry stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        not_found_rate=args.not_found_rate,
+        fixture=_load_fixture(),
+        seed=args.seed,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    print(f"NPI stub listening on http://{args.host}:{args.port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Streaming ingester for the CMS NPPES dissemination files.
+
+Parses the monthly full file and the weekly incremental files (CSV, or the
+ZIP archives CMS publishes) row by row and upserts them in chunks into the
+`nppes_records` table. Primary address and taxonomy are chosen with the same
+rules the live registry client uses, so local and live lookups agree.
+
+    python -m backend.external.nppes_ingest npidata_pfile_20240101-20240107.csv
+    python -m backend.external.nppes_ingest NPPES_Data_Dissemination_May_2024.zip --taxonomy nucc_taxonomy.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import logging
+import sys
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from sqlalchemy import case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ..db import NppesRecord
+from ..utils.npi import is_valid_npi
+from .npi_client import _parse_result
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 5000
+MAX_TAXONOMIES = 15
+
+# NPPES rows can carry very long free-text fields.
+FIELD_SIZE_LIMIT = min(sys.maxsize, 2 ** 31 - 1)
+
+_ADDRESS_COLUMNS = {
+    "LOCATION": "Provider {line} Line Business Practice Location Address",
+    "MAILING": "Provider {line} Line Business Mailing Address",
+}
+_ADDRESS_PARTS = {
+    "LOCATION": "Provider Business Practice Location Address {part}",
+    "MAILING": "Provider Business Mailing Address {part}",
+}
+
+
+@contextmanager
+def open_nppes_file(path: Path) -> Iterator[TextIO]:
+    """Open a dissemination CSV, or the data CSV inside a CMS ZIP archive."""
+    path = Path(path)
+    if path.suffix.lower() != ".zip":
+        with path.open("r", encoding="utf-8", newline="") as f:
+            yield f
+        return
+
+    with zipfile.ZipFile(path) as archive:
+        members = [
+            n for n in archive.namelist()
+            if n.lower().startswith("npidata_pfile") and n.lower().endswith(".csv") and "fileheader" not in n.lower()
+        ]
+        if not members:
+            raise ValueError(f"{path}: no npidata_pfile CSV found in archive")
+        with archive.open(members[0]) as raw:
+            yield io.TextIOWrapper(raw, encoding="utf-8", newline="")
+
+
+def load_taxonomy_descriptions(path: Path) -> Dict[str, str]:
+    """Read the NUCC taxonomy CSV into a code -> display name map."""
+    descriptions: Dict[str, str] = {}
+    with Path(path).open("r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            code = (row.get("Code") or "").strip()
+            if code:
+                descriptions[code] = (row.get("Display Name") or row.get("Classification") or code).strip()
+    return descriptions
+
+
+def _address(row: Dict[str, str], purpose: str) -> Optional[Dict[str, Any]]:
+    line1 = row.get(_ADDRESS_COLUMNS[purpose].format(line="First"))
+    if not line1:
+        return None
+    part = _ADDRESS_PARTS[purpose]
+    return {
+        "address_purpose": purpose,
+        "address_1": line1,
+        "address_2": row.get(_ADDRESS_COLUMNS[purpose].format(line="Second")),
+        "city": row.get(part.format(part="City Name")),
+        "state": row.get(part.format(part="State Name")),
+        "postal_code": row.get(part.format(part="Postal Code")),
+        "telephone_number": row.get(part.format(part="Telephone Number")) or None,
+    }
+
+
+def _taxonomies(row: Dict[str, str], descriptions: Dict[str, str]) -> List[Dict[str, Any]]:
+    taxonomies = []
+    for i in range(1, MAX_TAXONOMIES + 1):
+        code = row.get(f"Healthcare Provider Taxonomy Code_{i}")
+        if not code:
+            continue
+        taxonomies.append(
+            {
+                "code": code,
+                "desc": descriptions.get(code, code),
+                "license": row.get(f"Provider License Number_{i}") or None,
+                "state": row.get(f"Provider License Number State Code_{i}") or None,
+                "primary": row.get(f"Healthcare Provider Primary Taxonomy Switch_{i}") == "Y",
+            }
+        )
+    return taxonomies
+
+
+def record_from_row(row: Dict[str, str], descriptions: Optional[Dict[str, str]] = None, source_file: str = "") -> Optional[Dict[str, Any]]:
+    """Map one dissemination row to an `nppes_records` row (None if unusable)."""
+    npi = (row.get("NPI") or "").strip()
+    if not is_valid_npi(npi):
+        return None
+
+    # The registry API lists the practice location before the mailing address.
+    addresses = [a for a in (_address(row, "LOCATION"), _address(row, "MAILING")) if a]
+    taxonomies = _taxonomies(row, descriptions or {})
+    parsed = _parse_result({"addresses": addresses, "taxonomies": taxonomies})
+
+    primary = next((t for t in taxonomies if t["primary"]), taxonomies[0] if taxonomies else None)
+    deactivated = bool(row.get("NPI Deactivation Date")) and not row.get("NPI Reactivation Date")
+
+    return {
+        "npi": npi,
+        "entity_type": row.get("Entity Type Code") or None,
+        "phone": parsed["phone"],
+        "address": parsed["address"],
+        "specialty": parsed["specialty"],
+        "taxonomy_code": primary["code"] if primary else None,
+        "license_no": parsed["license_no"],
+        "deactivated": deactivated,
+        "source_file": source_file,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+def _upsert(db: Session, rows: List[Dict[str, Any]], keep_specialty: bool = False) -> None:
+    stmt = sqlite_insert(NppesRecord)
+    set_ = {c.name: stmt.excluded[c.name] for c in NppesRecord.__table__.columns if c.name != "npi"}
+    if keep_specialty:
+        # Without taxonomy descriptions the specialty is the raw code; keep the
+        # stored display name unless the primary taxonomy itself changed.
+        set_["specialty"] = case(
+            (NppesRecord.taxonomy_code == stmt.excluded.taxonomy_code, NppesRecord.specialty),
+            else_=stmt.excluded.specialty,
+        )
+    stmt = stmt.on_conflict_do_update(index_elements=[NppesRecord.npi], set_=set_)
+    db.execute(stmt, rows)
+    db.commit()
+
+
+def ingest_nppes_file(
+    db: Session,
+    path: Path,
+    descriptions: Optional[Dict[str, str]] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Dict[str, int]:
+    """
+    Stream one full or incremental dissemination file into `nppes_records`.
+    Incremental files simply upsert over earlier rows for the same NPI.
+    Without `descriptions`, stored specialties are kept for NPIs whose
+    primary taxonomy did not change.
+    """
+    path = Path(path)
+    stats = {"rows": 0, "upserted": 0, "skipped": 0}
+    started = time.perf_counter()
+    chunk: List[Dict[str, Any]] = []
+    keep_specialty = not descriptions
+
+    previous_limit = csv.field_size_limit(FIELD_SIZE_LIMIT)
+    try:
+        with open_nppes_file(path) as f:
+            for row in csv.DictReader(f):
+                stats["rows"] += 1
+                record = record_from_row(row, descriptions, path.name)
+                if record is None:
+                    stats["skipped"] += 1
+                    continue
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    _upsert(db, chunk, keep_specialty)
+                    stats["upserted"] += len(chunk)
+                    chunk = []
+    finally:
+        csv.field_size_limit(previous_limit)
+    if chunk:
+        _upsert(db, chunk, keep_specialty)
+        stats["upserted"] += len(chunk)
+
+    logger.info("Ingested %s in %.1fs: %s", path.name, time.perf_counter() - started, stats)
+    return stats
+
+
+def lookup_local_npi(db: Session, npi_number: str) -> Dict[str, Any]:
+    """
+    Read an NPI from the local NPPES table in the same shape as
+    `fetch_npi_data`. Unknown or deactivated numbers return `{}`.
+    """
+    if not is_valid_npi(npi_number):
+        return {}
+    record = db.get(NppesRecord, npi_number)
+    if record is None or record.deactivated:
+        return {}
+    return {
+        "phone": record.phone,
+        "address": record.address,
+        "specialty": record.specialty,
+        "license_no": record.license_no,
+        # NPPES does not carry license expiry either.
+        "license_expiry": None,
+    }
+
+
+def main() -> None:
+    from ..db import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description="Ingest NPPES dissemination files into the local NPI table")
+    parser.add_argument("files", nargs="+", help="Full or weekly incremental files (.csv or .zip), oldest first")
+    parser.add_argument("--taxonomy", type=str, help="NUCC taxonomy CSV for specialty display names")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    init_db()
+    descriptions = load_taxonomy_descriptions(Path(args.taxonomy)) if args.taxonomy else {}
+    db = SessionLocal()
+    try:
+        for name in args.files:
+            stats = ingest_nppes_file(db, Path(name), descriptions, args.chunk_size)
+            print(f"{name}: {stats}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
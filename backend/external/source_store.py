@@ -0,0 +1,307 @@
+"""
+Shared, lazily built, indexed store for the external source directories
+(state board, maps, hospital directory, NPI fixture).
+
+Each JSON directory is streamed once into a compact SQLite key index next to
+the data files; every agent then reads through the same process-wide store
+instead of holding its own parsed copy of the file. Indexes are versioned by
+the source file's size and mtime, so dropping in a new file triggers an
+atomic rebuild-and-swap on the next lookup; reload listeners are told about
+each swap so data derived from the file can be refreshed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+INDEX_DIR = Path(os.getenv("SOURCE_INDEX_DIR", str(DATA_DIR / ".index")))
+
+# How often (seconds) a store re-stats its source file to look for changes.
+RELOAD_CHECK_INTERVAL = float(os.getenv("SOURCE_RELOAD_CHECK_INTERVAL", "5"))
+
+READ_CHUNK = 1 << 20
+INSERT_BATCH = 5000
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_object(path: Path, chunk_size: int = READ_CHUNK) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the (key, value) pairs of a top-level JSON object without loading
+    the whole document. Memory is bounded by the largest single entry.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_ws() -> None:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return
+
+        def decode() -> Any:
+            nonlocal pos
+            while True:
+                try:
+                    value, end = _decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not fill():
+                        raise
+                    continue
+                # A number at the end of the buffer may be truncated.
+                if end == len(buf) and not eof and fill():
+                    continue
+                pos = end
+                return value
+
+        def expect(char: str) -> None:
+            nonlocal pos
+            skip_ws()
+            if pos >= len(buf) or buf[pos] != char:
+                raise ValueError(f"{path}: expected {char!r} at offset {pos}")
+            pos += 1
+
+        fill()
+        expect("{")
+        skip_ws()
+        if pos < len(buf) and buf[pos] == "}":
+            return
+        while True:
+            skip_ws()
+            key = decode()
+            expect(":")
+            skip_ws()
+            value = decode()
+            yield str(key), value
+            skip_ws()
+            if pos < len(buf) and buf[pos] == ",":
+                pos += 1
+                continue
+            expect("}")
+            return
+
+
+def _fingerprint(path: Path) -> Optional[str]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return f"{st.st_size}-{st.st_mtime_ns}"
+
+
+class SourceStore:
+    """
+    Read-only key -> record lookup over one external source directory.
+
+    Behaves like the dict it replaces (`store.get(external_id, {})`), but the
+    data lives in an on-disk SQLite index shared by every agent and worker.
+    """
+
+    def __init__(self, source_path: Path, index_dir: Path = INDEX_DIR):
+        self.source_path = Path(source_path)
+        self.index_dir = Path(index_dir)
+        self.name = self.source_path.stem
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._index_path: Optional[Path] = None
+        self._fingerprint: Optional[str] = None
+        self._generation = 0
+        self._last_check = 0.0
+        self._listeners: List[Callable[["SourceStore"], None]] = []
+
+    # -- index management -------------------------------------------------
+
+    def _index_path_for(self, fingerprint: str) -> Path:
+        return self.index_dir / f"{self.name}.{fingerprint}.sqlite"
+
+    def _build_index(self, fingerprint: str) -> Path:
+        target = self._index_path_for(fingerprint)
+        if target.exists():
+            return target
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp = target.parent / f"{target.name}.tmp-{os.getpid()}-{threading.get_ident()}"
+        if tmp.exists():
+            tmp.unlink()
+
+        started = time.perf_counter()
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID")
+            batch = []
+            count = 0
+            for key, value in iter_json_object(self.source_path):
+                batch.append((key, json.dumps(value, separators=(",", ":"))))
+                if len(batch) >= INSERT_BATCH:
+                    conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?)", batch)
+                    count += len(batch)
+                    batch.clear()
+            if batch:
+                conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?)", batch)
+                count += len(batch)
+            conn.commit()
+        finally:
+            conn.close()
+
+        # Versioned file names make the swap atomic for readers: a reader
+        # either still holds the previous index or opens the new one.
+        os.replace(tmp, target)
+        logger.info(
+            "Indexed %s entries from %s in %.2fs", count, self.source_path.name, time.perf_counter() - started
+        )
+        return target
+
+    def _remove_stale_indexes(self, keep: Path) -> None:
+        for old in self.index_dir.glob(f"{self.name}.*.sqlite"):
+            if old != keep:
+                try:
+                    old.unlink()
+                except OSError:
+                    # Still open in another process (or on Windows); retry on next reload.
+                    pass
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild the index if the source file changed. Returns True on swap."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            fingerprint = _fingerprint(self.source_path)
+            if not force and self._generation and fingerprint == self._fingerprint:
+                return False
+            if fingerprint is None:
+                new_path = None
+            else:
+                new_path = self._build_index(fingerprint)
+            swapped = new_path != self._index_path
+            first_load = self._generation == 0
+            self._index_path = new_path
+            self._fingerprint = fingerprint
+            self._generation += 1
+            if new_path is not None:
+                self._remove_stale_indexes(new_path)
+            listeners = list(self._listeners)
+        if swapped and not first_load:
+            for listener in listeners:
+                try:
+                    listener(self)
+                except Exception as exc:
+                    logger.warning("Reload listener for %s failed: %s", self.name, exc)
+        return swapped
+
+    def add_reload_listener(self, listener: Callable[["SourceStore"], None]) -> None:
+        """Call `listener(store)` after the index is swapped for a changed source file."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """Size/mtime of the source file the current index was built from."""
+        self._maybe_reload()
+        return self._fingerprint
+
+    def _maybe_reload(self) -> None:
+        if self._generation == 0 or time.monotonic() - self._last_check >= RELOAD_CHECK_INTERVAL:
+            self.reload()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        self._maybe_reload()
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            if getattr(local, "conn", None) is not None:
+                local.conn.close()
+            local.conn = self._open(self._index_path)
+            local.generation = self._generation
+        return local.conn
+
+    def _open(self, path: Optional[Path]) -> Optional[sqlite3.Connection]:
+        if path is None:
+            return None
+        try:
+            return sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        except sqlite3.OperationalError:
+            # Another process swapped in a newer index and removed ours.
+            self.reload(force=True)
+            if self._index_path is None:
+                # The source file is gone as well.
+                return None
+            return sqlite3.connect(f"{self._index_path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+    # -- mapping-style API ---------------------------------------------------
+
+    def get(self, key: Optional[str], default: Any = None) -> Any:
+        if key is None:
+            return default
+        conn = self._connection()
+        if conn is None:
+            return default
+        row = conn.execute("SELECT value FROM entries WHERE key = ?", (str(key),)).fetchone()
+        if row is None:
+            return default
+        return json.loads(row[0])
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        conn = self._connection()
+        if conn is None:
+            return 0
+        return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def keys(self) -> Iterator[str]:
+        conn = self._connection()
+        if conn is None:
+            return
+        for (key,) in conn.execute("SELECT key FROM entries ORDER BY key"):
+            yield key
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        conn = self._connection()
+        if conn is None:
+            return
+        for key, value in conn.execute("SELECT key, value FROM entries ORDER BY key"):
+            yield key, json.loads(value)
+
+
+_stores: Dict[Path, SourceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(name: str, data_dir: Path = DATA_DIR) -> SourceStore:
+    """Return the process-wide store for a directory file (e.g. "state_board.json")."""
+    path = (Path(data_dir) / name).resolve()
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = SourceStore(path)
+            _stores[path] = store
+        return store
+
+
+__all__ = ["SourceStore", "get_store", "iter_json_object"]
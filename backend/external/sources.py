@@ -0,0 +1,249 @@
+"""
+Registry of external data sources used for provider validation.
+
+Each `SourceAdapter` declares the source's reliability weight (the
+`score_hint` its candidates carry), a per-request timeout, a concurrency
+limit and an optional hedge delay. `SourceFetcher.fetch_all` runs every
+adapter for one provider in parallel on a shared thread pool under an overall
+deadline, so adding a slow source costs max(latencies) per provider rather
+than their sum. Sources that miss their deadline or fail contribute nothing.
+
+Cheap local lookups (the indexed directory files) are marked `run_inline`
+and run on the calling thread, since a pool hop costs more than the lookup.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .npi_cache import cached_fetch_npi_data
+from .source_store import get_store
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+SOURCE_FETCH_DEADLINE = float(os.getenv("SOURCE_FETCH_DEADLINE_SECONDS", "8"))
+SOURCE_POOL_SIZE = int(os.getenv("SOURCE_POOL_SIZE", "16"))
+NPI_HEDGE_AFTER = float(os.getenv("NPI_HEDGE_AFTER_SECONDS", "0")) or None
+
+# score_hint for candidates from a source that is not registered.
+DEFAULT_SOURCE_WEIGHT = 0.3
+
+
+@dataclass(frozen=True)
+class ProviderSnapshot:
+    """Immutable copy of the provider fields adapters need; safe to share across threads."""
+
+    id: int
+    external_id: Optional[str]
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    specialty: Optional[str] = None
+    license_no: Optional[str] = None
+
+    @classmethod
+    def from_provider(cls, provider: Any) -> "ProviderSnapshot":
+        return cls(
+            id=provider.id,
+            external_id=provider.external_id,
+            name=provider.name,
+            phone=provider.phone,
+            address=provider.address,
+            specialty=provider.specialty,
+            license_no=provider.license_no,
+        )
+
+
+@dataclass
+class SourceAdapter:
+    name: str
+    fetch: Callable[[ProviderSnapshot], Dict[str, Any]]
+    weight: float
+    timeout: float = 5.0
+    max_concurrency: int = 8
+    # Issue a second, identical request if the first has not answered after
+    # this many seconds; whichever finishes first wins.
+    hedge_after: Optional[float] = None
+    run_inline: bool = False
+    # Sources such as the live NPI API are opted into per agent.
+    default_enabled: bool = True
+    _slots: threading.BoundedSemaphore = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._slots = threading.BoundedSemaphore(max(1, self.max_concurrency))
+
+    def call(self, snapshot: ProviderSnapshot) -> Dict[str, Any]:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"source {self.name} saturated ({self.max_concurrency} in flight)")
+        try:
+            return self.fetch(snapshot) or {}
+        finally:
+            self._slots.release()
+
+
+_registry: Dict[str, SourceAdapter] = {}
+_registry_lock = threading.Lock()
+
+
+def register_source(adapter: SourceAdapter, replace: bool = False) -> SourceAdapter:
+    with _registry_lock:
+        if adapter.name in _registry and not replace:
+            raise ValueError(f"source {adapter.name!r} is already registered")
+        _registry[adapter.name] = adapter
+    return adapter
+
+
+def unregister_source(name: str) -> None:
+    with _registry_lock:
+        _registry.pop(name, None)
+
+
+def get_source(name: str) -> Optional[SourceAdapter]:
+    return _registry.get(name)
+
+
+def registered_sources() -> List[SourceAdapter]:
+    """Adapters in registration order (the order candidates are listed in)."""
+    with _registry_lock:
+        return list(_registry.values())
+
+
+def source_weight(name: str) -> float:
+    adapter = _registry.get(name)
+    return adapter.weight if adapter else DEFAULT_SOURCE_WEIGHT
+
+
+class SourceFetcher:
+    def __init__(self, max_workers: int = SOURCE_POOL_SIZE, deadline: float = SOURCE_FETCH_DEADLINE):
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="source-fetch")
+
+    def fetch_all(self, snapshot: ProviderSnapshot, adapters: List[SourceAdapter]) -> Dict[str, Dict[str, Any]]:
+        """Payload per adapter name, in adapter order; failed or late sources map to {}."""
+        results: Dict[str, Dict[str, Any]] = {}
+        started = time.monotonic()
+        overall = started + self.deadline
+
+        pending: Dict[Future, SourceAdapter] = {}
+        in_flight: Dict[str, int] = {}
+        hedged = set()
+        for adapter in adapters:
+            if adapter.run_inline:
+                results[adapter.name] = self._call_inline(adapter, snapshot)
+            else:
+                pending[self._executor.submit(adapter.call, snapshot)] = adapter
+                in_flight[adapter.name] = 1
+
+        while pending:
+            now = time.monotonic()
+            wakeups = [overall]
+            for adapter in pending.values():
+                wakeups.append(started + adapter.timeout)
+                if adapter.hedge_after and adapter.name not in hedged:
+                    wakeups.append(started + adapter.hedge_after)
+            timeout = max(0.0, min(wakeups) - now)
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                adapter = pending.pop(future)
+                in_flight[adapter.name] -= 1
+                if adapter.name in results:
+                    continue  # the hedge sibling already answered
+                try:
+                    results[adapter.name] = future.result()
+                except Exception as exc:
+                    if in_flight[adapter.name] == 0:
+                        logger.warning("Source %s failed for provider %s: %s", adapter.name, snapshot.id, exc)
+                        results[adapter.name] = {}
+            # Drop losing hedge requests once a sibling has answered.
+            pending = {f: a for f, a in pending.items() if a.name not in results}
+
+            now = time.monotonic()
+            for future, adapter in list(pending.items()):
+                if now >= overall or now >= started + adapter.timeout:
+                    pending.pop(future)
+                    if adapter.name not in results:
+                        logger.warning(
+                            "Source %s timed out for provider %s after %.1fs",
+                            adapter.name, snapshot.id, now - started,
+                        )
+                        results[adapter.name] = {}
+                elif adapter.hedge_after and adapter.name not in hedged and now >= started + adapter.hedge_after:
+                    hedged.add(adapter.name)
+                    in_flight[adapter.name] += 1
+                    pending[self._executor.submit(adapter.call, snapshot)] = adapter
+
+        return {a.name: results.get(a.name, {}) for a in adapters}
+
+    @staticmethod
+    def _call_inline(adapter: SourceAdapter, snapshot: ProviderSnapshot) -> Dict[str, Any]:
+        try:
+            return adapter.call(snapshot)
+        except Exception as exc:
+            logger.warning("Source %s failed for provider %s: %s", adapter.name, snapshot.id, exc)
+            return {}
+
+
+_fetcher: Optional[SourceFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> SourceFetcher:
+    """Return the process-wide fetcher (one shared thread pool)."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = SourceFetcher()
+        return _fetcher
+
+
+# ---------------------------------------------------------------------------
+# Built-in sources
+# ---------------------------------------------------------------------------
+
+def _store_lookup(filename: str) -> Callable[[ProviderSnapshot], Dict[str, Any]]:
+    store = get_store(filename, DATA_DIR)
+    return lambda snapshot: store.get(snapshot.external_id, {})
+
+
+def _original_fields(snapshot: ProviderSnapshot) -> Dict[str, Any]:
+    return {"phone": snapshot.phone, "address": snapshot.address, "specialty": snapshot.specialty}
+
+
+register_source(
+    SourceAdapter(
+        name="npi",
+        fetch=lambda snapshot: cached_fetch_npi_data(snapshot.external_id),
+        weight=1.0,
+        timeout=float(os.getenv("NPI_SOURCE_TIMEOUT_SECONDS", "6")),
+        max_concurrency=int(os.getenv("NPI_MAX_IN_FLIGHT", "8")),
+        hedge_after=NPI_HEDGE_AFTER,
+        default_enabled=False,
+    )
+)
+register_source(SourceAdapter(name="state_board", fetch=_store_lookup("state_board.json"), weight=0.9, run_inline=True))
+register_source(SourceAdapter(name="maps", fetch=_store_lookup("maps_directory.json"), weight=0.6, run_inline=True))
+register_source(SourceAdapter(name="hospital", fetch=_store_lookup("hospital_directory.json"), weight=0.8, run_inline=True))
+register_source(SourceAdapter(name="original", fetch=_original_fields, weight=0.4, run_inline=True))
+
+
+__all__ = [
+    "ProviderSnapshot",
+    "SourceAdapter",
+    "SourceFetcher",
+    "register_source",
+    "unregister_source",
+    "get_source",
+    "registered_sources",
+    "source_weight",
+    "get_fetcher",
+]
@@ -0,0 +1,284 @@
+"""
+Conditional GET support and an in-process response cache for read endpoints.
+
+Every committed write bumps version counters: a global one, and one per
+provider for rows that carry a `provider_id` (or are the provider itself).
+Session events collect the touched providers at flush time, or from the
+parameters of bulk statements (or their `changed_providers` execution
+option), and apply the bumps only after commit, so rolled-back work
+invalidates nothing.
+
+`cached_json` keys a response on path, query string and the versions it
+depends on. A hit returns the stored body without touching the database.
+ETags are strong: a hash of the exact body bytes, so two responses with the
+same tag are byte-identical. A matching `If-None-Match` gets an empty 304.
+Entries are evicted least recently used beyond `HTTP_CACHE_MAX_BYTES` and
+expire after `HTTP_CACHE_TTL_SECONDS`. The TTL also bounds time-dependent
+fields such as enrichment staleness, which change without a write.
+
+Versions live in this process only. Writes committed by another worker
+process or by a separate script do not bump them, so until the TTL runs out
+this process keeps serving (and answering 304 for) the bodies it cached
+before those writes. Deployments with several API workers should disable
+the cache with `HTTP_CACHE_ENABLED=false` or accept that staleness window.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from .db import Provider
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL_SECONDS", "60"))
+CACHE_CONTROL = "private, no-cache"
+
+_CHANGES_KEY = "http_cache_changes"
+
+
+# ---------------------------------------------------------------------------
+# Resource versions
+# ---------------------------------------------------------------------------
+
+class ResourceVersions:
+    """Monotonic counters bumped on committed writes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._global = 0
+        # Bumped by writes to provider rows that could not be attributed.
+        self._all_providers = 0
+        self._providers: Dict[int, int] = {}
+
+    def current(self, provider_id: Optional[int] = None) -> Tuple[int, ...]:
+        with self._lock:
+            if provider_id is None:
+                return (self._global,)
+            return (self._all_providers, self._providers.get(provider_id, 0))
+
+    def bump(self, provider_ids: Iterable[int] = (), all_providers: bool = False) -> None:
+        with self._lock:
+            self._global += 1
+            if all_providers:
+                self._all_providers += 1
+            for provider_id in provider_ids:
+                self._providers[provider_id] = self._providers.get(provider_id, 0) + 1
+
+
+_versions = ResourceVersions()
+
+
+def get_versions() -> ResourceVersions:
+    return _versions
+
+
+@dataclass
+class _Changes:
+    providers: Set[int]
+    all_providers: bool = False
+
+
+def _changes(session: Session) -> _Changes:
+    changes = session.info.get(_CHANGES_KEY)
+    if changes is None:
+        changes = session.info[_CHANGES_KEY] = _Changes(providers=set())
+    return changes
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session: Session, flush_context) -> None:
+    changes = _changes(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        provider_id = obj.id if isinstance(obj, Provider) else getattr(obj, "provider_id", None)
+        if provider_id is not None:
+            changes.providers.add(provider_id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_executed(state: ORMExecuteState) -> None:
+    # Bulk insert()/update()/delete() statements bypass the flush.
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    changes = _changes(state.session)
+    declared = state.execution_options.get("changed_providers")
+    if declared is not None:
+        # The caller knows which providers' data the statement changes.
+        changes.providers.update(declared)
+        return
+    table = getattr(state.statement, "table", None)
+    if table is None:
+        return
+    id_column = "id" if table.name == Provider.__tablename__ else "provider_id"
+    if id_column not in table.c:
+        return
+    params = state.parameters
+    rows = params if isinstance(params, list) else [params or {}]
+    ids = {row.get(id_column) for row in rows}
+    if None in ids:
+        changes.all_providers = True
+    changes.providers.update(i for i in ids if i is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes is not None:
+        _versions.bump(changes.providers, changes.all_providers)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_CHANGES_KEY, None)
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    created: float
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison, so a W/ prefix is ignored."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class HttpResponseCache:
+    def __init__(
+        self,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        ttl: float = HTTP_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry.created > self.ttl:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry
+
+    def put(self, key: Hashable, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body=body, etag=etag_for(body), created=self.clock())
+        # A single response may use at most a quarter of the budget.
+        if len(body) * 4 > self.max_bytes:
+            return entry
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+        return entry
+
+    def _drop(self, key: Hashable) -> None:
+        self._bytes -= len(self._entries.pop(key).body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / total if total else 0.0
+        return stats
+
+
+_cache: Optional[HttpResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpResponseCache:
+    """Return the process-wide response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpResponseCache()
+        return _cache
+
+
+def cached_json(request: Request, build: Callable[[], Any], provider_id: Optional[int] = None) -> Response:
+    """Serve `build()` as JSON with an ETag, from cache when nothing changed.
+
+    Responses depend on the global version, or on one provider's version
+    when `provider_id` is given. The version is read before building, so a
+    write that lands mid-build leaves the entry under the old key.
+    """
+    key = (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        _versions.current(provider_id),
+    )
+    cache = get_http_cache()
+    entry = cache.get(key) if HTTP_CACHE_ENABLED else None
+    if entry is None:
+        body = JSONResponse(content=jsonable_encoder(build())).body
+        entry = cache.put(key, body) if HTTP_CACHE_ENABLED else CachedResponse(body, etag_for(body), 0.0)
+
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+__all__ = [
+    "HTTP_CACHE_ENABLED",
+    "ResourceVersions",
+    "get_versions",
+    "HttpResponseCache",
+    "get_http_cache",
+    "etag_for",
+    "etag_matches",
+    "cached_json",
+]
@@ -0,0 +1,277 @@
+"""
+Deterministic license field extraction from OCR output.
+
+Each issuing board gets a `LicenseTemplate`: a regex that recognizes its
+documents, the format of its license numbers and how it writes dates. Fields
+are located in the word boxes Tesseract returns — label and value on the same
+line, or the value on the line below the label — and each field's confidence
+is the OCR confidence of the words it was read from, discounted for weaker
+layouts and for the generic template. Everything is precompiled, so parsing
+costs microseconds per page and needs no LLM call.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple
+
+LICENSE_LABEL = re.compile(r"\b(?:medical\s+)?licen[cs]e\b(?:\s*(?:no\b\.?|number\b|#))?", re.IGNORECASE)
+EXPIRY_LABEL = re.compile(
+    r"\b(?:expir(?:y|es|ation)(?:\s+date)?|valid\s+(?:until|through|thru)|exp\.)", re.IGNORECASE
+)
+NAME_LABEL = re.compile(r"\b(?:name|licensee)\b", re.IGNORECASE)
+
+# Separator allowed between a label and its value on the same line.
+_SEPARATOR = re.compile(r"[\s:#.\-]*")
+# Any token with at least one digit, e.g. "LIC-ROHAN-1", "A 123456" is two tokens.
+GENERIC_LICENSE_NUMBER = re.compile(r"(?=[A-Z0-9./-]*\d)[A-Z0-9](?:[A-Z0-9./-]*[A-Z0-9])?")
+DATE_VALUE = re.compile(
+    r"\d{4}-\d{1,2}-\d{1,2}"
+    r"|\d{1,2}[/-]\d{1,2}[/-]\d{4}"
+    r"|[A-Za-z]{3,9}\.?\s+\d{1,2},?\s+\d{4}"
+    r"|\d{1,2}[\s-][A-Za-z]{3,9}\.?[\s-]\d{4}"
+)
+NAME_VALUE = re.compile(r"[A-Za-z][A-Za-z.,' -]*[A-Za-z.]")
+
+ISO_DATE_FORMATS = ("%Y-%m-%d",)
+MONTH_NAME_FORMATS = ("%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y")
+US_DATE_FORMATS = ISO_DATE_FORMATS + ("%m/%d/%Y", "%m-%d-%Y") + MONTH_NAME_FORMATS
+DMY_DATE_FORMATS = ISO_DATE_FORMATS + ("%d/%m/%Y", "%d-%m-%Y") + MONTH_NAME_FORMATS
+
+# Confidence multipliers.
+VALUE_BELOW_LABEL = 0.9
+GENERIC_TEMPLATE = 0.85
+
+
+@dataclass(frozen=True)
+class LicenseTemplate:
+    state: str
+    issuer: Optional[Pattern[str]]
+    license_number: Pattern[str]
+    date_formats: Tuple[str, ...] = US_DATE_FORMATS
+    weight: float = 1.0
+
+
+TEMPLATES: List[LicenseTemplate] = [
+    LicenseTemplate(
+        state="CA",
+        issuer=re.compile(r"medical\s+board\s+of\s+california", re.IGNORECASE),
+        license_number=re.compile(r"[A-Z]{1,2}\s?\d{4,6}"),
+    ),
+    LicenseTemplate(
+        state="NY",
+        issuer=re.compile(r"(?:university\s+of\s+the\s+)?state\s+of\s+new\s+york|new\s+york\s+state", re.IGNORECASE),
+        license_number=re.compile(r"\d{6}"),
+    ),
+    LicenseTemplate(
+        state="TX",
+        issuer=re.compile(r"texas\s+medical\s+board", re.IGNORECASE),
+        license_number=re.compile(r"[A-Z]\d{4,5}"),
+    ),
+    LicenseTemplate(
+        state="FL",
+        issuer=re.compile(r"florida\s+(?:board\s+of\s+medicine|department\s+of\s+health)", re.IGNORECASE),
+        license_number=re.compile(r"ME\s?\d{4,6}"),
+    ),
+    LicenseTemplate(
+        state="MH",
+        issuer=re.compile(r"maharashtra\s+medical\s+council", re.IGNORECASE),
+        license_number=re.compile(r"(?:[A-Z]{1,4}-?)?\d{4,6}"),
+        date_formats=DMY_DATE_FORMATS,
+    ),
+]
+# Used when no issuer matches. Numeric dates are accepted only when the
+# day/month order does not matter.
+GENERIC = LicenseTemplate(
+    state="generic",
+    issuer=None,
+    license_number=GENERIC_LICENSE_NUMBER,
+    date_formats=US_DATE_FORMATS + ("%d/%m/%Y", "%d-%m-%Y"),
+    weight=GENERIC_TEMPLATE,
+)
+
+
+@dataclass(frozen=True)
+class FieldMatch:
+    value: str
+    confidence: float
+
+
+@dataclass
+class LicenseFields:
+    template: str = GENERIC.state
+    license_no: Optional[FieldMatch] = None
+    expiry_date: Optional[FieldMatch] = None
+    name: Optional[FieldMatch] = None
+
+    @property
+    def complete(self) -> bool:
+        """License number and expiry found — enough to stop scanning a packet."""
+        return self.license_no is not None and self.expiry_date is not None
+
+    def as_dict(self) -> Dict[str, Any]:
+        matches = {"license_no": self.license_no, "expiry_date": self.expiry_date, "name": self.name}
+        out: Dict[str, Any] = {key: m.value if m else None for key, m in matches.items()}
+        out["template"] = self.template
+        out["field_confidences"] = {key: round(m.confidence, 4) for key, m in matches.items() if m}
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _Line:
+    top: float
+    bottom: float
+    words: List[Dict[str, Any]] = field(default_factory=list)
+    text: str = ""
+    # Start offset of each word in `text`.
+    offsets: List[int] = field(default_factory=list)
+
+    def finish(self) -> None:
+        self.words.sort(key=lambda w: w.get("left", 0))
+        parts, pos = [], 0
+        for word in self.words:
+            self.offsets.append(pos)
+            parts.append(word["text"])
+            pos += len(word["text"]) + 1
+        self.text = " ".join(parts)
+
+    def confidence(self, start: int, end: int) -> float:
+        confs = [
+            w["conf"]
+            for w, offset in zip(self.words, self.offsets)
+            if offset < end and offset + len(w["text"]) > start
+        ]
+        return sum(confs) / len(confs) / 100.0 if confs else 0.0
+
+
+def group_lines(words: Sequence[Dict[str, Any]]) -> List[_Line]:
+    """Group word boxes into reading-order lines by vertical overlap."""
+    lines: List[_Line] = []
+    for word in sorted(words, key=lambda w: (w.get("top", 0), w.get("left", 0))):
+        top = word.get("top", 0)
+        bottom = top + word.get("height", 0)
+        middle = (top + bottom) / 2
+        line = lines[-1] if lines else None
+        if line is not None and line.top <= middle <= line.bottom:
+            line.words.append(word)
+            line.bottom = max(line.bottom, bottom)
+        else:
+            lines.append(_Line(top=top, bottom=bottom, words=[word]))
+    for line in lines:
+        line.finish()
+    return lines
+
+
+def _text_lines(text: str, confidence: float) -> List[_Line]:
+    lines = []
+    for row in text.splitlines():
+        words = [{"text": token, "conf": confidence * 100} for token in row.split()]
+        if words:
+            line = _Line(top=0, bottom=0, words=words)
+            line.finish()
+            lines.append(line)
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# Field search
+# ---------------------------------------------------------------------------
+
+def _find(lines: List[_Line], label: Pattern[str], value: Pattern[str]) -> Optional[Tuple[str, float]]:
+    for index, line in enumerate(lines):
+        for label_match in label.finditer(line.text):
+            start = _SEPARATOR.match(line.text, label_match.end()).end()
+            if start < len(line.text):
+                found = value.match(line.text, start)
+                if found:
+                    return found.group(0), line.confidence(found.start(), found.end())
+                continue
+            # Label ends the line: the value sits on the line below.
+            if index + 1 < len(lines):
+                below = lines[index + 1]
+                found = value.match(below.text)
+                if found:
+                    return found.group(0), below.confidence(found.start(), found.end()) * VALUE_BELOW_LABEL
+    return None
+
+
+def parse_date(value: str, formats: Sequence[str]) -> Optional[str]:
+    """ISO date for `value`, or None if it does not parse or is ambiguous."""
+    text = " ".join(value.replace(",", " ").replace(".", " ").split())
+    parsed = set()
+    for fmt in formats:
+        try:
+            parsed.add(datetime.strptime(text, fmt).date())
+        except ValueError:
+            continue
+    return parsed.pop().isoformat() if len(parsed) == 1 else None
+
+
+def select_template(text: str) -> LicenseTemplate:
+    for template in TEMPLATES:
+        if template.issuer is not None and template.issuer.search(text):
+            return template
+    return GENERIC
+
+
+def parse_license(
+    text: str = "",
+    words: Optional[Sequence[Dict[str, Any]]] = None,
+    text_confidence: float = 1.0,
+) -> LicenseFields:
+    """Extract license number, expiry date and name from one OCR'd page.
+
+    Uses the word boxes when given; otherwise `text` is split into lines and
+    every word gets `text_confidence`.
+    """
+    lines = group_lines(words) if words else _text_lines(text, text_confidence)
+    full_text = " ".join(line.text for line in lines)
+    template = select_template(full_text)
+    fields = LicenseFields(template=template.state)
+
+    found = _find(lines, LICENSE_LABEL, template.license_number)
+    if found is None and template is not GENERIC:
+        # Unusual number format for a known board: fall back to any token.
+        found = _find(lines, LICENSE_LABEL, GENERIC_LICENSE_NUMBER)
+        if found:
+            found = (found[0], found[1] * GENERIC_TEMPLATE)
+    if found:
+        fields.license_no = FieldMatch(found[0].replace(" ", ""), found[1] * template.weight)
+
+    found = _find(lines, EXPIRY_LABEL, DATE_VALUE)
+    if found:
+        iso = parse_date(found[0], template.date_formats)
+        if iso:
+            fields.expiry_date = FieldMatch(iso, found[1] * template.weight)
+
+    found = _find(lines, NAME_LABEL, NAME_VALUE)
+    if found:
+        # Without line breaks the name can run into the next label.
+        name = found[0]
+        for label in (LICENSE_LABEL, EXPIRY_LABEL):
+            cut = label.search(name)
+            if cut:
+                name = name[: cut.start()]
+        name = name.strip(" ,")
+        if name:
+            fields.name = FieldMatch(name, found[1] * template.weight)
+    return fields
+
+
+__all__ = [
+    "LicenseTemplate",
+    "TEMPLATES",
+    "GENERIC",
+    "FieldMatch",
+    "LicenseFields",
+    "group_lines",
+    "parse_date",
+    "parse_license",
+    "select_template",
+]
@@ -0,0 +1,309 @@
+"""
+Pluggable transports behind `call_gemini`.
+
+`GeminiClient` owns rate limiting and the circuit breaker; the backend only
+performs the raw completion. Besides the real Gemini backend there are:
+
+- StandInBackend: offline responder with configurable latency distribution
+  and error/quota injection, producing well-formed answers for the agents'
+  prompts so their LLM paths can be exercised without network access.
+- RecordingBackend: wraps another backend and appends every prompt/response
+  pair (with its latency) to a JSONL file.
+- ReplayBackend: serves responses from such a recording, optionally with the
+  recorded latency, falling back to another backend on a miss.
+
+Selected with `LLM_BACKEND` (gemini | standin | replay); `LLM_RECORD_PATH`
+wraps the selected backend in a recorder.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import google.generativeai as genai
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:  # pragma: no cover - api_core ships with google-generativeai
+    google_exceptions = None
+
+from .response_cache import cache_key
+
+logger = logging.getLogger(__name__)
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH")
+LLM_REPLAY_PATH = os.getenv("LLM_REPLAY_PATH")
+
+
+def gemini_api_key() -> Optional[str]:
+    """Configured Gemini key, ignoring the `your_...` placeholder from .env.example."""
+    key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+    if not key or key.startswith("your_"):
+        return None
+    return key
+
+
+class LLMBackend:
+    name = "base"
+    # Whether responses may be served from the persistent response cache.
+    cacheable = True
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return gemini_api_key() is not None
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    genai.configure(api_key=gemini_api_key())
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        request_options = {"timeout": timeout} if timeout else None
+        response = self.model.generate_content(prompt, request_options=request_options)
+        return response.text.strip()
+
+
+@dataclass
+class StandInConfig:
+    latency_ms: float = float(os.getenv("LLM_STANDIN_LATENCY_MS", "800"))
+    # fixed | uniform | lognormal
+    distribution: str = os.getenv("LLM_STANDIN_DISTRIBUTION", "lognormal")
+    # uniform: +/- spread; lognormal: sigma of the underlying normal.
+    spread: float = float(os.getenv("LLM_STANDIN_SPREAD", "0.5"))
+    error_rate: float = float(os.getenv("LLM_STANDIN_ERROR_RATE", "0"))
+    quota_rate: float = float(os.getenv("LLM_STANDIN_QUOTA_RATE", "0"))
+    seed: Optional[int] = None
+
+
+class UpstreamError(RuntimeError):
+    """HTTP-style error carrying a status `code`, used when api_core is unavailable."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+def _server_error(message: str) -> Exception:
+    if google_exceptions is not None:
+        return google_exceptions.ServiceUnavailable(message)
+    return UpstreamError(503, message)
+
+
+def _quota_error(message: str) -> Exception:
+    if google_exceptions is not None:
+        return google_exceptions.TooManyRequests(message)
+    return UpstreamError(429, message)
+
+
+_ITEMS_LINE = re.compile(r"^Items: (.*)$", re.MULTILINE)
+_CANDIDATES_LINE = re.compile(r"^Candidates \(value, source, score_hint\): (.*)$", re.MULTILINE)
+_PROVIDER_LINE = re.compile(r"^Provider name: (.*)$", re.MULTILINE)
+_SPECIALTY_LINE = re.compile(r"^Existing specialty: (.*)$", re.MULTILINE)
+
+
+def _pick(candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    top = max(candidates, key=lambda c: c.get("score_hint") or 0)
+    agreeing = [c["source"] for c in candidates if str(c.get("value")) == str(top.get("value"))]
+    return {"value": top.get("value"), "confidence": round(min(0.95, 0.6 + 0.15 * len(agreeing)), 2), "sources": agreeing}
+
+
+# ast.literal_eval is not thread-safe on CPython 3.11 (concurrent calls can
+# fail with "AST constructor recursion depth mismatch").
+_literal_eval_lock = threading.Lock()
+
+
+def stand_in_response(prompt: str) -> str:
+    """Well-formed answer for the validation, enrichment and QA-summary prompts."""
+    items = _ITEMS_LINE.search(prompt)
+    if items:
+        answers = [dict(_pick(item["candidates"]), id=item["id"]) for item in json.loads(items.group(1))]
+        return json.dumps(answers)
+
+    candidates = _CANDIDATES_LINE.search(prompt)
+    if candidates:
+        with _literal_eval_lock:
+            triples = ast.literal_eval(candidates.group(1))
+        return json.dumps(_pick([{"value": v, "source": s, "score_hint": h} for v, s, h in triples]))
+
+    provider = _PROVIDER_LINE.search(prompt)
+    if provider:
+        specialty = _SPECIALTY_LINE.search(prompt)
+        return json.dumps(
+            {
+                "certifications": [],
+                "affiliations": [],
+                "education": "",
+                "secondary_specialties": [],
+                "summary": f"{provider.group(1)} practices {specialty.group(1) if specialty else 'medicine'}.",
+            }
+        )
+
+    return "Stand-in summary: the chosen value is supported by the highest-weighted agreeing sources."
+
+
+class StandInBackend(LLMBackend):
+    name = "standin"
+    # Load tests want every call to exercise the full path.
+    cacheable = False
+
+    def __init__(self, config: Optional[StandInConfig] = None):
+        self.config = config or StandInConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+
+    def _draw(self):
+        cfg = self.config
+        with self._lock:
+            if cfg.distribution == "fixed":
+                latency = cfg.latency_ms
+            elif cfg.distribution == "uniform":
+                latency = cfg.latency_ms * self._rng.uniform(1 - cfg.spread, 1 + cfg.spread)
+            else:
+                # Median latency_ms with a long right tail, like real completions.
+                latency = cfg.latency_ms * self._rng.lognormvariate(0, cfg.spread)
+            roll = self._rng.random()
+        return max(0.0, latency) / 1000.0, roll
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        delay, roll = self._draw()
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"stand-in call exceeded {timeout}s")
+        time.sleep(delay)
+        if roll < self.config.quota_rate:
+            raise _quota_error("Resource has been exhausted (e.g. check quota).")
+        if roll < self.config.quota_rate + self.config.error_rate:
+            raise _server_error("The service is currently unavailable.")
+        return stand_in_response(prompt)
+
+
+class RecordingBackend(LLMBackend):
+    def __init__(self, inner: LLMBackend, path: Path, model_name: str):
+        self.inner = inner
+        self.path = Path(path)
+        self.model_name = model_name
+        self.name = f"recording:{inner.name}"
+        self.cacheable = inner.cacheable
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def available(self) -> bool:
+        return self.inner.available
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        started = time.perf_counter()
+        response = self.inner.generate(prompt, timeout)
+        record = {
+            "key": cache_key(self.model_name, prompt),
+            "prompt": prompt,
+            "response": response,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        with self._lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(record) + "\n")
+        return response
+
+
+class ReplayBackend(LLMBackend):
+    name = "replay"
+    cacheable = False
+
+    def __init__(
+        self,
+        path: Path,
+        model_name: str,
+        fallback: Optional[LLMBackend] = None,
+        replay_latency: bool = True,
+    ):
+        self.model_name = model_name
+        self.fallback = fallback
+        self.replay_latency = replay_latency
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        with Path(path).open(encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records[record["key"]] = record
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        record = self._records.get(cache_key(self.model_name, prompt))
+        with self._lock:
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if record is None:
+            if self.fallback is None:
+                raise LookupError("no recorded response for prompt")
+            return self.fallback.generate(prompt, timeout)
+        if self.replay_latency:
+            time.sleep(record.get("latency_ms", 0) / 1000.0)
+        return record["response"]
+
+
+def backend_from_env(model_name: str) -> LLMBackend:
+    if LLM_BACKEND == "standin":
+        backend: LLMBackend = StandInBackend()
+    elif LLM_BACKEND == "replay":
+        if not LLM_REPLAY_PATH:
+            raise RuntimeError("LLM_BACKEND=replay requires LLM_REPLAY_PATH")
+        backend = ReplayBackend(Path(LLM_REPLAY_PATH), model_name, fallback=StandInBackend())
+    else:
+        if LLM_BACKEND != "gemini":
+            logger.warning("Unknown LLM_BACKEND %r, using gemini", LLM_BACKEND)
+        backend = GeminiBackend(model_name)
+    if LLM_RECORD_PATH:
+        backend = RecordingBackend(backend, Path(LLM_RECORD_PATH), model_name)
+    return backend
+
+
+__all__ = [
+    "LLMBackend",
+    "GeminiBackend",
+    "StandInBackend",
+    "StandInConfig",
+    "RecordingBackend",
+    "ReplayBackend",
+    "UpstreamError",
+    "backend_from_env",
+    "gemini_api_key",
+    "stand_in_response",
+]
@@ -1,38 +1,292 @@
-"""Gemini LLM client for AI-assisted validation."""
+"""Gemini LLM client for AI-assisted validation.
+
+A single shared `GeminiClient` reuses one model instance, throttles calls to
+a requests-per-minute and tokens-per-minute budget (token buckets), applies a
+request timeout, and trips a circuit breaker on bursts of quota or server
+errors. While the circuit is open every call fails immediately with
+`CircuitOpenError`, so agents fall back to deterministic scoring instead of
+waiting on calls that are bound to fail.
+
+The raw completion is delegated to a pluggable backend (see backends.py), so
+the same limits and fallbacks can be exercised offline against a stand-in or
+a replayed recording.
+"""
 
 import os
 import logging
-import google.generativeai as genai
+import threading
+import time
+from typing import Callable, Optional
 
-logger = logging.getLogger(__name__)
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:  # pragma: no cover - api_core ships with google-generativeai
+    google_exceptions = None
 
-# Support both API key environment variables
-_api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-if _api_key:
-    genai.configure(api_key=_api_key)
+from .backends import LLMBackend, backend_from_env
+from .response_cache import LLM_CACHE_ENABLED, get_response_cache
+
+logger = logging.getLogger(__name__)
 
 MODEL_NAME = "gemini-2.5-flash"
 
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "250000"))
+# Longest a caller will wait for budget before giving up with QuotaExceededError.
+GEMINI_MAX_WAIT = float(os.getenv("GEMINI_MAX_WAIT_SECONDS", "10"))
+GEMINI_CIRCUIT_FAILURES = int(os.getenv("GEMINI_CIRCUIT_FAILURES", "3"))
+GEMINI_CIRCUIT_WINDOW = float(os.getenv("GEMINI_CIRCUIT_WINDOW_SECONDS", "60"))
+GEMINI_CIRCUIT_COOLDOWN = float(os.getenv("GEMINI_CIRCUIT_COOLDOWN_SECONDS", "60"))
+
+# Rough completion size reserved from the token budget for each call.
+EXPECTED_OUTPUT_TOKENS = 256
+
+
+class LLMUnavailableError(RuntimeError):
+    """The LLM cannot serve this call right now; callers should fall back quietly."""
+
+
+class QuotaExceededError(LLMUnavailableError):
+    """Upstream quota (HTTP 429) or the local rate budget is exhausted."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Recent quota/server failures opened the circuit; the call was not attempted."""
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prompts.
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = max(1.0, per_minute)
+        self.rate = per_minute / 60.0
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets, reserved together."""
+
+    def __init__(
+        self,
+        rpm: float = GEMINI_RPM,
+        tpm: float = GEMINI_TPM,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        max_wait: float = GEMINI_MAX_WAIT,
+    ):
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.clock = clock
+        self.sleep = sleep
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int, max_wait: Optional[float] = None) -> None:
+        deadline = self.clock() + (self.max_wait if max_wait is None else max_wait)
+        while True:
+            with self._lock:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if wait == 0.0:
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+                    return
+            if self.clock() + wait > deadline:
+                raise QuotaExceededError(f"Local Gemini rate budget exhausted (needs {wait:.1f}s)")
+            self.sleep(wait)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = GEMINI_CIRCUIT_FAILURES,
+        window: float = GEMINI_CIRCUIT_WINDOW,
+        cooldown: float = GEMINI_CIRCUIT_COOLDOWN,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.cooldown = cooldown
+        self.clock = clock
+        self._failures = []
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self.clock() - self._opened_at < self.cooldown:
+                return "open"
+            return "half_open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if self.clock() - self._opened_at < self.cooldown or self._probe_in_flight:
+                raise CircuitOpenError("Gemini circuit open after repeated quota/server errors")
+            # Half-open: let exactly one probe through.
+            self._probe_in_flight = True
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe slot for a call that never reached upstream."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = self.clock()
+            self._failures = [t for t in self._failures if now - t < self.window] + [now]
+            if self._probe_in_flight or len(self._failures) >= self.failure_threshold:
+                if self._opened_at is None or self._probe_in_flight:
+                    logger.warning("Gemini circuit opened for %.0fs", self.cooldown)
+                self._opened_at = now
+                self._probe_in_flight = False
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    # google.api_core errors carry the HTTP status as `code`.
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def _is_quota_error(exc: Exception) -> bool:
+    # ResourceExhausted (gRPC) subclasses TooManyRequests (HTTP 429).
+    if google_exceptions is not None and isinstance(exc, google_exceptions.TooManyRequests):
+        return True
+    return _status_code(exc) == 429
+
+
+def _is_server_error(exc: Exception) -> bool:
+    if google_exceptions is not None and isinstance(
+        exc, (google_exceptions.ServerError, google_exceptions.DeadlineExceeded)
+    ):
+        return True
+    code = _status_code(exc)
+    return isinstance(exc, TimeoutError) or (code is not None and code >= 500)
+
+
+class GeminiClient:
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        timeout: float = GEMINI_TIMEOUT,
+        limiter: Optional[RateLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        backend: Optional[LLMBackend] = None,
+    ):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.limiter = limiter or RateLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.backend = backend or backend_from_env(model_name)
+
+    def generate(self, prompt: str) -> str:
+        self.breaker.before_call()
+        try:
+            self.limiter.acquire(estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS)
+        except QuotaExceededError:
+            # Local throttling is not an upstream failure.
+            self.breaker.release_probe()
+            raise
+
+        try:
+            text = self.backend.generate(prompt, self.timeout)
+        except Exception as e:
+            if _is_quota_error(e):
+                self.breaker.record_failure()
+                raise QuotaExceededError(str(e)) from e
+            if _is_server_error(e):
+                self.breaker.record_failure()
+            else:
+                # Not a sign of upstream trouble: give back a half-open probe
+                # slot so the next call can probe instead of failing forever.
+                self.breaker.release_probe()
+            logger.error(f"Gemini API call failed: {e}")
+            raise
+        self.breaker.record_success()
+        return text
+
+
+_client: Optional[GeminiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> GeminiClient:
+    """Return the process-wide Gemini client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GeminiClient()
+        return _client
+
+
+def set_backend(backend: Optional[LLMBackend]) -> GeminiClient:
+    """Swap the backend behind `call_gemini` (None restores the env selection)."""
+    global _client
+    with _client_lock:
+        _client = GeminiClient(backend=backend)
+        return _client
+
+
+def llm_available() -> bool:
+    """True when `call_gemini` has a backend to talk to (e.g. an API key is set)."""
+    return get_client().backend.available
+
 
 def call_gemini(prompt: str) -> str:
     """Call Gemini API with the given prompt.
-    
+
     Args:
         prompt: The prompt to send to Gemini.
-        
+
     Returns:
         The response text from Gemini.
-        
+
     Raises:
         RuntimeError: If API key is not configured.
+        QuotaExceededError: If the quota or local rate budget is exhausted.
+        CircuitOpenError: If recent failures opened the circuit breaker.
     """
-    if not _api_key:
+    client = get_client()
+    if not client.backend.available:
         raise RuntimeError("GEMINI_API_KEY or GOOGLE_API_KEY environment variable not configured")
-    
-    try:
-        model = genai.GenerativeModel(MODEL_NAME)
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        logger.error(f"Gemini API call failed: {e}")
-        raise
+
+    if LLM_CACHE_ENABLED and client.backend.cacheable:
+        # Identical prompts (e.g. unchanged providers on the nightly run) are
+        # answered from the persistent response cache.
+        return get_response_cache().get_or_compute(MODEL_NAME, prompt, lambda: client.generate(prompt))
+    return client.generate(prompt)
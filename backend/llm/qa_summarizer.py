@@ -1,16 +1,15 @@
 from typing import Dict, Any
-import os
+
+from .gemini_client import LLMUnavailableError, call_gemini, llm_available
 
 def summarize_qa_decision(payload: Dict[str, Any]) -> str:
-    # Check if Gemini API key is configured
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key or api_key == "your_gemini_api_key_here" or api_key.startswith("your_"):
+    # Check if Gemini API key (or an offline backend) is configured
+    if not llm_available():
         # Fallback: Generate a rule-based explanation
         print("[INFO] Using fallback explanation (no valid API key)")
         return _generate_fallback_explanation(payload)
     
     try:
-        from .gemini_client import call_gemini, QuotaExceededError
         prompt = f"""
 You are a healthcare data quality analyst.
 
@@ -35,8 +34,8 @@ Keep the explanation concise and professional.
 """
         result = call_gemini(prompt)
         return result
-    except QuotaExceededError:
-        # Silently fallback when quota is exceeded
+    except LLMUnavailableError:
+        # Silently fallback when quota is exceeded or the circuit is open
         return _generate_fallback_explanation(payload)
     except Exception as e:
         # Only log non-quota errors
@@ -0,0 +1,193 @@
+"""
+Content-addressed cache for LLM responses.
+
+Responses are keyed by model name plus a hash of the whitespace-normalized
+prompt and persisted in SQLite, so the nightly batch does not pay again for
+prompts it already answered for unchanged providers. Entries expire after a
+TTL and the least recently used ones are evicted beyond a size bound.
+Concurrent identical requests in one process are collapsed into a single
+upstream call (single-flight).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CACHE_DIR = Path(os.getenv("CACHE_DIR", str(DATA_DIR / ".cache")))
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(CACHE_DIR / "llm_cache.sqlite")))
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+
+# Eviction is amortized: the size bound is enforced every N inserts.
+EVICT_EVERY = 100
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so indentation/blank-line differences share a key."""
+    lines = (" ".join(line.split()) for line in prompt.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def cache_key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\n{normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: Path = LLM_CACHE_PATH,
+        ttl: float = LLM_CACHE_TTL,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+        self._inserts = 0
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def _store(self, key: str, model: str, response: str) -> None:
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._inserts += 1
+            if self._inserts % EVICT_EVERY == 0:
+                self._evict_locked()
+            self._conn.commit()
+
+    def _evict_locked(self) -> None:
+        now = self.clock()
+        cur = self._conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,))
+        evicted = cur.rowcount
+        total = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if total > self.max_entries:
+            cur = self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access LIMIT ?)",
+                (total - self.max_entries,),
+            )
+            evicted += cur.rowcount
+        self._counters["evictions"] += evicted
+
+    def evict(self) -> None:
+        with self._lock:
+            self._evict_locked()
+            self._conn.commit()
+
+    def get_or_compute(self, model: str, prompt: str, compute: Callable[[], str]) -> str:
+        key = cache_key(model, prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            with self._lock:
+                self._counters["hits"] += 1
+            return cached
+
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self._counters["misses"] += 1
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result  # type: ignore[return-value]
+
+        try:
+            flight.result = compute()
+            self._store(key, model, flight.result)
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        served = stats["hits"] + stats["coalesced"]
+        total = served + stats["misses"]
+        stats["hit_rate"] = served / total if total else 0.0
+        return stats
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+__all__ = ["ResponseCache", "get_response_cache", "cache_key", "normalize_prompt", "LLM_CACHE_ENABLED"]
@@ -7,9 +7,10 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers import batch, stats, providers, manual_review, reports
+from .routers import batch, stats, providers, manual_review, reports, duplicates, search
 from backend.api import router as explain_router
 from .db import init_db
+from .search import init_search_index
 
 # Configure logging
 logging.basicConfig(
@@ -20,6 +21,7 @@ logging.basicConfig(
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    init_search_index()
     yield
 
 app = FastAPI(
@@ -37,6 +39,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 app.include_router(batch.router)
@@ -44,6 +47,8 @@ app.include_router(stats.router)
 app.include_router(providers.router)
 app.include_router(manual_review.router)
 app.include_router(reports.router)
+app.include_router(duplicates.router)
+app.include_router(search.router)
 app.include_router(explain_router)
 
 @app.get("/health")
@@ -0,0 +1,414 @@
+"""
+OCR engine for provider documents.
+
+Tesseract runs in a process pool (`OCR_WORKERS` processes; 0 runs inline)
+so throughput scales with cores and the batch loop never blocks on a single
+scan. Every job preprocesses the image first — EXIF orientation, grayscale,
+DPI normalization, downscaling oversized scans and deskewing — and is bounded
+by a hard per-document timeout: Tesseract itself is killed after
+`OCR_TIMEOUT_SECONDS`, and a worker that still does not answer (e.g. stuck
+decoding a pathological image) gets the pool torn down and replaced; the
+documents that had not finished are resubmitted together to the new pool.
+
+Multi-page documents (PDF packets via the optional PyMuPDF, multi-frame
+TIFFs via PIL) are rasterized and OCRed one page at a time, so memory stays
+bounded by a single page. Each page's license fields are parsed with the
+templates in `license_parser`; scanning stops at the first page that yields
+a license number and expiry, and that page's text, confidence and fields
+become the document's.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pytesseract
+from PIL import Image, ImageOps, ImageSequence
+
+from .license_parser import parse_license
+
+try:
+    import fitz  # PyMuPDF, optional: only needed for PDF packets
+except ImportError:
+    fitz = None
+
+logger = logging.getLogger(__name__)
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT_SECONDS", "60"))
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_TESSERACT_CONFIG = os.getenv("OCR_TESSERACT_CONFIG", "--psm 3")
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "4000"))
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "200"))
+# multiprocessing start method for the pool workers (fork / forkserver /
+# spawn). The pool is also used from the API's background threads, and forking
+# a threaded process can copy a held lock into the child, so the default is
+# forkserver where available and spawn elsewhere. Both re-import the main
+# module in every worker, so scripts need an `if __name__ == "__main__"` guard.
+OCR_START_METHOD = os.getenv("OCR_START_METHOD") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Extra time the pool gets beyond the Tesseract timeout for decoding and
+# preprocessing before the job is considered hung.
+POOL_GRACE_SECONDS = 15
+POOL_START_TIMEOUT = 60
+DESKEW_MAX_ANGLE = 5.0
+DESKEW_STEP = 0.5
+DESKEW_THUMBNAIL = 600
+# Bump when preprocess(), page selection or field parsing changes OCR
+# output, so stored results are recomputed (see ocr_version).
+PREPROCESS_VERSION = 3
+HASH_CHUNK_SIZE = 1 << 20
+
+
+# ---------------------------------------------------------------------------
+# Preprocessing
+# ---------------------------------------------------------------------------
+
+def _row_profile_variance(image: Image.Image) -> float:
+    # Mean darkness per row; text lines aligned with the rows give a spiky
+    # profile (high variance), skewed lines smear it out.
+    rows = list(image.resize((1, image.height), Image.BOX).tobytes())
+    mean = sum(rows) / len(rows)
+    return sum((r - mean) ** 2 for r in rows) / len(rows)
+
+
+def estimate_skew(gray: Image.Image) -> float:
+    """Angle in degrees that best levels the text lines (projection profile)."""
+    thumb = gray.copy()
+    thumb.thumbnail((DESKEW_THUMBNAIL, DESKEW_THUMBNAIL))
+    inverted = ImageOps.invert(thumb)  # text bright, background black (rotation fill)
+
+    best_angle, best_score = 0.0, _row_profile_variance(inverted)
+    steps = int(DESKEW_MAX_ANGLE / DESKEW_STEP)
+    for i in range(-steps, steps + 1):
+        angle = i * DESKEW_STEP
+        if angle == 0:
+            continue
+        score = _row_profile_variance(inverted.rotate(angle, resample=Image.BILINEAR, expand=True))
+        if score > best_score * 1.05:
+            best_angle, best_score = angle, score
+    return best_angle
+
+
+def preprocess(image: Image.Image, target_dpi: int = OCR_TARGET_DPI, max_side: int = OCR_MAX_SIDE) -> Image.Image:
+    image = ImageOps.exif_transpose(image)
+    dpi = image.info.get("dpi")
+    gray = image.convert("L")
+
+    scale = 1.0
+    if dpi and dpi[0]:
+        source_dpi = float(dpi[0])
+        # Tesseract is tuned for ~300 DPI; fix low-res faxes and very high-res scans.
+        if source_dpi < target_dpi * 0.75 or source_dpi > target_dpi * 1.5:
+            scale = target_dpi / source_dpi
+    longest = max(gray.size) * scale
+    if longest > max_side:
+        scale *= max_side / longest
+    if abs(scale - 1.0) > 0.01:
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.LANCZOS)
+
+    angle = estimate_skew(gray)
+    if angle:
+        gray = gray.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    return gray
+
+
+# ---------------------------------------------------------------------------
+# OCR jobs
+# ---------------------------------------------------------------------------
+
+@dataclass
+class OcrResult:
+    # Text, confidence and words of the relevant page (the license page, or
+    # the most confident page when none matched).
+    text: str = ""
+    confidence: float = 0.0
+    # Word boxes from image_to_data: text, conf (0-100), left, top, width, height.
+    words: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    page: Optional[int] = None  # 1-based
+    # Confidence of every page scanned, in page order.
+    page_confidences: List[float] = field(default_factory=list)
+    # LicenseFields.as_dict() of the relevant page.
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def words_from_data(data: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    texts = data.get("text", [])
+    n = len(texts)
+    confs = data.get("conf") or [-1] * n
+    boxes = {key: data.get(key) or [0] * n for key in ("left", "top", "width", "height")}
+    words = []
+    for i, text in enumerate(texts):
+        conf = float(confs[i])
+        if conf < 0 or not str(text).strip():
+            continue
+        word = {"text": str(text), "conf": conf}
+        word.update({key: int(values[i]) for key, values in boxes.items()})
+        words.append(word)
+    return words
+
+
+def result_from_data(data: Dict[str, List[Any]]) -> OcrResult:
+    words = words_from_data(data)
+    text = " ".join(data.get("text", []))
+    confidence = sum(w["conf"] for w in words) / len(words) / 100.0 if words else 0.0
+    return OcrResult(text=text, confidence=confidence, words=words)
+
+
+def ocr_image(image: Image.Image, timeout: float = OCR_TIMEOUT) -> OcrResult:
+    data = pytesseract.image_to_data(
+        preprocess(image),
+        lang=OCR_LANG,
+        config=OCR_TESSERACT_CONFIG,
+        output_type=pytesseract.Output.DICT,
+        timeout=timeout,
+    )
+    return result_from_data(data)
+
+
+def _fields_found(result: OcrResult) -> int:
+    return sum(result.fields.get(key) is not None for key in ("license_no", "expiry_date", "name"))
+
+
+def _is_pdf(path: str) -> bool:
+    with open(path, "rb") as fh:
+        return fh.read(5) == b"%PDF-"
+
+
+def iter_pages(path: str, dpi: int = OCR_TARGET_DPI) -> Iterator[Image.Image]:
+    """Yield the pages of a document one at a time; only one is decoded at once."""
+    if _is_pdf(path):
+        if fitz is None:
+            raise RuntimeError("PDF documents require PyMuPDF (pip install pymupdf)")
+        pdf = fitz.open(path)
+        try:
+            for index in range(pdf.page_count):
+                pixmap = pdf.load_page(index).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+                page = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+                page.info["dpi"] = (dpi, dpi)
+                del pixmap
+                yield page
+        finally:
+            pdf.close()
+        return
+
+    with Image.open(path) as image:
+        for frame in ImageSequence.Iterator(image):
+            page = frame.copy()
+            page.info.setdefault("dpi", image.info.get("dpi"))
+            yield page
+
+
+def ocr_document(path: str, timeout: float = OCR_TIMEOUT, max_pages: int = OCR_MAX_PAGES) -> OcrResult:
+    """OCR a document page by page, stopping once the license fields are found.
+
+    `timeout` bounds the whole document; each Tesseract call gets what is
+    left of it.
+    """
+    deadline = time.monotonic() + timeout
+    confidences: List[float] = []
+    best: Optional[OcrResult] = None
+    for number, page in enumerate(iter_pages(path), start=1):
+        if number > max_pages:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            if best is None:
+                raise TimeoutError(f"OCR budget of {timeout:.0f}s spent before page {number}")
+            break
+        result = ocr_image(page, remaining)
+        page.close()
+        result.page = number
+        confidences.append(result.confidence)
+        license_fields = parse_license(result.text, result.words, result.confidence)
+        result.fields = license_fields.as_dict()
+        if license_fields.complete:
+            best = result
+            break
+        # Otherwise keep the page with the most fields, then the most legible.
+        if best is None or (_fields_found(result), result.confidence) > (_fields_found(best), best.confidence):
+            best = result
+
+    if best is None:
+        return OcrResult(error="document has no pages")
+    best.page_confidences = confidences
+    return best
+
+
+def ocr_image_file(path: str, timeout: float = OCR_TIMEOUT) -> OcrResult:
+    """Pool job: never raises, so one bad file cannot poison a batch."""
+    try:
+        return ocr_document(path, timeout)
+    except Exception as exc:
+        return OcrResult(error=f"{type(exc).__name__}: {exc}")
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def ocr_version() -> str:
+    """Identifies everything besides the file that determines OCR output."""
+    try:
+        engine = f"tesseract-{pytesseract.get_tesseract_version()}"
+    except Exception:
+        engine = "tesseract-unavailable"
+    return "|".join(
+        [engine, OCR_LANG, OCR_TESSERACT_CONFIG, f"dpi={OCR_TARGET_DPI}", f"max={OCR_MAX_SIDE}", f"pre={PREPROCESS_VERSION}"]
+    )
+
+
+def file_stat(path: str) -> Tuple[int, float]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime
+
+
+def content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+
+class OcrPool:
+    def __init__(
+        self,
+        workers: int = OCR_WORKERS,
+        timeout: float = OCR_TIMEOUT,
+        job: Callable[[str, float], OcrResult] = ocr_image_file,
+        grace: float = POOL_GRACE_SECONDS,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.job = job
+        self.grace = grace
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(OCR_START_METHOD)
+                )
+                # Start every worker now, so interpreter start-up under
+                # spawn/forkserver is not charged to the first documents' timeouts.
+                for started in [executor.submit(os.getpid) for _ in range(self.workers)]:
+                    started.result(timeout=POOL_START_TIMEOUT)
+                self._executor = executor
+            return self._executor
+
+    def _reset(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # A hung worker cannot be cancelled individually; kill the pool.
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def run_many(self, paths: Iterable[str]) -> Dict[str, OcrResult]:
+        paths = list(dict.fromkeys(paths))
+        if self.workers <= 0:
+            return {path: self.job(path, self.timeout) for path in paths}
+
+        results: Dict[str, OcrResult] = {}
+        pending = paths
+        while pending:
+            pending = self._run_round(pending, results)
+        return results
+
+    def _run_round(self, paths: List[str], results: Dict[str, OcrResult]) -> List[str]:
+        """Submit `paths` at once and collect them in order.
+
+        When a job hangs or kills its worker, that path gets an error and the
+        pool is replaced; paths that had not finished yet are returned to be
+        submitted together to the fresh pool.
+        """
+        pool = self._pool()
+        futures: Dict[str, Future] = {path: pool.submit(self.job, path, self.timeout) for path in paths}
+        for index, (path, future) in enumerate(futures.items()):
+            try:
+                results[path] = future.result(timeout=self.timeout + self.grace)
+                continue
+            except FutureTimeoutError:
+                logger.warning("OCR timed out after %.0fs for %s; restarting OCR pool", self.timeout, path)
+                results[path] = OcrResult(error="timeout")
+            except Exception as exc:
+                # e.g. BrokenProcessPool after a worker crash
+                logger.warning("OCR worker failed for %s: %s", path, exc)
+                results[path] = OcrResult(error=f"{type(exc).__name__}: {exc}")
+            self._reset()
+            remaining = []
+            for rest, other in list(futures.items())[index + 1:]:
+                # Jobs that finished before the reset keep their results.
+                if other.done() and not other.cancelled() and other.exception() is None:
+                    results[rest] = other.result()
+                else:
+                    remaining.append(rest)
+            return remaining
+        return []
+
+    def run(self, path: str) -> OcrResult:
+        return self.run_many([path])[path]
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_pool: Optional[OcrPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> OcrPool:
+    """Return the process-wide OCR pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OcrPool()
+        return _pool
+
+
+__all__ = [
+    "OcrPool",
+    "OcrResult",
+    "get_ocr_pool",
+    "ocr_image",
+    "ocr_image_file",
+    "ocr_document",
+    "iter_pages",
+    "preprocess",
+    "estimate_skew",
+    "ocr_version",
+    "file_stat",
+    "content_hash",
+]
@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime, timezone
 from typing import Literal
 
@@ -7,12 +8,19 @@ from .db import Provider, ValidationRun
 from .agents import (
     DataValidationAgent,
     InformationEnrichmentAgent,
-    extract_from_pdf,
-    qa_evaluate,
+    extract_from_pdfs,
+    ocr_candidates,
+    qa_evaluate_batch,
     apply_updates,
 )
+from .enrichment_store import save_enrichments
+from .search import index_providers
+from .stats_snapshot import refresh_stats
+from .llm.response_cache import LLM_CACHE_ENABLED, get_response_cache
 from .pcs_drift import recompute_pcs_for_all, recompute_drift_for_all
 
+logger = logging.getLogger(__name__)
+
 
 BatchType = Literal["daily", "weekly", "onboarding"]
 
@@ -51,25 +59,49 @@ def run_batch(db: Session, batch_type: BatchType = "daily", limit: int = 200) ->
     validation_agent = DataValidationAgent()
     enrichment_agent = InformationEnrichmentAgent()
 
+    # One batched reconciliation pass for the whole run instead of an LLM
+    # round-trip per provider field.
+    validations = validation_agent.validate_providers(db, [p.id for p in providers])
+
+    # License scans are OCR'd in parallel on the OCR process pool; the
+    # license number and expiry parsed from them vote in QA as "ocr".
+    ocr_data = extract_from_pdfs(db, [p.id for p in providers])
+
+    qa_items = []
+    enrichments = []
     for provider in providers:
-        validation = validation_agent.validate_provider(db, provider.id)
-        ocr_data = extract_from_pdf(db, provider.id)
+        validation = validations[provider.id]
         enrichment = enrichment_agent.enrich_provider(db, provider.id)
+        enrichments.append((provider, enrichment))
 
         serialized_candidates = _serialize_candidates(validation.raw_evidence.get("candidates", {}))
-        decisions = qa_evaluate(
-            db,
-            provider.id,
-            {
-                "candidates": serialized_candidates,
-                "validated_fields": validation.validated_fields,
-            },
-            enrichment.enriched_fields,
+        for field, extra in ocr_candidates(ocr_data.get(provider.id, {})).items():
+            serialized_candidates.setdefault(field, []).extend(extra)
+        qa_items.append(
+            (
+                provider.id,
+                {
+                    "candidates": serialized_candidates,
+                    "validated_fields": validation.validated_fields,
+                },
+                enrichment.enriched_fields,
+            )
         )
-        res = apply_updates(db, provider.id, decisions)
+
+    # Detail pages serve these instead of re-running enrichment; they are
+    # committed together with the QA results.
+    save_enrichments(db, enrichments, enrichment_agent.llm_enabled)
+
+    # QA scores the whole run in one pass and writes confidences in bulk.
+    all_decisions = qa_evaluate_batch(db, qa_items)
+    for provider in providers:
+        res = apply_updates(db, provider.id, all_decisions[provider.id])
         auto_updates += res["auto_updates"]
         manual_reviews += res["manual_reviews"]
 
+    # Updated fields and fresh enrichment become searchable with this run.
+    index_providers(db, [p.id for p in providers])
+
     recompute_pcs_for_all(db)
     recompute_drift_for_all(db)
 
@@ -77,6 +109,10 @@ def run_batch(db: Session, batch_type: BatchType = "daily", limit: int = 200) ->
     run.auto_updates = auto_updates
     run.manual_reviews = manual_reviews
     run.finished_at = datetime.now(timezone.utc)
+    refresh_stats(db)
     db.commit()
     db.refresh(run)
+
+    if LLM_CACHE_ENABLED and validation_agent.llm_enabled:
+        logger.info("LLM response cache after run %s: %s", run.id, get_response_cache().stats())
     return run
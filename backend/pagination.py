@@ -0,0 +1,152 @@
+"""
+Keyset (cursor) pagination.
+
+A page is requested with the opaque cursor returned by the previous page
+instead of an offset, and the next page starts with a `WHERE` on the sort
+key of the last row seen. Each page is an index range scan, however deep
+into the result it is, and rows inserted or re-scored between requests do
+not shift later pages.
+
+Cursors are URL-safe base64 JSON of `{"s": sort, "k": [value, id]}`; the
+sort is recorded so a cursor cannot be replayed against another ordering.
+Sort values may be NULL (a provider that was never scored). NULL sorts
+lowest, as in SQLite: ascending pages list unscored rows first, descending
+pages list them last.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """Order by `column`, ties broken by `tiebreak`, in one direction.
+
+    `tiebreak` should be the second column of an index on `column` so the
+    ordering is read off that index. Rows where `column` is NULL (typically
+    the unmatched side of an outer join) are ordered by `null_tiebreak`;
+    keys that cannot be NULL skip that segment.
+    """
+
+    column: ColumnElement
+    tiebreak: ColumnElement
+    descending: bool = False
+    null_tiebreak: Optional[ColumnElement] = None
+    nullable: bool = True
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    raw = json.dumps({"s": sort, "k": [value, last_id]}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value, last_id = payload["k"]
+        if payload["s"] != sort or not isinstance(last_id, int):
+            raise InvalidCursor("cursor does not belong to this sort order")
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise InvalidCursor("malformed cursor") from exc
+    return value, last_id
+
+
+def _segments(key: SortKey) -> List[bool]:
+    """The NULL / non-NULL segments of the key, in page order (True = NULL)."""
+    if not key.nullable:
+        return [False]
+    return [False, True] if key.descending else [True, False]
+
+
+def _segment_query(query: Query, key: SortKey, is_null: bool, after: Optional[Tuple[Any, int]]) -> Query:
+    # Each segment is queried separately: mixing the two in one ORDER BY
+    # would stop SQLite from reading the non-NULL rows off the index.
+    if is_null:
+        tiebreak = key.null_tiebreak if key.null_tiebreak is not None else key.tiebreak
+        query = query.filter(key.column.is_(None))
+        if after is not None:
+            query = query.filter(tiebreak < after[1] if key.descending else tiebreak > after[1])
+        return query.order_by(tiebreak.desc() if key.descending else tiebreak.asc())
+
+    column, tiebreak = key.column, key.tiebreak
+    if key.nullable:
+        query = query.filter(column.isnot(None))
+    if column is tiebreak:  # sorting by a unique id alone
+        if after is not None:
+            query = query.filter(column < after[1] if key.descending else column > after[1])
+        return query.order_by(column.desc() if key.descending else column.asc())
+    if after is not None:
+        value, last_id = after
+        if key.descending:
+            query = query.filter(or_(column < value, and_(column == value, tiebreak < last_id)))
+        else:
+            query = query.filter(or_(column > value, and_(column == value, tiebreak > last_id)))
+    if key.descending:
+        return query.order_by(column.desc(), tiebreak.desc())
+    return query.order_by(column.asc(), tiebreak.asc())
+
+
+def paginate(
+    query: Query,
+    key: SortKey,
+    sort: str,
+    cursor: Optional[str],
+    limit: int,
+    value_of: Callable[[Any], Any],
+    id_of: Callable[[Any], int],
+) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page of `query`; returns the rows and the next cursor (None on the last page).
+
+    `value_of` and `id_of` read the sort value and tiebreak id from a row.
+    One row beyond the page is fetched to tell whether another page exists.
+    """
+    segments = _segments(key)
+    after: Optional[Tuple[Any, int]] = None
+    if cursor:
+        after = decode_cursor(cursor, sort)
+        if after[0] is None and not key.nullable:
+            raise InvalidCursor("malformed cursor")
+        segments = segments[segments.index(after[0] is None):]
+
+    rows: List[Any] = []
+    for is_null in segments:
+        rows += _segment_query(query, key, is_null, after).limit(limit + 1 - len(rows)).all()
+        if len(rows) > limit:
+            break
+        after = None  # the next segment starts from its beginning
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort, value_of(last), id_of(last))
+
+
+__all__ = [
+    "DEFAULT_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
+    "InvalidCursor",
+    "SortKey",
+    "encode_cursor",
+    "decode_cursor",
+    "paginate",
+]
@@ -0,0 +1,193 @@
+"""
+Manual review queue: paging, leases and batched decisions.
+
+Reviewers claim pending items for `MANUAL_REVIEW_LEASE_SECONDS`. A claim
+is one conditional UPDATE that takes the oldest items that are unleased,
+whose lease expired, or that the same reviewer already holds, so
+concurrent reviewers receive disjoint work. An abandoned lease simply
+runs out.
+
+Decisions go through the same kind of compare-and-set: an item changes
+status only while it is still pending and not leased to someone else. The
+provider updates, their search index rows and the audit rows for a whole
+batch are written in one transaction, so a bulk approve of hundreds of
+items costs one commit.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, or_, select, update
+from sqlalchemy.orm import Session
+
+from .db import AuditLog, ManualReviewItem, Provider
+from .pagination import SortKey, paginate
+from .search import index_providers
+from .stats_snapshot import refresh_review_counts
+
+logger = logging.getLogger(__name__)
+
+MANUAL_REVIEW_LEASE = timedelta(seconds=float(os.getenv("MANUAL_REVIEW_LEASE_SECONDS", "900")))
+MAX_CLAIM = 100
+MAX_BULK = 1000
+DEFAULT_ACTOR = "human_reviewer"
+STATUSES = ["pending", "approved", "overridden", "rejected"]
+
+# action -> (item status, audit action)
+ACTIONS = {
+    "approve": ("approved", "manual_approve"),
+    "override": ("overridden", "manual_override"),
+    "reject": ("rejected", "manual_reject"),
+}
+
+_QUEUE_ORDER = SortKey(ManualReviewItem.id, ManualReviewItem.id, nullable=False)
+
+
+def _available(now: datetime, reviewer: Optional[str] = None):
+    """Pending items nobody else holds a live lease on."""
+    free = or_(ManualReviewItem.lease_expires_at.is_(None), ManualReviewItem.lease_expires_at <= now)
+    if reviewer:
+        free = or_(free, ManualReviewItem.claimed_by == reviewer)
+    return and_(ManualReviewItem.status == "pending", free)
+
+
+def list_items(db: Session, status: Optional[str], cursor: Optional[str], limit: int):
+    """Oldest-first page of the queue, optionally for one status."""
+    query = db.query(ManualReviewItem)
+    if status is not None:
+        query = query.filter(ManualReviewItem.status == status)
+    return paginate(
+        query,
+        _QUEUE_ORDER,
+        status or "all",
+        cursor,
+        limit,
+        value_of=lambda item: item.id,
+        id_of=lambda item: item.id,
+    )
+
+
+def claim_items(
+    db: Session, reviewer: str, limit: int, lease: timedelta = MANUAL_REVIEW_LEASE
+) -> List[ManualReviewItem]:
+    """Lease up to `limit` available items (renewing ones already held) and commit."""
+    now = datetime.now(timezone.utc)
+    token = uuid.uuid4().hex
+    candidates = (
+        select(ManualReviewItem.id)
+        .where(_available(now, reviewer))
+        .order_by(ManualReviewItem.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(ManualReviewItem)
+        .where(ManualReviewItem.id.in_(candidates), _available(now, reviewer))
+        .values(claimed_by=reviewer, lease_token=token, lease_expires_at=now + lease),
+        # Leases are not part of any provider view.
+        execution_options={"synchronize_session": False, "changed_providers": ()},
+    )
+    db.commit()
+    return (
+        db.query(ManualReviewItem)
+        .filter(ManualReviewItem.lease_token == token)
+        .order_by(ManualReviewItem.id)
+        .all()
+    )
+
+
+def decide(
+    db: Session,
+    item_ids: Iterable[int],
+    action: str,
+    reviewer: Optional[str] = None,
+    value: Optional[str] = None,
+) -> Tuple[List[int], List[int]]:
+    """Apply one decision to many items in one transaction and commit.
+
+    Returns the ids that were decided and those that were skipped: missing, no
+    longer pending, leased to another reviewer or, for approve/override,
+    whose provider no longer exists.
+    """
+    status, audit_action = ACTIONS[action]
+    ids = list(dict.fromkeys(item_ids))
+    now = datetime.now(timezone.utc)
+
+    conditions = [ManualReviewItem.id.in_(ids), _available(now, reviewer)]
+    if action != "reject":
+        conditions.append(exists().where(Provider.id == ManualReviewItem.provider_id))
+    decided_ids = set(
+        db.execute(
+            update(ManualReviewItem)
+            .where(*conditions)
+            .values(status=status, claimed_by=None, lease_token=None, lease_expires_at=None)
+            .returning(ManualReviewItem.id),
+            # Provider changes below are flushed as ORM objects and tracked there.
+            execution_options={"synchronize_session": False, "changed_providers": ()},
+        ).scalars()
+    )
+    items = (
+        db.query(ManualReviewItem)
+        .filter(ManualReviewItem.id.in_(decided_ids))
+        .order_by(ManualReviewItem.id)
+        .populate_existing()
+        .all()
+        if decided_ids
+        else []
+    )
+    providers = (
+        {p.id: p for p in db.query(Provider).filter(Provider.id.in_({i.provider_id for i in items}))}
+        if items and action != "reject"
+        else {}
+    )
+
+    actor = reviewer or DEFAULT_ACTOR
+    audit_rows = []
+    for item in items:
+        if action == "reject":
+            # Rejecting keeps the current value.
+            old = new = item.current_value
+        else:
+            provider = providers[item.provider_id]
+            new = item.suggested_value if action == "approve" else value
+            current = getattr(provider, item.field_name)
+            old = str(current) if current is not None else None
+            setattr(provider, item.field_name, new)
+            new = str(new) if new is not None else None
+        audit_rows.append(
+            AuditLog(
+                provider_id=item.provider_id,
+                field_name=item.field_name,
+                old_value=old,
+                new_value=new,
+                action=audit_action,
+                actor=actor,
+            )
+        )
+    db.add_all(audit_rows)
+    # Approved and overridden values (address, specialty, ...) are searchable.
+    index_providers(db, list(providers))
+    refresh_review_counts(db)
+    db.commit()
+
+    skipped = [i for i in ids if i not in decided_ids]
+    if skipped:
+        logger.info("%s skipped %d review items: %s", action, len(skipped), skipped[:20])
+    return [i for i in ids if i in decided_ids], skipped
+
+
+__all__ = [
+    "MANUAL_REVIEW_LEASE",
+    "MAX_CLAIM",
+    "MAX_BULK",
+    "STATUSES",
+    "ACTIONS",
+    "list_items",
+    "claim_items",
+    "decide",
+]
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session, selectinload
+
+from ..db import get_db, DuplicateCluster, DuplicateClusterMember, Provider
+from ..dedup import detect_duplicates
+
+router = APIRouter(prefix="/duplicates", tags=["duplicates"])
+
+
+@router.get("")
+async def list_duplicate_clusters(min_score: float = 0.0, limit: int = 100, db: Session = Depends(get_db)):
+    clusters = (
+        db.query(DuplicateCluster)
+        .options(selectinload(DuplicateCluster.members))
+        .filter(DuplicateCluster.score >= min_score)
+        .order_by(DuplicateCluster.score.desc(), DuplicateCluster.id)
+        .limit(min(max(limit, 1), 500))
+        .all()
+    )
+    provider_ids = {m.provider_id for c in clusters for m in c.members}
+    providers = {p.id: p for p in db.query(Provider).filter(Provider.id.in_(provider_ids))} if provider_ids else {}
+
+    def member(m: DuplicateClusterMember) -> dict:
+        p = providers.get(m.provider_id)
+        return {
+            "provider_id": m.provider_id,
+            "score": m.score,
+            "external_id": p.external_id if p else None,
+            "name": p.name if p else None,
+            "phone": p.phone if p else None,
+            "address": p.address if p else None,
+        }
+
+    return [
+        {
+            "id": c.id,
+            "score": c.score,
+            "size": c.size,
+            "reasons": c.reasons,
+            "created_at": c.created_at,
+            "members": [member(m) for m in c.members],
+        }
+        for c in clusters
+    ]
+
+
+@router.post("/run")
+def run_duplicate_detection(db: Session = Depends(get_db)):
+    return detect_duplicates(db)
@@ -1,101 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from ..db import get_db, ManualReviewItem, Provider, AuditLog
+from ..db import get_db, ManualReviewItem, Provider
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from ..review_queue import MAX_BULK, MAX_CLAIM, claim_items, decide, list_items
 
 router = APIRouter(prefix="/manual-review", tags=["manual_review"])
 
 
-@router.get("")
-async def list_manual_review(db: Session = Depends(get_db)):
-    items = db.query(ManualReviewItem).order_by(ManualReviewItem.created_at.desc()).all()
-    return [
-        {
-            "id": i.id,
-            "provider_id": i.provider_id,
-            "field_name": i.field_name,
-            "current_value": i.current_value,
-            "suggested_value": i.suggested_value,
-            "reason": i.reason,
-            "status": i.status,
-            "created_at": i.created_at,
-        }
-        for i in items
-    ]
+class BulkDecision(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK)
+    reviewer: Optional[str] = None
 
 
-@router.post("/{item_id}/approve")
-async def approve_manual_review(item_id: int, db: Session = Depends(get_db)):
+def _item(i: ManualReviewItem):
+    return {
+        "id": i.id,
+        "provider_id": i.provider_id,
+        "field_name": i.field_name,
+        "current_value": i.current_value,
+        "suggested_value": i.suggested_value,
+        "reason": i.reason,
+        "status": i.status,
+        "created_at": i.created_at,
+        "claimed_by": i.claimed_by,
+        "lease_expires_at": i.lease_expires_at,
+    }
+
+
+@router.get("")
+async def list_manual_review(
+    status: str = Query("pending", pattern="^(pending|approved|overridden|rejected|all)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    try:
+        items, next_cursor = list_items(db, None if status == "all" else status, cursor, limit)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": [_item(i) for i in items], "next_cursor": next_cursor}
+
+
+@router.post("/claim")
+async def claim_manual_review(
+    reviewer: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=MAX_CLAIM),
+    db: Session = Depends(get_db),
+):
+    """Lease a batch of pending items to one reviewer; others will not be handed them."""
+    return {"items": [_item(i) for i in claim_items(db, reviewer, limit)]}
+
+
+@router.post("/bulk/approve")
+async def bulk_approve(payload: BulkDecision, db: Session = Depends(get_db)):
+    applied, skipped = decide(db, payload.ids, "approve", payload.reviewer)
+    return {"applied": applied, "skipped": skipped}
+
+
+@router.post("/bulk/reject")
+async def bulk_reject(payload: BulkDecision, db: Session = Depends(get_db)):
+    applied, skipped = decide(db, payload.ids, "reject", payload.reviewer)
+    return {"applied": applied, "skipped": skipped}
+
+
+def _decide_one(db: Session, item_id: int, action: str, reviewer: Optional[str], value: Optional[str] = None):
     item = db.get(ManualReviewItem, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    provider = db.get(Provider, item.provider_id)
-    if not provider:
+    if action != "reject" and not db.get(Provider, item.provider_id):
         raise HTTPException(status_code=404, detail="Provider not found")
-
-    old = getattr(provider, item.field_name)
-    setattr(provider, item.field_name, item.suggested_value)
-    item.status = "approved"
-
-    log = AuditLog(
-        provider_id=provider.id,
-        field_name=item.field_name,
-        old_value=str(old) if old is not None else None,
-        new_value=str(item.suggested_value) if item.suggested_value is not None else None,
-        action="manual_approve",
-        actor="human_reviewer",
-    )
-    db.add(log)
-    db.commit()
-
+    applied, _ = decide(db, [item_id], action, reviewer, value)
+    if not applied:
+        raise HTTPException(status_code=409, detail="Item was already decided or is claimed by another reviewer")
     return {"status": "ok"}
 
 
-@router.post("/{item_id}/override")
-async def override_manual_review(item_id: int, value: str, db: Session = Depends(get_db)):
-    item = db.get(ManualReviewItem, item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    provider = db.get(Provider, item.provider_id)
-    if not provider:
-        raise HTTPException(status_code=404, detail="Provider not found")
+@router.post("/{item_id}/approve")
+async def approve_manual_review(item_id: int, reviewer: Optional[str] = None, db: Session = Depends(get_db)):
+    return _decide_one(db, item_id, "approve", reviewer)
 
-    old = getattr(provider, item.field_name)
-    setattr(provider, item.field_name, value)
-    item.status = "overridden"
-
-    log = AuditLog(
-        provider_id=provider.id,
-        field_name=item.field_name,
-        old_value=str(old) if old is not None else None,
-        new_value=str(value) if value is not None else None,
-        action="manual_override",
-        actor="human_reviewer",
-    )
-    db.add(log)
-    db.commit()
 
-    return {"status": "ok"}
+@router.post("/{item_id}/override")
+async def override_manual_review(
+    item_id: int, value: str, reviewer: Optional[str] = None, db: Session = Depends(get_db)
+):
+    return _decide_one(db, item_id, "override", reviewer, value)
 
 
 @router.post("/{item_id}/reject")
-async def reject_manual_review(item_id: int, db: Session = Depends(get_db)):
-    item = db.query(ManualReviewItem).get(item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    # Rejecting means we keep the current value (or do nothing) and mark as rejected
-    item.status = "rejected"
-    
-    log = AuditLog(
-        provider_id=item.provider_id,
-        field_name=item.field_name,
-        old_value=item.current_value,
-        new_value=item.current_value, # No change
-        action="manual_reject",
-        actor="human_reviewer",
-    )
-    db.add(log)
-    db.commit()
-
-    return {"status": "ok"}
+async def reject_manual_review(item_id: int, reviewer: Optional[str] = None, db: Session = Depends(get_db)):
+    return _decide_one(db, item_id, "reject", reviewer)
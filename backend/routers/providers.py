@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
 
 from ..db import (
     get_db,
@@ -9,15 +12,77 @@ from ..db import (
     FieldConfidence,
     AuditLog,
     Document,
+    ProviderEnrichment,
+)
+from .. import document_store
+from ..document_store import (
+    UnsupportedDocumentType,
+    UploadTooLarge,
+    attach_document,
+    ocr_in_background,
+    store_stream,
 )
-from ..agents import InformationEnrichmentAgent
+from ..enrichment_store import (
+    claim_refresh,
+    current_fingerprint,
+    enrichment_payload,
+    is_stale,
+    refresh_in_background,
+)
+from ..http_cache import cached_json
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, SortKey, paginate
 
 router = APIRouter(prefix="/providers", tags=["providers"])
 
+HISTORY_PAGE_SIZE = 50
+
+
+@router.post("/{provider_id}/documents", status_code=201)
+async def upload_document(
+    provider_id: int,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    doc_type: str = "license",
+    db: Session = Depends(get_db),
+):
+    """Raw-body upload of a scan or PDF; the body is streamed to disk, never buffered whole."""
+    if not db.get(Provider, provider_id):
+        raise HTTPException(status_code=404, detail="Provider not found")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > document_store.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Document too large")
+
+    try:
+        stored = await store_stream(request.stream())
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except UnsupportedDocumentType as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+
+    doc, created = attach_document(db, provider_id, doc_type, stored)
+    if created:
+        background_tasks.add_task(ocr_in_background, doc.id)
+    else:
+        response.status_code = 200
+    return {
+        "document_id": doc.id,
+        "content_hash": stored.content_hash,
+        "size": stored.size,
+        "created": created,
+        "file_stored": stored.created,
+        "ocr_queued": created,
+    }
+
 
 @router.get("/{provider_id}/ocr")
 async def get_provider_ocr(provider_id: int, db: Session = Depends(get_db)):
-    doc = db.query(Document).filter(Document.provider_id == provider_id).first()
+    doc = (
+        db.query(Document)
+        .filter(Document.provider_id == provider_id)
+        .order_by(Document.id.desc())
+        .first()
+    )
     if not doc:
         return {"exists": False}
     return {
@@ -25,12 +90,20 @@ async def get_provider_ocr(provider_id: int, db: Session = Depends(get_db)):
         "doc_type": doc.doc_type,
         "ocr_text": doc.ocr_text,
         "ocr_confidence": doc.ocr_confidence,
+        "ocr_page": doc.ocr_page,
+        "page_confidences": doc.ocr_page_confidences or [],
         "path": doc.path
     }
 
 
 @router.get("/{provider_id}/details")
-async def get_provider_details(provider_id: int, db: Session = Depends(get_db)):
+async def get_provider_details(
+    provider_id: int, request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
+    return cached_json(request, lambda: _provider_details(db, provider_id, background_tasks), provider_id)
+
+
+def _provider_details(db: Session, provider_id: int, background_tasks: BackgroundTasks):
     # This endpoint aggregates everything for the detail page
     provider = db.get(Provider, provider_id)
     if not provider:
@@ -48,16 +121,12 @@ async def get_provider_details(provider_id: int, db: Session = Depends(get_db)):
             "sources": c.sources  # list of source names like ["npi", "maps"]
         }
 
-    # On-demand enrichment summary (non-persistent) to show in UI
-    enrichment_agent = InformationEnrichmentAgent()
-    enrichment_result = enrichment_agent.enrich_provider(db, provider.id)
-    enrichment_payload = {
-        "summary": enrichment_result.enriched_fields.get("summary"),
-        "certifications": enrichment_result.enriched_fields.get("certifications"),
-        "affiliations": enrichment_result.enriched_fields.get("affiliations"),
-        "education": enrichment_result.enriched_fields.get("education"),
-        "secondary_specialties": enrichment_result.enriched_fields.get("secondary_specialties"),
-    }
+    # Stored enrichment; a missing or stale row is refreshed after the
+    # response is sent instead of calling the LLM on the page view.
+    enrichment = db.query(ProviderEnrichment).filter(ProviderEnrichment.provider_id == provider.id).first()
+    stale = is_stale(enrichment, current_fingerprint(provider))
+    if stale and claim_refresh(provider.id):
+        background_tasks.add_task(refresh_in_background, provider.id)
 
     return {
         "provider": {
@@ -89,43 +158,131 @@ async def get_provider_details(provider_id: int, db: Session = Depends(get_db)):
             "bucket": drift.bucket if drift else "Low",
             "explanation": "High drift detected due to license expiry proximity." if drift and drift.bucket == "High" else "Stable data patterns."
         } if drift else None,
-        "enrichment": enrichment_payload,
+        "enrichment": enrichment_payload(enrichment, stale),
     }
 
 
+PROVIDER_SORTS = {
+    "id": SortKey(Provider.id, Provider.id, nullable=False),
+    "pcs": SortKey(ProviderScore.pcs, ProviderScore.provider_id, null_tiebreak=Provider.id),
+    "-pcs": SortKey(ProviderScore.pcs, ProviderScore.provider_id, descending=True, null_tiebreak=Provider.id),
+    "drift": SortKey(DriftScore.score, DriftScore.provider_id, null_tiebreak=Provider.id),
+    "-drift": SortKey(DriftScore.score, DriftScore.provider_id, descending=True, null_tiebreak=Provider.id),
+}
+_SORT_VALUE = {
+    "id": lambda row: row[0].id,
+    "pcs": lambda row: row[1].pcs if row[1] else None,
+    "drift": lambda row: row[2].score if row[2] else None,
+}
+
+
 @router.get("")
-def list_providers(db: Session = Depends(get_db)):
-    rows = (
+def list_providers(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    sort: str = Query("id", pattern="^(id|-?pcs|-?drift)$"),
+    pcs_band: Optional[List[str]] = Query(None),
+    drift_bucket: Optional[List[str]] = Query(None),
+    specialty: Optional[str] = None,
+    verified_after: Optional[datetime] = None,
+    verified_before: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+):
+    """One page of providers; pass `next_cursor` back as `cursor` for the next one."""
+    return cached_json(
+        request,
+        lambda: provider_page(
+            db,
+            cursor=cursor,
+            limit=limit,
+            sort=sort,
+            pcs_band=pcs_band,
+            drift_bucket=drift_bucket,
+            specialty=specialty,
+            verified_after=verified_after,
+            verified_before=verified_before,
+        ),
+    )
+
+
+def provider_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    sort: str = "id",
+    pcs_band: Optional[List[str]] = None,
+    drift_bucket: Optional[List[str]] = None,
+    specialty: Optional[str] = None,
+    verified_after: Optional[datetime] = None,
+    verified_before: Optional[datetime] = None,
+):
+    query = (
         db.query(Provider, ProviderScore, DriftScore)
         .outerjoin(ProviderScore, ProviderScore.provider_id == Provider.id)
         .outerjoin(DriftScore, DriftScore.provider_id == Provider.id)
-        .all()
     )
-    return [
-        {
-            "id": provider.id,
-            "external_id": provider.external_id,
-            "name": provider.name,
-            "specialty": provider.specialty,
-            "phone": provider.phone,
-            "address": provider.address,
-            "pcs": score.pcs if score else None,
-            "pcs_band": score.band if score else None,
-            "drift_score": drift.score if drift else None,
-            "drift_bucket": drift.bucket if drift else None,
-        }
-        for (provider, score, drift) in rows
-    ]
+    if pcs_band:
+        query = query.filter(ProviderScore.band.in_(pcs_band))
+    if drift_bucket:
+        query = query.filter(DriftScore.bucket.in_(drift_bucket))
+    if specialty:
+        query = query.filter(Provider.specialty == specialty)
+    if verified_after:
+        query = query.filter(Provider.last_verified_at >= verified_after)
+    if verified_before:
+        query = query.filter(Provider.last_verified_at < verified_before)
+
+    try:
+        rows, next_cursor = paginate(
+            query,
+            PROVIDER_SORTS[sort],
+            sort,
+            cursor,
+            limit,
+            value_of=_SORT_VALUE[sort.lstrip("-")],
+            id_of=lambda row: row[0].id,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    return {
+        "items": [
+            {
+                "id": provider.id,
+                "external_id": provider.external_id,
+                "name": provider.name,
+                "specialty": provider.specialty,
+                "phone": provider.phone,
+                "address": provider.address,
+                "last_verified_at": provider.last_verified_at,
+                "pcs": score.pcs if score else None,
+                "pcs_band": score.band if score else None,
+                "drift_score": drift.score if drift else None,
+                "drift_bucket": drift.bucket if drift else None,
+            }
+            for (provider, score, drift) in rows
+        ],
+        "next_cursor": next_cursor,
+    }
 
 
 @router.get("/{provider_id}")
-async def get_provider(provider_id: int, db: Session = Depends(get_db)):
-    provider = db.query(Provider).get(provider_id)
+async def get_provider(provider_id: int, request: Request, db: Session = Depends(get_db)):
+    return cached_json(request, lambda: _provider(db, provider_id), provider_id)
+
+
+def _provider(db: Session, provider_id: int):
+    # Score and drift are one-to-one: join them in instead of querying each.
+    provider = (
+        db.query(Provider)
+        .options(joinedload(Provider.scores), joinedload(Provider.drift))
+        .filter(Provider.id == provider_id)
+        .one_or_none()
+    )
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
-    score = db.query(ProviderScore).filter(ProviderScore.provider_id == provider.id).first()
-    drift = db.query(DriftScore).filter(DriftScore.provider_id == provider.id).first()
-    logs = db.query(AuditLog).filter(AuditLog.provider_id == provider.id).order_by(AuditLog.created_at.desc()).all()
+    score, drift = provider.scores, provider.drift
     return {
         "id": provider.id,
         "external_id": provider.external_id,
@@ -138,23 +295,58 @@ async def get_provider(provider_id: int, db: Session = Depends(get_db)):
         "affiliations": provider.affiliations,
         "last_verified_at": provider.last_verified_at,
         "score": {
-            "pcs": score.pcs if score else None,
-            "band": score.band if score else None,
-            "srm": score.srm if score else None,
-            "fr": score.fr if score else None,
-            "st": score.st if score else None,
-            "mb": score.mb if score else None,
-            "dq": score.dq if score else None,
-            "rp": score.rp if score else None,
-            "lh": score.lh if score else None,
-            "ha": score.ha if score else None,
+            "pcs": score.pcs,
+            "band": score.band,
+            "srm": score.srm,
+            "fr": score.fr,
+            "st": score.st,
+            "mb": score.mb,
+            "dq": score.dq,
+            "rp": score.rp,
+            "lh": score.lh,
+            "ha": score.ha,
         } if score else None,
         "drift": {
-            "score": drift.score if drift else None,
-            "bucket": drift.bucket if drift else None,
-            "recommended_next_check_days": drift.recommended_next_check_days if drift else None,
+            "score": drift.score,
+            "bucket": drift.bucket,
+            "recommended_next_check_days": drift.recommended_next_check_days,
         } if drift else None,
-        "audit_log": [
+    }
+
+
+def _history_page(db: Session, model, provider_id: int, cursor: Optional[str], limit: int):
+    """Newest-first page of a provider's rows in a history table."""
+    if db.get(Provider, provider_id) is None:
+        raise HTTPException(status_code=404, detail="Provider not found")
+    try:
+        return paginate(
+            db.query(model).filter(model.provider_id == provider_id),
+            SortKey(model.id, model.id, descending=True, nullable=False),
+            "history",
+            cursor,
+            limit,
+            value_of=lambda row: row.id,
+            id_of=lambda row: row.id,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/{provider_id}/audit")
+async def get_provider_audit(
+    provider_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    return cached_json(request, lambda: _provider_audit(db, provider_id, cursor, limit), provider_id)
+
+
+def _provider_audit(db: Session, provider_id: int, cursor: Optional[str], limit: int):
+    logs, next_cursor = _history_page(db, AuditLog, provider_id, cursor, limit)
+    return {
+        "items": [
             {
                 "field_name": l.field_name,
                 "old_value": l.old_value,
@@ -165,28 +357,32 @@ async def get_provider(provider_id: int, db: Session = Depends(get_db)):
             }
             for l in logs
         ],
+        "next_cursor": next_cursor,
     }
 
 
 @router.get("/{provider_id}/qa")
-async def get_provider_qa(provider_id: int, db: Session = Depends(get_db)):
-    provider = db.query(Provider).get(provider_id)
-    if not provider:
-        raise HTTPException(status_code=404, detail="Provider not found")
+async def get_provider_qa(
+    provider_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    return cached_json(request, lambda: _provider_qa(db, provider_id, cursor, limit), provider_id)
 
-    confs = (
-        db.query(FieldConfidence)
-        .filter(FieldConfidence.provider_id == provider.id)
-        .order_by(FieldConfidence.created_at.desc())
-        .all()
-    )
 
-    return [
-        {
-            "field_name": c.field_name,
-            "confidence": c.confidence,
-            "sources": c.sources,
-            "created_at": c.created_at,
-        }
-        for c in confs
-    ]
+def _provider_qa(db: Session, provider_id: int, cursor: Optional[str], limit: int):
+    confs, next_cursor = _history_page(db, FieldConfidence, provider_id, cursor, limit)
+    return {
+        "items": [
+            {
+                "field_name": c.field_name,
+                "confidence": c.confidence,
+                "sources": c.sources,
+                "created_at": c.created_at,
+            }
+            for c in confs
+        ],
+        "next_cursor": next_cursor,
+    }
@@ -5,30 +5,18 @@ from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from sqlalchemy.orm import Session
 
-from ..db import get_db, ValidationRun, ProviderScore, DriftScore
+from ..db import get_db
+from ..stats_snapshot import get_stats_snapshot
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
 @router.get("/latest", response_class=Response)
 async def latest_report(db: Session = Depends(get_db)) -> Response:
-    latest = (
-        db.query(ValidationRun)
-        .order_by(ValidationRun.started_at.desc())
-        .first()
-    )
-
-    scores = db.query(ProviderScore).all()
-    drifts = db.query(DriftScore).all()
-
-    avg_pcs = None
-    if scores:
-        avg_pcs = sum(s.pcs for s in scores) / len(scores)
-
-    drift_dist = {"Low": 0, "Medium": 0, "High": 0}
-    for d in drifts:
-        if d.bucket in drift_dist:
-            drift_dist[d.bucket] += 1
+    snapshot = get_stats_snapshot(db)
+    latest = snapshot.latest_run if snapshot.latest_run["id"] is not None else None
+    avg_pcs = snapshot.avg_pcs
+    drift_dist = snapshot.drift_distribution
 
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
@@ -41,9 +29,9 @@ async def latest_report(db: Session = Depends(get_db)) -> Response:
 
     c.setFont("Helvetica", 11)
     if latest:
-        c.drawString(40, y, f"Latest run ID: {latest.id} ({latest.run_type})")
+        c.drawString(40, y, f"Latest run ID: {latest['id']} ({latest['type']})")
         y -= 18
-        c.drawString(40, y, f"Processed: {latest.count_processed} | Auto-updates: {latest.auto_updates} | Manual reviews: {latest.manual_reviews}")
+        c.drawString(40, y, f"Processed: {latest['count_processed']} | Auto-updates: {latest['auto_updates']} | Manual reviews: {latest['manual_reviews']}")
         y -= 18
     else:
         c.drawString(40, y, "No runs yet.")
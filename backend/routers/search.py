@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..search import MAX_LIMIT, rebuild_search_index, search_providers
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("")
+def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    return {"query": q, "results": search_providers(db, q, limit=limit, offset=offset)}
+
+
+@router.post("/reindex")
+def reindex(db: Session = Depends(get_db)):
+    return {"indexed": rebuild_search_index(db)}
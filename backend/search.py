@@ -0,0 +1,308 @@
+"""
+Full-text provider search.
+
+`provider_search` is an SQLite FTS5 table keyed by provider id (its rowid)
+with one column per kind of text: name, specialty, location (the provider's
+and the directory's addresses), directory (hospital directory bio, about and
+services) and enrichment (stored summaries, certifications, affiliations and
+secondary specialties). Porter stemming lets "pediatric" find "Pediatrics";
+bm25 with per-column weights ranks the results.
+
+Ranking scores every matching row before the LIMIT applies, so a very
+common word costs time in proportion to its matches (about 1 s for a word in
+every row of a 500k-provider index). `search_providers` therefore ranks at
+most `SEARCH_MAX_CANDIDATES` matches: when a query matches more, only the
+matches with the lowest provider ids are ranked (about 0.1 s for the same
+query with the default cap). Narrower queries are unaffected;
+`scripts/bench_search.py` measures both.
+
+`rebuild_search_index` streams every provider into the index;
+`index_providers` refreshes the rows of providers whose data changed. At
+startup `init_search_index` rebuilds the index when its row count differs
+from the providers table (a new database, or providers added outside the
+API). The hospital-directory fingerprint the directory column was built from
+is kept in `provider_search_meta`; when the directory file changes (hot
+reload, or between restarts) the rows of providers listed in the old or new
+file are rebuilt in the background.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from .db import Provider, ProviderEnrichment, SessionLocal
+from .external.source_store import get_store
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+HOSPITAL_DIR = get_store("hospital_directory.json", DATA_DIR)
+
+SEARCH_TABLE = "provider_search"
+META_TABLE = "provider_search_meta"
+SEARCH_COLUMNS = ["name", "specialty", "location", "directory", "enrichment"]
+# bm25 weight per column, in SEARCH_COLUMNS order.
+COLUMN_WEIGHTS = [10.0, 5.0, 3.0, 1.0, 1.0]
+DIRECTORY_TEXT_KEYS = ["bio", "about", "services"]
+INDEX_BATCH = 2000
+MAX_LIMIT = 100
+# Most matches ranked per query; beyond this only the lowest provider ids are ranked.
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "5000"))
+
+_DIRECTORY_KEY = "hospital_directory"
+_QUERY_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _index_exists(db: Session) -> bool:
+    return (
+        db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": SEARCH_TABLE}
+        ).first()
+        is not None
+    )
+
+
+def ensure_search_index(db: Session) -> None:
+    """Create the FTS5 table and its ranking config if missing.
+
+    Runs on the session's own connection (SQLite allows one writer), so the
+    table is created and committed together with the caller's changes.
+    """
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)"))
+    if _index_exists(db):
+        return
+    db.execute(
+        text(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5({', '.join(SEARCH_COLUMNS)}, tokenize = 'porter unicode61')")
+    )
+    db.execute(
+        text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', :rank)"),
+        {"rank": f"bm25({', '.join(str(w) for w in COLUMN_WEIGHTS)})"},
+    )
+
+
+def _get_meta(db: Session, key: str) -> Optional[str]:
+    return db.execute(text(f"SELECT value FROM {META_TABLE} WHERE key = :key"), {"key": key}).scalar()
+
+
+def _set_meta(db: Session, key: str, value: Optional[str]) -> None:
+    db.execute(
+        text(f"INSERT OR REPLACE INTO {META_TABLE}(key, value) VALUES (:key, :value)"), {"key": key, "value": value}
+    )
+
+
+def init_search_index() -> None:
+    """Create the index, and fill it if it is out of step with the providers table."""
+    with SessionLocal() as db:
+        ensure_search_index(db)
+        indexed = db.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+        providers = db.query(func.count(Provider.id)).scalar()
+        if indexed != providers:
+            logger.info("Search index has %d of %d providers; rebuilding", indexed, providers)
+            rebuild_search_index(db)
+            return
+        refresh_directory_rows(db)
+        db.commit()
+
+
+def _join(values: Iterable[Any]) -> str:
+    parts = []
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(v) for v in value if v)
+        elif value:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+def search_document(provider: Provider, enrichment: Optional[ProviderEnrichment]) -> Dict[str, Any]:
+    entry = HOSPITAL_DIR.get(provider.external_id) or {}
+    fields = (enrichment.fields or {}) if enrichment else {}
+    return {
+        "rowid": provider.id,
+        "name": provider.name or "",
+        "specialty": _join([provider.specialty, entry.get("specialty")]),
+        "location": _join([provider.address, entry.get("address")]),
+        "directory": _join(entry.get(key) for key in DIRECTORY_TEXT_KEYS),
+        "enrichment": _join(
+            fields.get(key) for key in ("summary", "certifications", "affiliations", "secondary_specialties")
+        ),
+    }
+
+
+_INSERT = text(
+    f"INSERT INTO {SEARCH_TABLE}(rowid, {', '.join(SEARCH_COLUMNS)}) "
+    f"VALUES (:rowid, {', '.join(':' + c for c in SEARCH_COLUMNS)})"
+)
+
+
+def _provider_rows(db: Session, provider_ids: Optional[List[int]] = None):
+    query = db.query(Provider, ProviderEnrichment).outerjoin(
+        ProviderEnrichment, ProviderEnrichment.provider_id == Provider.id
+    )
+    if provider_ids is not None:
+        query = query.filter(Provider.id.in_(provider_ids))
+    return query.order_by(Provider.id).yield_per(INDEX_BATCH)
+
+
+def _insert_documents(db: Session, rows) -> int:
+    count, batch = 0, []
+    for provider, enrichment in rows:
+        batch.append(search_document(provider, enrichment))
+        if len(batch) >= INDEX_BATCH:
+            db.execute(_INSERT, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.execute(_INSERT, batch)
+        count += len(batch)
+    return count
+
+
+def rebuild_search_index(db: Session) -> int:
+    """Re-index every provider; returns the number of rows indexed."""
+    ensure_search_index(db)
+    directory_version = HOSPITAL_DIR.fingerprint
+    db.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    count = _insert_documents(db, _provider_rows(db))
+    _set_meta(db, _DIRECTORY_KEY, directory_version)
+    db.commit()
+    logger.info("Search index rebuilt with %d providers", count)
+    return count
+
+
+def index_providers(db: Session, provider_ids: List[int]) -> int:
+    """Replace the index rows of the given providers; the caller commits."""
+    if not provider_ids:
+        return 0
+    ensure_search_index(db)
+    ids = sorted(set(provider_ids))
+    for start in range(0, len(ids), INDEX_BATCH):
+        chunk = ids[start:start + INDEX_BATCH]
+        db.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({', '.join(str(int(i)) for i in chunk)})")
+        )
+    return _insert_documents(db, _provider_rows(db, ids))
+
+
+def refresh_directory_rows(db: Session) -> int:
+    """Re-index providers in the old or new hospital directory if it changed; the caller commits."""
+    ensure_search_index(db)
+    directory_version = HOSPITAL_DIR.fingerprint
+    if _get_meta(db, _DIRECTORY_KEY) == directory_version:
+        return 0
+    ids = set(
+        db.execute(text(f"SELECT rowid FROM {SEARCH_TABLE} WHERE directory != ''")).scalars()
+    )
+    external_ids = list(HOSPITAL_DIR.keys())
+    for start in range(0, len(external_ids), INDEX_BATCH):
+        chunk = external_ids[start:start + INDEX_BATCH]
+        ids.update(db.execute(select(Provider.id).where(Provider.external_id.in_(chunk))).scalars())
+    count = index_providers(db, list(ids))
+    _set_meta(db, _DIRECTORY_KEY, directory_version)
+    logger.info("Hospital directory changed; re-indexed %d providers", count)
+    return count
+
+
+def _refresh_directory_in_background() -> None:
+    try:
+        with SessionLocal() as db:
+            refresh_directory_rows(db)
+            db.commit()
+    except Exception as exc:
+        logger.warning("Re-indexing directory text failed: %s", exc)
+
+
+def _on_directory_reload(store) -> None:
+    # Runs inside whatever lookup noticed the change; do the work elsewhere.
+    threading.Thread(target=_refresh_directory_in_background, name="search-directory-reindex", daemon=True).start()
+
+
+HOSPITAL_DIR.add_reload_listener(_on_directory_reload)
+
+
+def fts_query(query: str) -> Optional[str]:
+    """Every word must match, as a prefix of the stemmed word.
+
+    Prefixes let "cardiology" (stem "cardiolog") find "cardiologist" and
+    partially typed names. Words are quoted, so user input cannot inject
+    FTS5 query syntax.
+    """
+    tokens = _QUERY_TOKEN.findall(query.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _candidate_bound(db: Session, match: str, cap: int) -> Optional[int]:
+    """Highest rowid among the first `cap` matches, or None if there are no more than `cap`.
+
+    An unranked MATCH walks the index in rowid order and stops at the LIMIT,
+    so this stays cheap however common the words are.
+    """
+    rowids = db.execute(
+        text(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match LIMIT :limit"),
+        {"match": match, "limit": cap + 1},
+    ).scalars().all()
+    if len(rowids) <= cap:
+        return None
+    return rowids[cap - 1]
+
+
+def search_providers(db: Session, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    match = fts_query(query)
+    if match is None or not _index_exists(db):
+        return []
+    limit, offset = min(max(limit, 1), MAX_LIMIT), max(offset, 0)
+    params: Dict[str, Any] = {"match": match, "limit": limit, "offset": offset}
+    bound = ""
+    last_rowid = _candidate_bound(db, match, max(SEARCH_MAX_CANDIDATES, offset + limit))
+    if last_rowid is not None:
+        bound = " AND rowid <= :last_rowid"
+        params["last_rowid"] = last_rowid
+    hits: List[Tuple[int, float, str]] = db.execute(
+        text(
+            f"SELECT rowid, rank, snippet({SEARCH_TABLE}, -1, '[', ']', '...', 12) "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match{bound} "
+            f"ORDER BY rank LIMIT :limit OFFSET :offset"
+        ),
+        params,
+    ).all()
+    providers = {p.id: p for p in db.query(Provider).filter(Provider.id.in_([h[0] for h in hits]))} if hits else {}
+
+    results = []
+    for provider_id, rank, snippet in hits:
+        provider = providers.get(provider_id)
+        if provider is None:
+            continue  # deleted since it was indexed
+        results.append(
+            {
+                "provider_id": provider_id,
+                "external_id": provider.external_id,
+                "name": provider.name,
+                "specialty": provider.specialty,
+                "address": provider.address,
+                # bm25 is lower-is-better; report higher-is-better.
+                "score": round(-rank, 4),
+                "snippet": snippet,
+            }
+        )
+    return results
+
+
+__all__ = [
+    "ensure_search_index",
+    "init_search_index",
+    "rebuild_search_index",
+    "index_providers",
+    "refresh_directory_rows",
+    "search_providers",
+    "fts_query",
+]
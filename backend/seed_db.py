@@ -9,6 +9,7 @@ from pathlib import Path
 from sqlalchemy.orm import Session
 
 from .db import init_db, SessionLocal, Provider, Document
+from .search import index_providers
 from .utils.npi import is_valid_npi
 
 
@@ -68,6 +69,8 @@ def seed_db(providers_csv: Path, documents_dir: Path) -> None:
             )
             db.add(doc)
 
+    # Make the seeded providers searchable straight away.
+    index_providers(db, [p.id for p in providers])
     db.commit()
     db.close()
 
@@ -0,0 +1,155 @@
+"""
+Materialized dashboard statistics.
+
+The dashboard, the PDF report and `scripts/metrics.py` show the same
+aggregates: PCS average and distribution, drift buckets, recent runs,
+pending reviews and OCR confidence. Rather than scanning the score tables on
+every request, `refresh_stats` computes them at the end of each batch run
+(one aggregate query per table) and stores them in the single
+`stats_snapshots` row; manual-review actions only recount pending reviews.
+Readers load that row.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from .db import Document, DriftScore, ManualReviewItem, ProviderScore, StatsSnapshot, ValidationRun
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID = 1
+TREND_RUNS = 5
+DRIFT_BUCKETS = ["Low", "Medium", "High"]
+# (label, lower bound inclusive, upper bound exclusive)
+PCS_RANGES = [("0-50", None, 50), ("50-70", 50, 70), ("70-90", 70, 90), ("90-100", 90, None)]
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    # SQLite hands datetimes back naive; keep in-session (aware UTC) ones consistent.
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _pcs_range(lower: Optional[float], upper: Optional[float]):
+    conditions = []
+    if lower is not None:
+        conditions.append(ProviderScore.pcs >= lower)
+    if upper is not None:
+        conditions.append(ProviderScore.pcs < upper)
+    return func.sum(case((and_(*conditions), 1), else_=0))
+
+
+def _pending_reviews(db: Session) -> int:
+    return db.query(func.count(ManualReviewItem.id)).filter(ManualReviewItem.status == "pending").scalar() or 0
+
+
+def compute_stats(db: Session) -> Dict[str, Any]:
+    scores = db.query(
+        func.count(ProviderScore.id),
+        func.avg(ProviderScore.pcs),
+        *[_pcs_range(lower, upper) for _, lower, upper in PCS_RANGES],
+    ).one()
+    scored, avg_pcs, *range_counts = scores
+
+    drift = dict.fromkeys(DRIFT_BUCKETS, 0)
+    for bucket, count in db.query(DriftScore.bucket, func.count(DriftScore.id)).group_by(DriftScore.bucket):
+        if bucket in drift:
+            drift[bucket] = count
+
+    runs = db.query(ValidationRun).order_by(ValidationRun.started_at.desc()).limit(TREND_RUNS).all()
+    latest = runs[0] if runs else None
+
+    documents, avg_ocr = db.query(func.count(Document.id), func.avg(func.coalesce(Document.ocr_confidence, 0.0))).one()
+
+    return {
+        "latest_run": {
+            "id": latest.id if latest else None,
+            "type": latest.run_type if latest else None,
+            "count_processed": latest.count_processed if latest else 0,
+            "auto_updates": latest.auto_updates if latest else 0,
+            "manual_reviews": latest.manual_reviews if latest else 0,
+            "started_at": _iso(latest.started_at) if latest else None,
+            "finished_at": _iso(latest.finished_at) if latest else None,
+        },
+        "trend": [
+            {
+                "id": r.id,
+                "date": r.started_at.strftime("%Y-%m-%d"),
+                "auto_updates": r.auto_updates,
+                "manual_reviews": r.manual_reviews,
+            }
+            for r in reversed(runs)
+        ],
+        "scored_providers": scored or 0,
+        "avg_pcs": avg_pcs if scored else None,
+        "pcs_distribution": {label: count or 0 for (label, _, _), count in zip(PCS_RANGES, range_counts)},
+        "drift_distribution": drift,
+        "pending_reviews": _pending_reviews(db),
+        "document_count": documents or 0,
+        "avg_ocr_confidence": avg_ocr if documents else None,
+    }
+
+
+def refresh_stats(db: Session) -> StatsSnapshot:
+    """Recompute the snapshot from the session's current state; the caller commits."""
+    db.flush()
+    values = compute_stats(db)
+    row = db.get(StatsSnapshot, SNAPSHOT_ID)
+    if row is None:
+        row = StatsSnapshot(id=SNAPSHOT_ID)
+        db.add(row)
+    for key, value in values.items():
+        setattr(row, key, value)
+    row.computed_at = datetime.now(timezone.utc)
+    logger.debug("Stats snapshot refreshed (%d scored providers)", row.scored_providers)
+    return row
+
+
+def refresh_review_counts(db: Session) -> StatsSnapshot:
+    """Review actions change only the pending count; recount that alone. The caller commits."""
+    row = db.get(StatsSnapshot, SNAPSHOT_ID)
+    if row is None:
+        return refresh_stats(db)
+    db.flush()
+    row.pending_reviews = _pending_reviews(db)
+    row.computed_at = datetime.now(timezone.utc)
+    return row
+
+
+def get_stats_snapshot(db: Session) -> StatsSnapshot:
+    """The stored snapshot, computed once on first use of a database."""
+    row = db.get(StatsSnapshot, SNAPSHOT_ID)
+    if row is None:
+        row = refresh_stats(db)
+        db.commit()
+    return row
+
+
+def stats_payload(row: StatsSnapshot) -> Dict[str, Any]:
+    return {
+        "latest_run": row.latest_run,
+        "avg_pcs": row.avg_pcs,
+        "drift_distribution": row.drift_distribution,
+        "pcs_distribution": row.pcs_distribution,
+        "trend": row.trend,
+        "pending_reviews": row.pending_reviews,
+        "computed_at": row.computed_at,
+    }
+
+
+__all__ = [
+    "compute_stats",
+    "refresh_stats",
+    "refresh_review_counts",
+    "get_stats_snapshot",
+    "stats_payload",
+]
@@ -0,0 +1,167 @@
+"""
+Deterministic normalization for provider contact fields.
+
+Used to decide whether differently formatted candidates ("(555) 123-4567"
+vs "555-123-4567", "St." vs "Street") are really the same value, so agreeing
+sources can be reconciled without an LLM and vote together in QA.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Any, Optional
+
+PHONE_DEFAULT_COUNTRY_CODE = os.getenv("PHONE_DEFAULT_COUNTRY_CODE", "1")
+
+_PHONE_EXTENSION = re.compile(r"\s*(?:ext\.?|extension|x)\s*\d{1,6}\s*$", re.IGNORECASE)
+_NON_DIGIT = re.compile(r"\D")
+
+
+def normalize_phone(value: Any, default_country_code: str = PHONE_DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """Return the E.164 form of a phone number, or None if it cannot be parsed."""
+    if not value:
+        return None
+    text = _PHONE_EXTENSION.sub("", str(value).strip())
+    digits = _NON_DIGIT.sub("", text)
+    if not digits:
+        return None
+
+    if text.startswith("+"):
+        e164 = "+" + digits
+    elif digits.startswith("00"):
+        e164 = "+" + digits[2:]
+    elif default_country_code == "1":
+        # NANP: 10-digit national number, optionally prefixed with 1.
+        if len(digits) == 10:
+            e164 = "+1" + digits
+        elif len(digits) == 11 and digits.startswith("1"):
+            e164 = "+" + digits
+        else:
+            return None
+    else:
+        # Most other plans dial nationally with a trunk prefix of 0.
+        e164 = "+" + default_country_code + digits.lstrip("0")
+
+    if not 8 <= len(e164) - 1 <= 15:
+        return None
+    return e164
+
+
+# USPS Publication 28 standard suffix, directional and secondary unit abbreviations.
+_STREET_SUFFIXES = {
+    "ALLEY": "ALY", "AVENUE": "AVE", "AVEN": "AVE", "AV": "AVE", "BOULEVARD": "BLVD", "BOUL": "BLVD",
+    "CENTER": "CTR", "CENTRE": "CTR", "CIRCLE": "CIR", "COURT": "CT", "CROSSING": "XING", "DRIVE": "DR",
+    "DRV": "DR", "EXPRESSWAY": "EXPY", "FREEWAY": "FWY", "HEIGHTS": "HTS", "HIGHWAY": "HWY", "JUNCTION": "JCT",
+    "LANE": "LN", "MOUNT": "MT", "PARKWAY": "PKWY", "PLACE": "PL", "PLAZA": "PLZ", "POINT": "PT",
+    "ROAD": "RD", "ROUTE": "RTE", "SQUARE": "SQ", "STREET": "ST", "STR": "ST", "TERRACE": "TER",
+    "TRAIL": "TRL",
+}
+_DIRECTIONALS = {
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+}
+_UNIT_DESIGNATORS = {
+    "APARTMENT": "APT", "BUILDING": "BLDG", "DEPARTMENT": "DEPT", "FLOOR": "FL", "ROOM": "RM",
+    "SUITE": "STE", "NUMBER": "#", "NO": "#",
+}
+_ADDRESS_ABBREVIATIONS = {**_STREET_SUFFIXES, **_DIRECTIONALS, **_UNIT_DESIGNATORS}
+
+_ADDRESS_TOKEN = re.compile(r"#|[A-Z0-9]+(?:[-/][A-Z0-9]+)*")
+_ZIP_PLUS_FOUR = re.compile(r"^(\d{5})-\d{4}$")
+
+
+def normalize_address(value: Any) -> Optional[str]:
+    """Uppercase, strip punctuation and apply USPS abbreviations (comparison key)."""
+    if not value:
+        return None
+    tokens = []
+    for token in _ADDRESS_TOKEN.findall(str(value).upper()):
+        token = _ADDRESS_ABBREVIATIONS.get(token, token)
+        zip_match = _ZIP_PLUS_FOUR.match(token)
+        if zip_match:
+            token = zip_match.group(1)
+        tokens.append(token)
+    return " ".join(tokens) or None
+
+
+_SPECIALTY_SYNONYMS = {
+    "dermatologist": "dermatology",
+    "pediatrician": "pediatrics",
+    "paediatrics": "pediatrics",
+    "paediatrician": "pediatrics",
+    "internist": "internal medicine",
+    "general internal medicine": "internal medicine",
+    "family practice": "family medicine",
+    "family physician": "family medicine",
+    "general practitioner": "general practice",
+    "gp": "general practice",
+    "ob/gyn": "obstetrics and gynecology",
+    "obgyn": "obstetrics and gynecology",
+    "obstetrician gynecologist": "obstetrics and gynecology",
+    "orthopedics": "orthopedic surgery",
+    "orthopaedics": "orthopedic surgery",
+    "orthopedic surgeon": "orthopedic surgery",
+    "orthopaedic surgeon": "orthopedic surgery",
+    "general surgeon": "general surgery",
+    "psychiatrist": "psychiatry",
+    "anesthesiologist": "anesthesiology",
+    "anaesthesiology": "anesthesiology",
+    "ent": "otolaryngology",
+    "ear nose and throat": "otolaryngology",
+}
+_SPECIALTY_PUNCTUATION = re.compile(r"[^\w/ ]+")
+_LOWERCASE_WORDS = {"and", "of", "the"}
+
+
+def normalize_specialty(value: Any) -> Optional[str]:
+    """Map specialty spellings and practitioner nouns to one canonical name."""
+    if not value:
+        return None
+    text = str(value).casefold().replace("&", " and ")
+    text = " ".join(_SPECIALTY_PUNCTUATION.sub(" ", text).split())
+    if not text:
+        return None
+    text = _SPECIALTY_SYNONYMS.get(text, text)
+    if text.endswith("ologist"):
+        # Cardiologist -> Cardiology, Neurologist -> Neurology, ...
+        text = text[: -len("ist")] + "y"
+    words = text.split()
+    return " ".join(
+        w if i and w in _LOWERCASE_WORDS else w[:1].upper() + w[1:] for i, w in enumerate(words)
+    )
+
+
+def _normalize_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = " ".join(str(value).split()).casefold()
+    return text or None
+
+
+def normalize_value(field_name: Optional[str], value: Any) -> Optional[str]:
+    """Comparison key for a field value; values with equal keys are the same."""
+    if field_name == "phone":
+        # Numbers outside the default plan still compare by their digits.
+        return normalize_phone(value) or _NON_DIGIT.sub("", str(value)) or _normalize_text(value)
+    if field_name == "address":
+        return normalize_address(value) or _normalize_text(value)
+    if field_name == "specialty":
+        specialty = normalize_specialty(value)
+        return specialty.casefold() if specialty else _normalize_text(value)
+    return _normalize_text(value)
+
+
+def values_agree(field_name: Optional[str], a: Any, b: Any) -> bool:
+    if a is None or b is None:
+        return a is b
+    return normalize_value(field_name, a) == normalize_value(field_name, b)
+
+
+__all__ = [
+    "normalize_phone",
+    "normalize_address",
+    "normalize_specialty",
+    "normalize_value",
+    "values_agree",
+]
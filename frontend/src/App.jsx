@@ -8,6 +8,9 @@ import {
 import './styles.css';
 
 const API_BASE = 'http://127.0.0.1:8000';
+const PROVIDER_PAGE_SIZE = 100;
+const REVIEW_PAGE_SIZE = 100;
+const CLAIM_SIZE = 20;
 
 // =====================
 // 🔹 EXPLAIN API HELPER
@@ -260,7 +263,7 @@ function Dashboard({ stats, onRunBatch, onDownloadReport }) {
 // =====================
 // PROVIDER LIST
 // =====================
-function ProviderList({ providers, onSelect }) {
+function ProviderList({ providers, hasMore, onLoadMore, onSelect }) {
   return (
     <div className="provider-list-container">
       <table className="data-table">
@@ -289,6 +292,9 @@ function ProviderList({ providers, onSelect }) {
           ))}
         </tbody>
       </table>
+      {hasMore && (
+        <button className="btn-small" onClick={onLoadMore}>Load more</button>
+      )}
     </div>
   );
 }
@@ -463,11 +469,22 @@ function ProviderDetail({ providerId, onBack }) {
 // =====================
 // MANUAL REVIEW
 // =====================
-function ManualReview({ items, onAction }) {
+function ManualReview({ items, hasMore, onLoadMore, reviewer, onReviewerChange, onClaim, onAction }) {
   return (
     <div className="manual-review-container">
       <div className="card">
         <h3>📝 Manual Review Queue</h3>
+        <div className="review-toolbar">
+          <input
+            type="text"
+            placeholder="Your reviewer name"
+            value={reviewer}
+            onChange={(e) => onReviewerChange(e.target.value)}
+          />
+          <button className="btn-small" disabled={!reviewer} onClick={onClaim}>
+            Claim next {CLAIM_SIZE}
+          </button>
+        </div>
         {items.length === 0 ? (
           <p style={{ color: '#8b949e' }}>No items pending review.</p>
         ) : (
@@ -480,6 +497,7 @@ function ManualReview({ items, onAction }) {
                 <th>Current Value</th>
                 <th>Suggested Value</th>
                 <th>Reason</th>
+                <th>Claimed By</th>
                 <th>Actions</th>
               </tr>
             </thead>
@@ -492,6 +510,7 @@ function ManualReview({ items, onAction }) {
                   <td className="text-strike">{i.current_value}</td>
                   <td className="text-highlight">{i.suggested_value}</td>
                   <td>{i.reason}</td>
+                  <td>{i.claimed_by || '—'}</td>
                   <td className="actions-cell">
                     <button className="btn-approve" onClick={() => onAction(i.id, 'approve')}>Approve</button>
                     <button className="btn-override" onClick={() => {
@@ -505,6 +524,9 @@ function ManualReview({ items, onAction }) {
             </tbody>
           </table>
         )}
+        {hasMore && (
+          <button className="btn-small" onClick={onLoadMore}>Load more</button>
+        )}
       </div>
     </div>
   );
@@ -518,23 +540,58 @@ export default function App() {
   const [selectedProviderId, setSelectedProviderId] = useState(null);
   const [stats, setStats] = useState(null);
   const [providers, setProviders] = useState([]);
+  const [providersCursor, setProvidersCursor] = useState(null);
   const [manualItems, setManualItems] = useState([]);
+  const [manualCursor, setManualCursor] = useState(null);
+  const [reviewer, setReviewer] = useState(() => window.localStorage.getItem('reviewer') || '');
 
   const loadData = async () => {
     try {
       const [s, p, m] = await Promise.all([
         axios.get('/stats'),
-        axios.get('/providers'),
-        axios.get('/manual-review'),
+        axios.get('/providers', { params: { limit: PROVIDER_PAGE_SIZE } }),
+        axios.get('/manual-review', { params: { limit: REVIEW_PAGE_SIZE } }),
       ]);
       setStats(s.data);
-      setProviders(p.data);
-      setManualItems(m.data.filter(i => i.status === 'pending'));
+      setProviders(p.data.items);
+      setProvidersCursor(p.data.next_cursor);
+      setManualItems(m.data.items);
+      setManualCursor(m.data.next_cursor);
     } catch (err) {
       console.error('Error loading data', err);
     }
   };
 
+  const loadMoreProviders = async () => {
+    const res = await axios.get('/providers', { params: { limit: PROVIDER_PAGE_SIZE, cursor: providersCursor } });
+    setProviders(prev => [...prev, ...res.data.items]);
+    setProvidersCursor(res.data.next_cursor);
+  };
+
+  const loadMoreManual = async () => {
+    const res = await axios.get('/manual-review', { params: { limit: REVIEW_PAGE_SIZE, cursor: manualCursor } });
+    setManualItems(prev => [...prev, ...res.data.items]);
+    setManualCursor(res.data.next_cursor);
+  };
+
+  const changeReviewer = (name) => {
+    setReviewer(name);
+    window.localStorage.setItem('reviewer', name);
+  };
+
+  // Leases pending items to this reviewer so nobody else can decide them.
+  const claimManual = async () => {
+    try {
+      const res = await axios.post('/manual-review/claim', null, { params: { reviewer, limit: CLAIM_SIZE } });
+      if (res.data.items.length === 0) {
+        alert('No unclaimed items left to claim.');
+      }
+      await loadData();
+    } catch (err) {
+      alert('Claim failed');
+    }
+  };
+
   useEffect(() => {
     loadData();
   }, []);
@@ -563,17 +620,24 @@ export default function App() {
   };
 
   const handleManualAction = async (id, action, value) => {
+    // Sending the reviewer lets them decide items they have claimed.
+    const params = reviewer ? { reviewer } : {};
     try {
       if (action === 'approve') {
-        await axios.post(`/manual-review/${id}/approve`);
+        await axios.post(`/manual-review/${id}/approve`, null, { params });
       } else if (action === 'reject') {
-        await axios.post(`/manual-review/${id}/reject`);
+        await axios.post(`/manual-review/${id}/reject`, null, { params });
       } else {
-        await axios.post(`/manual-review/${id}/override?value=${encodeURIComponent(value)}`);
+        await axios.post(`/manual-review/${id}/override`, null, { params: { ...params, value } });
       }
       await loadData();
-    } catch {
-      alert('Action failed');
+    } catch (err) {
+      if (err.response && err.response.status === 409) {
+        alert('This item was already handled or is claimed by another reviewer.');
+        await loadData();
+      } else {
+        alert('Action failed');
+      }
     }
   };
 
@@ -606,7 +670,7 @@ export default function App() {
           <button className={`nav-item ${view === 'manual' ? 'active' : ''}`} onClick={() => setView('manual')}>
             <span className="nav-icon">📝</span>
             Manual Review
-            {manualItems.length > 0 && <span className="badge-count">{manualItems.length}</span>}
+            {stats?.pending_reviews > 0 && <span className="badge-count">{stats.pending_reviews}</span>}
           </button>
         </nav>
 
@@ -637,9 +701,19 @@ export default function App() {
         {/* Main Content */}
         <main className="content-area">
           {view === 'dashboard' && <Dashboard stats={stats} onRunBatch={runBatch} onDownloadReport={downloadReport} />}
-          {view === 'providers' && <ProviderList providers={providers} onSelect={navigateToDetail} />}
+          {view === 'providers' && <ProviderList providers={providers} hasMore={!!providersCursor} onLoadMore={loadMoreProviders} onSelect={navigateToDetail} />}
           {view === 'detail' && <ProviderDetail providerId={selectedProviderId} onBack={() => setView('providers')} />}
-          {view === 'manual' && <ManualReview items={manualItems} onAction={handleManualAction} />}
+          {view === 'manual' && (
+            <ManualReview
+              items={manualItems}
+              hasMore={!!manualCursor}
+              onLoadMore={loadMoreManual}
+              reviewer={reviewer}
+              onReviewerChange={changeReviewer}
+              onClaim={claimManual}
+              onAction={handleManualAction}
+            />
+          )}
         </main>
       </div>
     </div>
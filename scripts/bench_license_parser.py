@@ -0,0 +1,68 @@
+"""
+Throughput benchmark for the license parser.
+
+Parses synthetic OCR word boxes (the layout of the demo license scans) and
+reports pages per second, optionally failing below a floor:
+
+    python -m scripts.bench_license_parser --pages 2000
+    python -m scripts.bench_license_parser --pages 2000 --min-pages-per-second 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from backend.license_parser import parse_license
+
+DEFAULT_PAGES = 2000
+REPEATS = 3
+
+
+def _words(rows: List[str], conf: int = 90) -> List[Dict[str, Any]]:
+    """Word boxes for rows of text, one row per 20px line."""
+    words = []
+    for line_no, row in enumerate(rows):
+        left = 0
+        for token in row.split():
+            words.append({"text": token, "conf": conf, "left": left, "top": 20 * line_no, "width": 8 * len(token), "height": 12})
+            left += 8 * len(token) + 6
+    return words
+
+
+def run(pages: int) -> Dict[str, Any]:
+    batch = [_words([f"License: LIC-{i}", f"Name: Dr. Person {i}", "Expiry: 2026-06-30"]) for i in range(pages)]
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        results = [parse_license(words=words) for words in batch]
+        best = min(best, time.perf_counter() - started)
+    return {
+        "pages": pages,
+        "wall_seconds": round(best, 4),
+        "pages_per_second": round(pages / best, 1),
+        "complete": sum(1 for r in results if r.complete),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES)
+    parser.add_argument("--min-pages-per-second", type=float, help="Fail below this throughput")
+    args = parser.parse_args(argv)
+
+    result = run(args.pages)
+    print(
+        f"{result['pages']} pages in {result['wall_seconds']:.3f}s "
+        f"({result['pages_per_second']:.0f} pages/s, {result['complete']} complete)"
+    )
+    if args.min_pages_per_second is not None and result["pages_per_second"] < args.min_pages_per_second:
+        print(f"Slower than {args.min_pages_per_second:.0f} pages/s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
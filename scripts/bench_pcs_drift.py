@@ -0,0 +1,312 @@
+"""
+Benchmark suite for the PCS / drift scoring paths.
+
+Builds a synthetic provider population (with realistic FieldConfidence and
+Document volumes) in a throwaway SQLite file, then measures wall time,
+SQL query count and peak Python memory for:
+
+- compute_pcs            (per-provider, over a fixed sample)
+- recompute_pcs_for_all  (full population)
+- recompute_drift_for_all (full population)
+
+Results are written to JSON and can be compared against a stored baseline:
+
+    python -m scripts.bench_pcs_drift --sizes 10000 --out bench/pcs_drift.json
+    python -m scripts.bench_pcs_drift --sizes 10000 --baseline bench/pcs_drift.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.db import Base, Document, FieldConfidence, Provider
+from backend.pcs_drift import compute_pcs, recompute_drift_for_all, recompute_pcs_for_all
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_SEED = 1729
+PCS_SAMPLE = 1_000
+INSERT_CHUNK = 10_000
+
+FIELDS = ["phone", "address", "specialty", "license_no", "license_expiry"]
+SOURCES = ["npi", "state_board", "hospital", "maps", "original"]
+
+# Each batch run writes one FieldConfidence row per field for the providers it
+# touches (validation agent + QA), so long-lived providers accumulate several
+# generations of rows. Documents are mostly a single license scan.
+RUNS_PER_PROVIDER = (1, 4)
+DOCS_PER_PROVIDER_WEIGHTS = {0: 0.2, 1: 0.7, 2: 0.1}
+
+
+# ---------------------------------------------------------------------------
+# Synthetic population
+# ---------------------------------------------------------------------------
+
+def _provider_rows(rng: random.Random, start: int, count: int, now: datetime) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(start, start + count):
+        verified = now - timedelta(days=rng.randint(0, 365)) if rng.random() < 0.85 else None
+        changed = now - timedelta(days=rng.randint(0, 400)) if rng.random() < 0.6 else None
+        expiry = (now + timedelta(days=rng.randint(-60, 900))).strftime("%Y-%m-%d") if rng.random() < 0.9 else None
+        rows.append(
+            {
+                "id": i,
+                "external_id": f"B{i:08d}",
+                "name": f"Dr. Bench {i}",
+                "phone": f"555-{i % 10_000_000:07d}",
+                "address": f"{i % 9999} Synthetic Ave",
+                "specialty": "Cardiology",
+                "license_no": f"LIC-{i}",
+                "license_expiry": expiry,
+                "last_verified_at": verified,
+                "last_changed_at": changed,
+            }
+        )
+    return rows
+
+
+def _confidence_rows(rng: random.Random, provider_ids: range, now: datetime) -> List[Dict[str, Any]]:
+    rows = []
+    for pid in provider_ids:
+        for run in range(rng.randint(*RUNS_PER_PROVIDER)):
+            created = now - timedelta(days=run * 7)
+            for field in FIELDS:
+                # Skewed towards high confidence, with a tail of conflicts.
+                conf = min(1.0, max(0.0, rng.betavariate(5, 1.5)))
+                rows.append(
+                    {
+                        "provider_id": pid,
+                        "field_name": field,
+                        "confidence": conf,
+                        "sources": rng.sample(SOURCES, rng.randint(1, 3)),
+                        "created_at": created,
+                    }
+                )
+    return rows
+
+
+def _document_rows(rng: random.Random, provider_ids: range) -> List[Dict[str, Any]]:
+    counts = list(DOCS_PER_PROVIDER_WEIGHTS)
+    weights = list(DOCS_PER_PROVIDER_WEIGHTS.values())
+    rows = []
+    for pid in provider_ids:
+        for _ in range(rng.choices(counts, weights)[0]):
+            rows.append(
+                {
+                    "provider_id": pid,
+                    "doc_type": "license",
+                    "path": f"/synthetic/{pid}.png",
+                    "ocr_text": "License: LIC-SYNTH Expiry: 2026-01-01",
+                    "ocr_confidence": rng.uniform(0.4, 0.98) if rng.random() < 0.9 else None,
+                }
+            )
+    return rows
+
+
+def build_population(engine: Engine, size: int, seed: int = DEFAULT_SEED) -> Dict[str, int]:
+    """Create the schema and insert `size` synthetic providers in chunks."""
+    Base.metadata.create_all(engine)
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    counts = {"providers": 0, "field_confidence": 0, "documents": 0}
+
+    with engine.begin() as conn:
+        for start in range(1, size + 1, INSERT_CHUNK):
+            n = min(INSERT_CHUNK, size - start + 1)
+            providers = _provider_rows(rng, start, n, now)
+            confs = _confidence_rows(rng, range(start, start + n), now)
+            docs = _document_rows(rng, range(start, start + n))
+            conn.execute(insert(Provider), providers)
+            conn.execute(insert(FieldConfidence), confs)
+            if docs:
+                conn.execute(insert(Document), docs)
+            counts["providers"] += len(providers)
+            counts["field_confidence"] += len(confs)
+            counts["documents"] += len(docs)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+class QueryCounter:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs) -> None:
+        self.count += 1
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+# tracemalloc adds noticeable overhead to allocation-heavy ORM code, so it can
+# be switched off when only wall time and query counts matter.
+TRACE_MEMORY = True
+
+
+@contextmanager
+def _measure(engine: Engine) -> Iterator[Dict[str, Any]]:
+    result: Dict[str, Any] = {}
+    if TRACE_MEMORY:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with QueryCounter(engine) as counter:
+        yield result
+    result["wall_seconds"] = round(time.perf_counter() - started, 4)
+    result["queries"] = counter.count
+    if TRACE_MEMORY:
+        result["peak_memory_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+
+
+def _bench_compute_pcs(engine: Engine, session_factory: Callable[[], Session], sample: int) -> Dict[str, Any]:
+    db = session_factory()
+    try:
+        providers = db.query(Provider).order_by(Provider.id).limit(sample).all()
+        with _measure(engine) as result:
+            for p in providers:
+                compute_pcs(db, p)
+        result["calls"] = len(providers)
+        result["per_call_ms"] = round(1000 * result["wall_seconds"] / max(1, len(providers)), 4)
+        return result
+    finally:
+        db.close()
+
+
+def _bench_full(engine: Engine, session_factory: Callable[[], Session], fn: Callable[[Session], None]) -> Dict[str, Any]:
+    db = session_factory()
+    try:
+        with _measure(engine) as result:
+            fn(db)
+        return result
+    finally:
+        db.close()
+
+
+def run_size(size: int, seed: int = DEFAULT_SEED, workdir: Optional[Path] = None, pcs_sample: int = PCS_SAMPLE) -> Dict[str, Any]:
+    """Benchmark every scoring path against a fresh population of `size` providers."""
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+        build_started = time.perf_counter()
+        population = build_population(engine, size, seed)
+        build_seconds = round(time.perf_counter() - build_started, 2)
+
+        paths = {
+            "compute_pcs": _bench_compute_pcs(engine, session_factory, min(pcs_sample, size)),
+            "recompute_pcs_for_all": _bench_full(engine, session_factory, recompute_pcs_for_all),
+            "recompute_drift_for_all": _bench_full(engine, session_factory, recompute_drift_for_all),
+        }
+        engine.dispose()
+
+    return {"size": size, "population": population, "build_seconds": build_seconds, "paths": paths}
+
+
+def run_suite(sizes: List[int], seed: int = DEFAULT_SEED, pcs_sample: int = PCS_SAMPLE) -> Dict[str, Any]:
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [run_size(size, seed, pcs_sample=pcs_sample) for size in sizes],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+METRICS = ["wall_seconds", "queries", "peak_memory_mb"]
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[str]:
+    """
+    Return a human-readable list of regressions. A metric regresses when it
+    exceeds the baseline by more than `tolerance` (fractional). Query counts
+    are deterministic, so any increase is reported.
+    """
+    by_size = {r["size"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current.get("results", []):
+        base = by_size.get(result["size"])
+        if not base:
+            continue
+        for path, metrics in result["paths"].items():
+            base_metrics = base["paths"].get(path)
+            if not base_metrics:
+                continue
+            for metric in METRICS:
+                new, old = metrics.get(metric), base_metrics.get(metric)
+                if new is None or old is None:
+                    continue
+                allowed = old if metric == "queries" else old * (1 + tolerance)
+                if new > allowed:
+                    regressions.append(f"size={result['size']} {path}.{metric}: {old} -> {new}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=str, default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--pcs-sample", type=int, default=PCS_SAMPLE)
+    parser.add_argument("--out", type=str, help="Write results JSON to this path")
+    parser.add_argument("--baseline", type=str, help="Compare against a previously saved results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc peak-memory tracking")
+    args = parser.parse_args(argv)
+
+    global TRACE_MEMORY
+    TRACE_MEMORY = not args.no_memory
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = run_suite(sizes, seed=args.seed, pcs_sample=args.pcs_sample)
+
+    for r in results["results"]:
+        print(f"== {r['size']} providers (build {r['build_seconds']}s, {r['population']})")
+        for path, m in r["paths"].items():
+            memory = f"{m['peak_memory_mb']:>9.2f} MB" if "peak_memory_mb" in m else ""
+            print(f"  {path:<26} {m['wall_seconds']:>10.3f}s {m['queries']:>10} queries {memory}")
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Latency benchmark for provider search.
+
+Builds a synthetic provider population in a throwaway SQLite file, indexes
+it, and times `search_providers` for a rare, a selective and a very common
+query, with the default candidate cap and with the cap lifted:
+
+    python -m scripts.bench_search --sizes 100000,500000
+    python -m scripts.bench_search --sizes 500000 --max-ms 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from backend import search
+from backend.db import Base, Provider
+from backend.search import rebuild_search_index, search_providers
+
+DEFAULT_SIZES = [100_000]
+DEFAULT_SEED = 1729
+INSERT_CHUNK = 10_000
+REPEATS = 3
+
+CITIES = ["Pune", "Mumbai", "Nashik", "Nagpur", "Delhi", "Chennai", "Kolkata", "Bengaluru"]
+SPECIALTIES = ["Cardiology", "Pediatrics", "Dermatology", "Orthopedics", "Neurology", "Oncology"]
+
+# rare: one provider; selective: one city and specialty; common: every row.
+QUERIES = {"rare": "bench 4242", "selective": "cardiology pune", "common": "doctor"}
+
+
+def build_population(engine, size: int, seed: int = DEFAULT_SEED) -> None:
+    Base.metadata.create_all(engine)
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        for start in range(1, size + 1, INSERT_CHUNK):
+            rows = [
+                {
+                    "id": i,
+                    "external_id": f"B{i:08d}",
+                    "name": f"Doctor Bench {i}",
+                    "specialty": rng.choice(SPECIALTIES),
+                    "address": f"{i % 999} Main Road, {rng.choice(CITIES)}",
+                }
+                for i in range(start, min(start + INSERT_CHUNK, size + 1))
+            ]
+            conn.execute(insert(Provider), rows)
+
+
+def _best_ms(db, query: str) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        search_providers(db, query)
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 1)
+
+
+def run_size(size: int, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        session_factory = sessionmaker(bind=engine)
+        build_population(engine, size, seed)
+        timings: Dict[str, Dict[str, float]] = {}
+        with session_factory() as db:
+            rebuild_search_index(db)
+            cap = search.SEARCH_MAX_CANDIDATES
+            for label, query in QUERIES.items():
+                capped = _best_ms(db, query)
+                search.SEARCH_MAX_CANDIDATES = size
+                try:
+                    uncapped = _best_ms(db, query)
+                finally:
+                    search.SEARCH_MAX_CANDIDATES = cap
+                timings[label] = {"capped_ms": capped, "uncapped_ms": uncapped}
+        engine.dispose()
+    return {"size": size, "cap": search.SEARCH_MAX_CANDIDATES, "queries": timings}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=str, default=",".join(str(s) for s in DEFAULT_SIZES))
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--max-ms", type=float, help="Fail if any capped query is slower than this")
+    args = parser.parse_args(argv)
+
+    slow = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        result = run_size(size, args.seed)
+        print(f"== {size} providers (cap {result['cap']})")
+        for label, t in result["queries"].items():
+            print(f"  {label:<10} {QUERIES[label]!r:<20} {t['capped_ms']:>9.1f} ms {t['uncapped_ms']:>9.1f} ms uncapped")
+            if args.max_ms is not None and t["capped_ms"] > args.max_ms:
+                slow.append(f"size={size} {label}: {t['capped_ms']} ms")
+
+    if slow:
+        print("Slower than --max-ms:")
+        for line in slow:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Load harness for the agents' LLM code paths.
+
+Drives DataValidationAgent (per-field and batched reconciliation),
+InformationEnrichmentAgent and summarize_qa_decision at a chosen concurrency
+against an offline backend, so the rate limiter, circuit breaker and fallback
+paths can be profiled without network access or an API key:
+
+    python -m scripts.load_llm_agents --concurrency 32 --requests 2000
+    python -m scripts.load_llm_agents --quota-rate 0.05 --rpm 600 --out load.json
+    python -m scripts.load_llm_agents --replay recordings/gemini.jsonl
+
+Recordings for --replay are produced by running the backend with
+LLM_RECORD_PATH set (see backend/llm/backends.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.agents.data_validation_agent import Candidate, DataValidationAgent
+from backend.agents.information_enrichment_agent import InformationEnrichmentAgent
+from backend.llm import gemini_client
+from backend.llm.backends import LLMBackend, ReplayBackend, StandInBackend, StandInConfig
+from backend.llm.gemini_client import MODEL_NAME, RateLimiter
+from backend.llm.qa_summarizer import summarize_qa_decision
+
+WORKLOADS = ["validation", "batch", "enrichment", "summary"]
+BATCH_ITEMS = 20
+DEFAULT_SEED = 1729
+
+
+class CountingBackend(LLMBackend):
+    """Counts what actually reached the backend, by outcome."""
+
+    def __init__(self, inner: LLMBackend):
+        self.inner = inner
+        self.name = inner.name
+        self.cacheable = False
+        self.counts = {"ok": 0, "error": 0}
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        try:
+            response = self.inner.generate(prompt, timeout)
+        except Exception:
+            with self._lock:
+                self.counts["error"] += 1
+            raise
+        with self._lock:
+            self.counts["ok"] += 1
+        return response
+
+
+def _conflicting_candidates(rng: random.Random, field: str) -> List[Candidate]:
+    values = {
+        "phone": [f"555-{rng.randint(0, 9999):04d}" for _ in range(2)],
+        "address": [f"{rng.randint(1, 999)} Main St", f"{rng.randint(1, 999)} Oak Ave"],
+        "specialty": ["Cardiology", "Internal Medicine"],
+    }[field]
+    return [
+        Candidate(value=values[0], source="npi", score_hint=1.0),
+        Candidate(value=values[1], source="maps", score_hint=0.5),
+        Candidate(value=values[1], source="original", score_hint=0.3),
+    ]
+
+
+def make_task(
+    workload: str,
+    i: int,
+    rng: random.Random,
+    validation: DataValidationAgent,
+    enrichment: InformationEnrichmentAgent,
+) -> Callable[[], Any]:
+    if workload == "validation":
+        field = rng.choice(["phone", "address", "specialty"])
+        candidates = _conflicting_candidates(rng, field)
+        return lambda: validation.get_best_value_with_llm(field, candidates)
+    if workload == "batch":
+        items = []
+        for n in range(BATCH_ITEMS):
+            field = rng.choice(["phone", "address", "specialty"])
+            items.append((f"{i}:{n}:{field}", field, _conflicting_candidates(rng, field)))
+        return lambda: validation.reconcile_batch(items)
+    if workload == "enrichment":
+        provider = SimpleNamespace(id=i, name=f"Dr. Load {i}", specialty="Cardiology")
+        snippets = [f"Dr. Load {i} is board certified and affiliated with General Hospital."]
+        return lambda: enrichment._llm_structured_extract(provider, snippets)
+    payload = {
+        "field": "phone",
+        "current_value": "555-0000",
+        "candidates": [{"source": "npi", "value": "555-0001"}, {"source": "maps", "value": "555-0002"}],
+        "chosen_value": "555-0001",
+        "confidence": 0.72,
+        "decision": "manual_review",
+    }
+    return lambda: summarize_qa_decision(payload)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(
+    backend: LLMBackend,
+    workloads: List[str],
+    requests: int,
+    concurrency: int,
+    rpm: float,
+    tpm: float,
+    max_wait: float,
+    seed: int = DEFAULT_SEED,
+) -> Dict[str, Any]:
+    counting = CountingBackend(backend)
+    client = gemini_client.set_backend(counting)
+    client.limiter = RateLimiter(rpm=rpm, tpm=tpm, max_wait=max_wait)
+    validation, enrichment = DataValidationAgent(), InformationEnrichmentAgent()
+    rng = random.Random(seed)
+    tasks = [
+        (w, make_task(w, i, rng, validation, enrichment))
+        for i, w in enumerate(rng.choice(workloads) for _ in range(requests))
+    ]
+
+    latencies: Dict[str, List[float]] = {w: [] for w in workloads}
+    lock = threading.Lock()
+
+    def run(task):
+        workload, fn = task
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies[workload].append(elapsed * 1000)
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for _ in pool.map(run, tasks):
+                pass
+    finally:
+        gemini_client.set_backend(None)
+    wall = time.perf_counter() - started
+
+    per_workload = {}
+    for workload, values in latencies.items():
+        values.sort()
+        per_workload[workload] = {
+            "count": len(values),
+            "mean_ms": round(statistics.fmean(values), 2) if values else 0.0,
+            "p50_ms": round(_percentile(values, 50), 2),
+            "p95_ms": round(_percentile(values, 95), 2),
+            "p99_ms": round(_percentile(values, 99), 2),
+        }
+    reached = counting.counts["ok"] + counting.counts["error"]
+    return {
+        "backend": backend.name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(requests / wall, 2) if wall else 0.0,
+        "backend_ok": counting.counts["ok"],
+        "backend_errors": counting.counts["error"],
+        # Throttled locally or rejected by the open circuit before reaching the backend.
+        "short_circuited": requests - reached,
+        "breaker_state": client.breaker.state,
+        "workloads": per_workload,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=gemini_client.GEMINI_RPM)
+    parser.add_argument("--tpm", type=float, default=gemini_client.GEMINI_TPM)
+    parser.add_argument("--max-wait", type=float, default=gemini_client.GEMINI_MAX_WAIT)
+    parser.add_argument("--replay", type=Path, help="Replay a JSONL recording; misses go to the stand-in")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args(argv)
+
+    stand_in = StandInBackend(
+        StandInConfig(
+            latency_ms=args.latency_ms,
+            distribution=args.distribution,
+            spread=args.spread,
+            error_rate=args.error_rate,
+            quota_rate=args.quota_rate,
+            seed=args.seed,
+        )
+    )
+    backend: LLMBackend = stand_in
+    if args.replay:
+        backend = ReplayBackend(args.replay, MODEL_NAME, fallback=stand_in)
+
+    report = run_load(
+        backend,
+        args.workloads,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_wait=args.max_wait,
+        seed=args.seed,
+    )
+    if isinstance(backend, ReplayBackend):
+        report["replay_hits"] = backend.hits
+        report["replay_misses"] = backend.misses
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,14 @@ from dotenv import load_dotenv
 from pathlib import Path
 
 import pytest
+from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from backend.db import Base
+from backend import http_cache
+from backend.db import Base, get_db
+from backend.http_cache import ResourceVersions
+from backend.main import app
 
 # Always load env from project root (.env.local preferred, fallback to .env)
 root = Path(__file__).resolve().parent.parent
@@ -22,4 +26,39 @@ def db_session():
 
     yield session
 
-    session.close()
\ No newline at end of file
+    session.close()
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """SQLite file database shared by the API, background tasks and threads."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+
+    yield engine
+
+    engine.dispose()
+
+
+@pytest.fixture
+def file_session(file_engine):
+    """Session factory bound to `file_engine`."""
+    return sessionmaker(bind=file_engine)
+
+
+@pytest.fixture
+def api_client(file_session, monkeypatch):
+    """TestClient whose requests use `file_session`, with a fresh HTTP cache."""
+    # Cached responses and version counters are process-wide; start each test empty.
+    monkeypatch.setattr(http_cache, "_cache", None)
+    monkeypatch.setattr(http_cache, "_versions", ResourceVersions())
+
+    def override_db():
+        with file_session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_db
+
+    yield TestClient(app)
+
+    app.dependency_overrides.pop(get_db, None)
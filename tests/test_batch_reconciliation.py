@@ -0,0 +1,59 @@
+import json
+
+from backend.agents.data_validation_agent import DataValidationAgent
+from backend.db import FieldConfidence, Provider
+
+
+def _providers(db_session):
+    providers = [
+        Provider(external_id="X1", name="Dr. One", phone="555-0001", address="1 Main St", specialty="Cardiology"),
+        Provider(external_id="X2", name="Dr. Two", phone="555-0002", address="2 Main St", specialty="Dermatology"),
+    ]
+    db_session.add_all(providers)
+    db_session.commit()
+    return providers
+
+
+def test_validate_providers_uses_one_llm_call_for_all_fields(db_session, monkeypatch):
+    p1, p2 = _providers(db_session)
+    prompts = []
+
+    def fake_call_gemini(prompt: str) -> str:
+        prompts.append(prompt)
+        answers = [
+            {"id": f"{p1.id}:phone", "value": "555-0001", "confidence": 0.95, "sources": ["original"]},
+            {"id": f"{p1.id}:address", "value": "1 Main Street", "confidence": 0.8, "sources": ["original"]},
+            # p2 phone answer is malformed, p2 address is missing entirely
+            {"id": f"{p2.id}:phone", "confidence": 0.9},
+            {"id": f"{p1.id}:specialty", "value": "Cardiology", "confidence": 0.9, "sources": ["original"]},
+            {"id": f"{p2.id}:specialty", "value": "Dermatology", "confidence": 0.85, "sources": ["original"]},
+        ]
+        return "```json\n" + json.dumps(answers) + "\n```"
+
+    monkeypatch.setattr("backend.agents.data_validation_agent.call_gemini", fake_call_gemini)
+    # A lower-weight listing disagrees on every field, so each one is a conflict.
+    fetch = DataValidationAgent._fetch_sources
+    monkeypatch.setattr(
+        DataValidationAgent,
+        "_fetch_sources",
+        lambda self, provider: {**fetch(self, provider), "web": {"phone": "555-0999", "address": "9 Elm Rd", "specialty": "Oncology"}},
+    )
+
+    agent = DataValidationAgent()
+    agent.llm_enabled = True
+    results = agent.validate_providers(db_session, [p1.id, p2.id])
+
+    assert len(prompts) == 1
+    assert results[p1.id].validated_fields["address"] == {"value": "1 Main Street", "confidence": 0.8, "sources": ["original"]}
+    assert results[p2.id].validated_fields["phone"] == {"value": "555-0002", "confidence": 0.6, "sources": ["original"]}
+    assert results[p2.id].validated_fields["address"]["confidence"] == 0.6
+    assert db_session.query(FieldConfidence).count() == 6
+
+
+def test_batch_mode_matches_per_field_results_without_llm(db_session):
+    p1, _ = _providers(db_session)
+
+    per_field = DataValidationAgent().validate_provider(db_session, p1.id)
+    batched = DataValidationAgent(batch_reconcile=True).validate_provider(db_session, p1.id)
+
+    assert batched.validated_fields == per_field.validated_fields
@@ -0,0 +1,23 @@
+from scripts.bench_pcs_drift import compare_to_baseline, run_suite
+
+
+def test_benchmark_suite_reports_every_scoring_path():
+    results = run_suite([50], pcs_sample=10)
+
+    result = results["results"][0]
+    assert result["population"]["providers"] == 50
+    assert result["population"]["field_confidence"] >= 50 * 5
+    for path in ["compute_pcs", "recompute_pcs_for_all", "recompute_drift_for_all"]:
+        metrics = result["paths"][path]
+        assert metrics["queries"] > 0
+        assert metrics["wall_seconds"] >= 0
+        assert "peak_memory_mb" in metrics
+
+
+def test_compare_to_baseline_flags_query_growth():
+    baseline = {"results": [{"size": 10, "paths": {"compute_pcs": {"wall_seconds": 1.0, "queries": 30, "peak_memory_mb": 1.0}}}]}
+    current = {"results": [{"size": 10, "paths": {"compute_pcs": {"wall_seconds": 1.1, "queries": 31, "peak_memory_mb": 1.0}}}]}
+
+    regressions = compare_to_baseline(current, baseline, tolerance=0.25)
+
+    assert regressions == ["size=10 compute_pcs.queries: 30 -> 31"]
@@ -1,7 +1,8 @@
 import json
 
-from backend.agents.data_validation_agent import DataValidationAgent
+from backend.agents.data_validation_agent import AGREEMENT_SOURCE_RELIABILITY, DataValidationAgent
 from backend.db import Provider
+from backend.external.sources import source_weight
 
 
 def test_data_validation_agent_returns_validated_fields(db_session, monkeypatch):
@@ -25,6 +26,13 @@ def test_data_validation_agent_returns_validated_fields(db_session, monkeypatch)
         )
 
     monkeypatch.setattr("backend.agents.data_validation_agent.call_gemini", fake_call_gemini)
+    # A lower-weight listing disagrees on every field, so each one is a conflict.
+    fetch = DataValidationAgent._fetch_sources
+    monkeypatch.setattr(
+        DataValidationAgent,
+        "_fetch_sources",
+        lambda self, provider: {**fetch(self, provider), "web": {"phone": "555-0999", "address": "9 Elm Rd", "specialty": "Oncology"}},
+    )
 
     agent = DataValidationAgent(use_live_npi=False)
     agent.llm_enabled = True  # Enable LLM so the mocked call_gemini is used
@@ -35,3 +43,17 @@ def test_data_validation_agent_returns_validated_fields(db_session, monkeypatch)
     assert result.validated_fields["phone"]["value"] == "555-0001"
     assert result.validated_fields["phone"]["confidence"] == 0.92
 
+
+def test_single_candidate_is_resolved_without_the_llm(db_session, mocker):
+    provider = Provider(external_id="X124", name="Dr. Solo", phone="555-0002", address="1 Main St", specialty="Cardiology")
+    db_session.add(provider)
+    db_session.commit()
+    call = mocker.patch("backend.agents.data_validation_agent.call_gemini")
+
+    agent = DataValidationAgent(use_live_npi=False)
+    agent.llm_enabled = True
+    result = agent.validate_provider(db_session, provider.id)
+
+    call.assert_not_called()
+    expected = round(AGREEMENT_SOURCE_RELIABILITY * source_weight("original"), 4)
+    assert result.validated_fields["phone"] == {"value": "555-0002", "confidence": expected, "sources": ["original"]}
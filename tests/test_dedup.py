@@ -0,0 +1,47 @@
+from backend.db import DuplicateCluster, Provider
+from backend.dedup import detect_duplicates, name_tokens, soundex
+
+
+def test_soundex_and_name_tokens():
+    assert soundex("Robert") == soundex("Rupert") == "R163"
+    assert soundex("Ashcraft") == "A261"
+    assert soundex("Tymczak") == "T522"
+    assert name_tokens("Verma, Rohan MD") == name_tokens("Dr. Rohan Verma") == ["ROHAN", "VERMA"]
+
+
+def test_detect_duplicates_clusters_within_blocks(db_session):
+    db_session.add_all(
+        [
+            Provider(external_id="1234567890", name="Dr. Alice Moore", phone="111-111-1111", address="1 Elm St"),
+            Provider(external_id="123-456-7890", name="Alice Moore", phone="222-222-2222", address="9 Pine Rd"),
+            # Same clinician at two addresses: same name and phone.
+            Provider(external_id="P1", name="Dr. Rohan Verma", phone="022-40001234", address="ABC Heart Clinic, Mumbai"),
+            Provider(external_id="P2", name="Verma, Rohan", phone="(022) 4000-1234", address="City Hospital, Pune"),
+            # Colleague sharing the practice phone and address is not a duplicate.
+            Provider(external_id="P3", name="Dr. Meera Patel", phone="022-40001234", address="ABC Heart Clinic, Mumbai"),
+        ]
+    )
+    db_session.commit()
+
+    stats = detect_duplicates(db_session)
+    clusters = db_session.query(DuplicateCluster).order_by(DuplicateCluster.score.desc()).all()
+
+    assert stats["clusters"] == 2
+    assert [sorted(m.provider_id for m in c.members) for c in clusters] == [[1, 2], [3, 4]]
+    assert clusters[0].reasons == ["npi"]
+    assert set(clusters[1].reasons) >= {"name", "phone"}
+
+    # Re-running replaces rather than accumulates clusters.
+    detect_duplicates(db_session)
+    assert db_session.query(DuplicateCluster).count() == 2
+
+
+def test_oversized_blocks_are_skipped(db_session):
+    db_session.add_all(
+        [Provider(external_id=f"X{i}", name=f"Dr. Person{i} Kumar", phone="1800-000-000") for i in range(5)]
+    )
+    db_session.commit()
+
+    stats = detect_duplicates(db_session, max_block_size=3)
+    assert stats["oversized_blocks"] >= 1
+    assert stats["clusters"] == 0
@@ -0,0 +1,105 @@
+import asyncio
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+from backend import document_store, ocr
+from backend.db import Document, Provider
+from backend.document_store import UnsupportedDocumentType, UploadTooLarge, store_stream
+from backend.ocr import OcrPool, OcrResult
+
+
+def _png(color="white"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def _chunks(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_store_stream_dedupes_by_content(tmp_path):
+    data = _png()
+    first = asyncio.run(store_stream(_chunks(data, 7), root=tmp_path))
+    second = asyncio.run(store_stream(_chunks(data, 4096), root=tmp_path))
+
+    assert first.created and not second.created
+    assert first.path == second.path
+    assert first.path.suffix == ".png" and first.path.read_bytes() == data
+    assert first.path.relative_to(tmp_path).parts[:2] == (first.content_hash[:2], first.content_hash[2:4])
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_store_stream_writes_off_the_event_loop(tmp_path, monkeypatch):
+    writers = []
+    write = document_store._write
+
+    def recording_write(fh, digest, data):
+        writers.append(threading.current_thread())
+        write(fh, digest, data)
+
+    monkeypatch.setattr(document_store, "WRITE_CHUNK", 16)
+    monkeypatch.setattr(document_store, "_write", recording_write)
+    data = _png()
+    stored = asyncio.run(store_stream(_chunks(data, 7), root=tmp_path))
+
+    assert stored.path.read_bytes() == data
+    assert len(writers) > 1 and threading.main_thread() not in writers
+
+
+def test_store_stream_rejects_oversized_and_unknown_uploads(tmp_path):
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(store_stream(_chunks(_png(), 8), max_bytes=20, root=tmp_path))
+    with pytest.raises(UnsupportedDocumentType):
+        asyncio.run(store_stream(_chunks(b"<html>not a scan</html>", 8), root=tmp_path))
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+def test_upload_endpoint_stores_once_and_reuses_ocr(api_client, file_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(document_store, "SessionLocal", file_session)
+    monkeypatch.setattr(document_store, "DOCUMENT_STORE_DIR", tmp_path / "store")
+    monkeypatch.setattr("backend.agents.legacy.ocr_version", lambda: "v1")
+
+    jobs = []
+
+    def fake_job(path, timeout):
+        jobs.append(path)
+        return OcrResult(text="MEDICAL LICENSE", confidence=0.88)
+
+    monkeypatch.setattr(ocr, "_pool", OcrPool(workers=0, job=fake_job))
+
+    with file_session() as db:
+        providers = [Provider(external_id=f"U{i}", name=f"Dr. Upload {i}") for i in range(2)]
+        db.add_all(providers)
+        db.commit()
+        first_id, second_id = [p.id for p in providers]
+
+    scan = _png()
+    created = api_client.post(f"/providers/{first_id}/documents", content=scan)
+    assert created.status_code == 201
+    assert created.json()["file_stored"] is True and created.json()["ocr_queued"] is True
+
+    again = api_client.post(f"/providers/{first_id}/documents", content=scan)
+    assert again.status_code == 200
+    assert again.json()["document_id"] == created.json()["document_id"]
+
+    other = api_client.post(f"/providers/{second_id}/documents", content=scan)
+    assert other.status_code == 201
+    assert other.json()["file_stored"] is False
+    assert other.json()["content_hash"] == created.json()["content_hash"]
+
+    # One file on disk, OCRed once, the second provider's copy reused it.
+    assert len(jobs) == 1
+    assert api_client.get(f"/providers/{second_id}/ocr").json()["ocr_text"] == "MEDICAL LICENSE"
+
+    assert api_client.post(f"/providers/{first_id}/documents", content=b"plain text").status_code == 415
+    monkeypatch.setattr(document_store, "MAX_UPLOAD_BYTES", 10)
+    assert api_client.post(f"/providers/{first_id}/documents", content=scan).status_code == 413
+    assert api_client.post("/providers/999999/documents", content=scan).status_code == 404
+
+    with file_session() as db:
+        assert db.query(Document).count() == 2
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+from backend import enrichment_store
+from backend.agents import InformationEnrichmentAgent
+from backend.agents.information_enrichment_agent import EnrichmentResult
+from backend.db import Provider, ProviderEnrichment
+from backend.enrichment_store import (
+    current_fingerprint,
+    enrichment_fingerprint,
+    is_stale,
+    refresh_enrichment,
+    save_enrichments,
+)
+
+
+def test_stored_enrichment_goes_stale_on_age_or_changed_inputs(db_session):
+    provider = Provider(external_id="E1", name="Dr. Enrich", specialty="Cardiology")
+    db_session.add(provider)
+    db_session.commit()
+
+    row = refresh_enrichment(db_session, provider.id)
+    fingerprint = current_fingerprint(provider)
+    assert row.fields["summary"]
+    assert not is_stale(row, fingerprint)
+    assert is_stale(row, fingerprint, now=datetime.now(timezone.utc) + timedelta(days=2))
+
+    provider.specialty = "Dermatology"
+    assert is_stale(row, current_fingerprint(provider))
+    assert is_stale(None, fingerprint)
+
+
+def test_save_enrichments_upserts_one_row_per_provider(db_session):
+    provider = Provider(external_id="E2", name="Dr. Upsert")
+    db_session.add(provider)
+    db_session.commit()
+
+    for summary in ("first", "second"):
+        result = EnrichmentResult(provider_id=provider.id, enriched_fields={"summary": summary})
+        save_enrichments(db_session, [(provider, result)], llm_enabled=False)
+        db_session.commit()
+
+    rows = db_session.query(ProviderEnrichment).all()
+    assert [(r.provider_id, r.fields["summary"]) for r in rows] == [(provider.id, "second")]
+
+
+def test_llm_fallback_is_stored_stale_and_never_replaces_a_row(db_session):
+    provider = Provider(external_id="E4", name="Dr. Fallback")
+    db_session.add(provider)
+    db_session.commit()
+    llm_fingerprint = enrichment_fingerprint(provider, [], llm_enabled=True)
+
+    def result(summary, fallback):
+        evidence = {"snippets": [], "llm_fallback": fallback}
+        return EnrichmentResult(provider_id=provider.id, enriched_fields={"summary": summary}, raw_evidence=evidence)
+
+    [row] = save_enrichments(db_session, [(provider, result("fallback", True))], llm_enabled=True)
+    db_session.commit()
+    assert row.fields["summary"] == "fallback"
+    assert is_stale(row, llm_fingerprint)
+
+    save_enrichments(db_session, [(provider, result("from llm", False))], llm_enabled=True)
+    db_session.commit()
+    assert not is_stale(row, llm_fingerprint)
+
+    save_enrichments(db_session, [(provider, result("fallback again", True))], llm_enabled=True)
+    db_session.commit()
+    assert row.fields["summary"] == "from llm"
+    assert not is_stale(row, llm_fingerprint)
+
+
+def test_details_serve_stored_enrichment_and_refresh_in_background(api_client, file_session, monkeypatch, mocker):
+    monkeypatch.setattr(enrichment_store, "SessionLocal", file_session)
+
+    with file_session() as db:
+        provider = Provider(external_id="E3", name="Dr. Detail", specialty="Cardiology")
+        db.add(provider)
+        db.commit()
+        provider_id = provider.id
+
+    enrich = mocker.spy(InformationEnrichmentAgent, "enrich_provider")
+    first = api_client.get(f"/providers/{provider_id}/details").json()["enrichment"]
+    assert first["stale"] is True and first["summary"] is None
+    assert enrich.call_count == 1  # the background refresh, after the response
+
+    second = api_client.get(f"/providers/{provider_id}/details").json()["enrichment"]
+    assert second["stale"] is False
+    assert second["summary"] and second["refreshed_at"]
+    assert enrich.call_count == 1
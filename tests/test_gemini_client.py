@@ -0,0 +1,140 @@
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from backend.llm import backends
+from backend.llm.backends import GeminiBackend
+from backend.llm.gemini_client import (
+    MODEL_NAME,
+    CircuitBreaker,
+    CircuitOpenError,
+    GeminiClient,
+    QuotaExceededError,
+    RateLimiter,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = []
+
+    def generate_content(self, prompt, request_options=None):
+        self.calls.append(request_options)
+        if self.errors:
+            raise self.errors.pop(0)
+        return FakeResponse(" ok ")
+
+
+def test_rate_limiter_waits_for_budget_then_gives_up():
+    clock = Clock()
+    limiter = RateLimiter(rpm=60, tpm=1_000_000, clock=clock, sleep=clock.sleep)
+
+    for _ in range(60):
+        limiter.acquire(10, max_wait=0)
+    start = clock.now
+    limiter.acquire(10, max_wait=5)
+    assert clock.now - start == pytest.approx(1.0)
+
+    with pytest.raises(QuotaExceededError):
+        limiter.acquire(10, max_wait=0.5)
+
+
+def test_token_budget_throttles_large_prompts():
+    clock = Clock()
+    limiter = RateLimiter(rpm=1000, tpm=600, clock=clock, sleep=clock.sleep)
+    limiter.acquire(600, max_wait=0)
+    start = clock.now
+    limiter.acquire(300, max_wait=60)
+    assert clock.now - start == pytest.approx(30.0)
+
+
+def test_model_is_created_once(monkeypatch):
+    created = []
+    monkeypatch.setattr(backends.genai, "GenerativeModel", lambda name: created.append(name) or FakeModel())
+    monkeypatch.setattr(backends.genai, "configure", lambda **kwargs: None)
+
+    client = GeminiClient(timeout=7, backend=GeminiBackend(MODEL_NAME))
+    assert client.generate("a") == "ok"
+    assert client.generate("b") == "ok"
+    assert len(created) == 1
+    assert client.backend.model.calls == [{"timeout": 7}, {"timeout": 7}]
+
+
+def test_circuit_opens_on_quota_burst_and_recovers_after_cooldown():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, window=60, cooldown=30, clock=clock)
+    backend = GeminiBackend(MODEL_NAME)
+    backend._model = FakeModel(
+        errors=[google_exceptions.ResourceExhausted("Resource exhausted"), google_exceptions.TooManyRequests("quota")]
+    )
+    client = GeminiClient(breaker=breaker, limiter=RateLimiter(clock=clock, sleep=clock.sleep), backend=backend)
+
+    for _ in range(2):
+        with pytest.raises(QuotaExceededError):
+            client.generate("p")
+    assert breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        client.generate("p")
+    assert len(backend.model.calls) == 2
+
+    clock.now += 31
+    assert breaker.state == "half_open"
+    assert client.generate("p") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_circuit():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 11
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_unrelated_error_during_probe_keeps_circuit_usable():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+    backend = GeminiBackend(MODEL_NAME)
+    backend._model = FakeModel(errors=[google_exceptions.TooManyRequests("quota"), ValueError("bad prompt")])
+    client = GeminiClient(breaker=breaker, limiter=RateLimiter(clock=clock, sleep=clock.sleep), backend=backend)
+
+    with pytest.raises(QuotaExceededError):
+        client.generate("p")
+    clock.now += 11
+    with pytest.raises(ValueError):
+        client.generate("p")
+    assert breaker.state == "half_open"
+    assert client.generate("p") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_429_in_message_alone_is_not_a_quota_error():
+    breaker = CircuitBreaker(failure_threshold=1)
+    backend = GeminiBackend(MODEL_NAME)
+    backend._model = FakeModel(errors=[ValueError("NPI 1234567429 not found")])
+    client = GeminiClient(breaker=breaker, backend=backend)
+
+    with pytest.raises(ValueError):
+        client.generate("p")
+    assert breaker.state == "closed"
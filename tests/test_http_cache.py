@@ -0,0 +1,92 @@
+from sqlalchemy import insert
+
+from backend import http_cache
+from backend.db import FieldConfidence, Provider, ValidationRun
+from backend.http_cache import HttpResponseCache, etag_matches, get_versions
+from backend.stats_snapshot import refresh_stats
+
+
+def test_cache_is_bounded_lru_with_ttl():
+    now = [0.0]
+    cache = HttpResponseCache(max_bytes=100, ttl=10, clock=lambda: now[0])
+    for key in "abcd":
+        cache.put(key, b"x" * 25)
+    assert cache.get("a") is not None  # a is now most recent
+    cache.put("e", b"x" * 25)
+    assert cache.get("b") is None and cache.get("a") is not None
+    assert cache.stats()["bytes"] == 100
+
+    cache.put("huge", b"x" * 26)  # over a quarter of the budget: served, not kept
+    assert cache.get("huge") is None
+
+    now[0] = 11
+    assert cache.get("a") is None
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_versions_bump_on_commit_only(db_session):
+    versions = get_versions()
+    provider = Provider(external_id="V1", name="Dr. Version")
+    db_session.add(provider)
+    db_session.commit()
+    before, before_global = versions.current(provider.id), versions.current()
+
+    provider.phone = "555-0100"
+    db_session.flush()
+    db_session.rollback()
+    assert versions.current(provider.id) == before and versions.current() == before_global
+
+    db_session.execute(insert(FieldConfidence), [{"provider_id": provider.id, "field_name": "phone", "confidence": 0.9}])
+    db_session.commit()
+    assert versions.current(provider.id) != before
+
+    unrelated = versions.current(provider.id)
+    db_session.add(ValidationRun(run_type="daily"))
+    db_session.commit()
+    assert versions.current(provider.id) == unrelated
+    assert versions.current() != before_global
+
+
+def test_conditional_get_and_invalidation(api_client, file_session):
+    with file_session() as db:
+        first, second = Provider(external_id="C1", name="Dr. One"), Provider(external_id="C2", name="Dr. Two")
+        db.add_all([first, second])
+        db.commit()
+        first_id, second_id = first.id, second.id
+
+    response = api_client.get(f"/providers/{first_id}")
+    etag = response.headers["etag"]
+    assert response.status_code == 200 and response.json()["name"] == "Dr. One"
+
+    hits = http_cache.get_http_cache().stats()["hits"]
+    not_modified = api_client.get(f"/providers/{first_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert http_cache.get_http_cache().stats()["hits"] == hits + 1
+
+    stats_etag = api_client.get("/stats").headers["etag"]
+
+    # A write to another provider leaves this one's entry valid.
+    with file_session() as db:
+        db.get(Provider, second_id).phone = "555-0199"
+        db.commit()
+    assert api_client.get(f"/providers/{first_id}", headers={"If-None-Match": etag}).status_code == 304
+    assert api_client.get("/stats", headers={"If-None-Match": stats_etag}).status_code == 304  # same body
+
+    with file_session() as db:
+        db.get(Provider, first_id).name = "Dr. Renamed"
+        db.add(ValidationRun(run_type="daily", count_processed=2))
+        refresh_stats(db)
+        db.commit()
+    changed = api_client.get(f"/providers/{first_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["name"] == "Dr. Renamed"
+    assert changed.headers["etag"] != etag
+    assert api_client.get("/stats", headers={"If-None-Match": stats_etag}).status_code == 200
+
+    assert api_client.get("/providers/999999").status_code == 404
@@ -0,0 +1,87 @@
+from backend.agents import ocr_candidates
+from backend.license_parser import parse_date, parse_license
+
+
+def _words(rows, conf=90):
+    """Word boxes for rows of text, one row per 20px line."""
+    words = []
+    for line_no, row in enumerate(rows):
+        left = 0
+        for token in row.split():
+            words.append({"text": token, "conf": conf, "left": left, "top": 20 * line_no, "width": 8 * len(token), "height": 12})
+            left += 8 * len(token) + 6
+    return words
+
+
+def test_generic_layout_matches_demo_license_scan():
+    fields = parse_license(words=_words(["License: LIC-ROHAN-1", "Name: Dr. Rohan Verma", "Expiry: 2026-06-30"]))
+
+    assert fields.template == "generic"
+    assert fields.complete
+    assert fields.as_dict() == {
+        "license_no": "LIC-ROHAN-1",
+        "expiry_date": "2026-06-30",
+        "name": "Dr. Rohan Verma",
+        "template": "generic",
+        "field_confidences": {"license_no": 0.765, "expiry_date": 0.765, "name": 0.765},
+    }
+
+
+def test_state_template_value_below_label_and_word_confidence():
+    words = _words(
+        [
+            "MEDICAL BOARD OF CALIFORNIA",
+            "Physician and Surgeon License Number",
+            "A 123456",
+            "Valid through March 31, 2027",
+        ]
+    )
+    for w in words:
+        if w["text"] == "123456":
+            w["conf"] = 50
+
+    fields = parse_license(words=words)
+
+    assert fields.template == "CA"
+    assert fields.license_no.value == "A123456"
+    assert fields.license_no.confidence == (90 + 50) / 2 / 100 * 0.9
+    assert fields.expiry_date.value == "2027-03-31"
+    assert fields.expiry_date.confidence == 0.9
+
+
+def test_words_on_one_line_are_read_left_to_right():
+    words = _words(["Expiry: 12/31/2025"])
+    words.reverse()
+    assert parse_license(words=words).expiry_date.value == "2025-12-31"
+
+
+def test_dates_follow_template_order_and_reject_ambiguity():
+    assert parse_date("03/04/2026", ("%m/%d/%Y",)) == "2026-03-04"
+    assert parse_date("03/04/2026", ("%m/%d/%Y", "%d/%m/%Y")) is None
+    assert parse_date("14 Feb. 2025", ("%d %b %Y",)) == "2025-02-14"
+
+    fields = parse_license("Maharashtra Medical Council\nRegistration License No: MMC-45678\nExpiry: 03/04/2026")
+    assert (fields.template, fields.license_no.value, fields.expiry_date.value) == ("MH", "MMC-45678", "2026-04-03")
+
+
+def test_plain_text_without_line_breaks_uses_text_confidence():
+    fields = parse_license("License: LIC-DEMO-1 Name: Dr. Test One Expiry: 2025-12-31", text_confidence=0.8)
+    assert fields.name.value == "Dr. Test One"
+    assert fields.license_no.confidence == 0.8 * 0.85
+
+
+def test_only_confident_fields_become_qa_candidates():
+    ocr_data = {
+        "license_no": "LIC-1",
+        "expiry_date": "2026-01-01",
+        "field_confidences": {"license_no": 0.9, "expiry_date": 0.3},
+    }
+    assert ocr_candidates(ocr_data) == {"license_no": [{"source": "ocr", "value": "LIC-1"}]}
+    assert ocr_candidates({}) == {}
+
+
+def test_parses_a_batch_of_generated_pages():
+    pages = [_words([f"License: LIC-{i}", f"Name: Dr. Person {i}", "Expiry: 2026-06-30"]) for i in range(200)]
+    results = [parse_license(words=words) for words in pages]
+    assert all(r.complete for r in results)
+    assert [r.license_no.value for r in results] == [f"LIC-{i}" for i in range(200)]
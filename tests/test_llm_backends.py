@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from backend.agents.data_validation_agent import Candidate, DataValidationAgent
+from backend.agents.information_enrichment_agent import InformationEnrichmentAgent
+from backend.llm import gemini_client
+from backend.llm.backends import RecordingBackend, ReplayBackend, StandInBackend, StandInConfig
+from backend.llm.gemini_client import MODEL_NAME
+from scripts.load_llm_agents import run_load
+
+
+@pytest.fixture
+def stand_in():
+    backend = StandInBackend(StandInConfig(latency_ms=0, distribution="fixed", seed=7))
+    gemini_client.set_backend(backend)
+    yield backend
+    gemini_client.set_backend(None)
+
+
+def test_agents_use_stand_in_without_api_key(stand_in, monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    agent = DataValidationAgent()
+    assert agent.llm_enabled
+
+    candidates = [
+        Candidate(value="555-0001", source="npi", score_hint=1.0),
+        Candidate(value="555-0002", source="maps", score_hint=0.5),
+    ]
+    assert agent.get_best_value_with_llm("phone", candidates) == {"value": "555-0001", "confidence": 0.75, "sources": ["npi"]}
+
+    batch = agent.reconcile_batch([("a", "phone", candidates), ("b", "address", list(reversed(candidates)))])
+    assert batch["a"]["confidence"] == 0.75 and batch["b"]["sources"] == ["npi"]
+
+    provider = type("P", (), {"id": 1, "name": "Dr. Stand", "specialty": "Cardiology"})()
+    enriched = InformationEnrichmentAgent()._llm_structured_extract(provider, ["bio"])
+    assert enriched["summary"] == "Dr. Stand practices Cardiology."
+
+
+def test_quota_injection_opens_circuit_and_agents_fall_back(stand_in):
+    stand_in.config.quota_rate = 1.0
+    agent = DataValidationAgent()
+    candidates = [Candidate(value="x", source="npi", score_hint=1.0), Candidate(value="y", source="maps", score_hint=0.5)]
+
+    for _ in range(gemini_client.GEMINI_CIRCUIT_FAILURES + 2):
+        assert agent.get_best_value_with_llm("phone", candidates)["confidence"] == 0.6
+    assert gemini_client.get_client().breaker.state == "open"
+
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    recorder = RecordingBackend(StandInBackend(StandInConfig(latency_ms=0, distribution="fixed")), path, MODEL_NAME)
+    first = recorder.generate("Summarize the reasoning behind this provider data decision.")
+    assert json.loads(path.read_text().splitlines()[0])["response"] == first
+
+    replay = ReplayBackend(path, MODEL_NAME, replay_latency=False)
+    assert replay.generate("  Summarize the reasoning behind this provider data decision.  ") == first
+    with pytest.raises(LookupError):
+        replay.generate("unrecorded prompt")
+    assert (replay.hits, replay.misses) == (1, 1)
+
+
+def test_load_harness_reports_every_request():
+    backend = StandInBackend(StandInConfig(latency_ms=1, distribution="uniform", seed=3))
+    report = run_load(backend, ["validation", "batch", "summary"], requests=30, concurrency=4, rpm=10_000, tpm=10_000_000, max_wait=1)
+    assert sum(w["count"] for w in report["workloads"].values()) == 30
+    assert report["backend_ok"] + report["short_circuited"] == 30
+    assert gemini_client.get_client().backend.name == "gemini"
@@ -0,0 +1,55 @@
+from backend.agents import _confidence_for_candidates
+from backend.agents.data_validation_agent import Candidate, DataValidationAgent
+from backend.utils.normalize import normalize_address, normalize_phone, normalize_specialty, values_agree
+
+
+def test_phone_e164():
+    assert normalize_phone("(555) 123-4567") == "+15551234567"
+    assert normalize_phone("1-555-123-4567 ext. 89") == "+15551234567"
+    assert normalize_phone("+91 22 4123 4567") == "+912241234567"
+    assert normalize_phone("022-41234567", default_country_code="91") == "+912241234567"
+    assert normalize_phone("12345") is None
+
+
+def test_address_usps_abbreviations():
+    assert normalize_address("123 North Main Street, Suite 200") == "123 N MAIN ST STE 200"
+    assert normalize_address("123 N. Main St., Ste 200") == "123 N MAIN ST STE 200"
+    assert normalize_address("9 Elm Ave, Springfield IL 62701-1234") == "9 ELM AVE SPRINGFIELD IL 62701"
+
+
+def test_specialty_canonical_names():
+    assert normalize_specialty("Dermatologist") == "Dermatology"
+    assert normalize_specialty("cardiologist") == "Cardiology"
+    assert normalize_specialty("OB/GYN") == "Obstetrics and Gynecology"
+    assert values_agree("specialty", "Pediatrician", "PEDIATRICS")
+
+
+def test_agreeing_variants_skip_the_llm(monkeypatch):
+    def fail(prompt):
+        raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr("backend.agents.data_validation_agent.call_gemini", fail)
+    agent = DataValidationAgent()
+    agent.llm_enabled = True
+
+    best = agent.get_best_value_with_llm(
+        "phone",
+        [Candidate("(555) 123-4567", "npi", 1.0), Candidate("555-123-4567", "maps", 0.6)],
+    )
+
+    assert best["value"] == "(555) 123-4567"
+    assert best["sources"] == ["npi", "maps"]
+    assert 0.9 < best["confidence"] < 1.0
+
+
+def test_qa_confidence_groups_formatting_variants():
+    res = _confidence_for_candidates(
+        [
+            {"source": "original", "value": "12 Baker Street"},
+            {"source": "maps", "value": "12 Baker St."},
+            {"source": "hospital", "value": "40 Other Rd"},
+        ],
+        "address",
+    )
+    assert res["best"] == "12 Baker St."
+    assert res["sources"] == ["original", "maps"]
@@ -0,0 +1,86 @@
+import pytest
+
+from backend.external.npi_cache import NpiCache
+from backend.external.npi_client import NpiLookupError
+
+VALID_NPI = "1679576722"
+
+
+class FakeRegistry:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self, npi):
+        self.calls += 1
+        if self.fail:
+            raise NpiLookupError(npi, "down")
+        return self.payload
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(tmp_path, registry, clock, **kwargs):
+    return NpiCache(path=tmp_path / "npi.sqlite", ttl=100, negative_ttl=10, stale_ttl=50, fetcher=registry, clock=clock, **kwargs)
+
+
+def test_hits_are_served_without_network_and_persist(tmp_path):
+    registry, clock = FakeRegistry({"phone": "555"}), Clock()
+    cache = _cache(tmp_path, registry, clock)
+
+    assert cache.get(VALID_NPI) == {"phone": "555"}
+    assert cache.get(VALID_NPI) == {"phone": "555"}
+    assert registry.calls == 1
+
+    reopened = _cache(tmp_path, registry, clock)
+    assert reopened.get(VALID_NPI) == {"phone": "555"}
+    assert registry.calls == 1
+    assert reopened.stats()["hits"] == 1
+
+
+def test_negative_and_invalid_lookups(tmp_path):
+    registry, clock = FakeRegistry({}), Clock()
+    cache = _cache(tmp_path, registry, clock)
+
+    assert cache.get("123") == {}
+    assert cache.get(VALID_NPI) == {}
+    assert cache.get(VALID_NPI) == {}
+    assert registry.calls == 1
+
+    stats = cache.stats()
+    assert stats["invalid"] == 1
+    assert stats["negative_hits"] == 1
+
+
+def test_stale_entries_are_served_while_refreshing(tmp_path):
+    registry, clock = FakeRegistry({"phone": "old"}), Clock()
+    cache = _cache(tmp_path, registry, clock)
+    cache.get(VALID_NPI)
+
+    registry.payload = {"phone": "new"}
+    clock.now += 120
+    assert cache.get(VALID_NPI) == {"phone": "old"}
+    cache.close()
+
+    assert registry.calls == 2
+    assert _cache(tmp_path, registry, clock).get(VALID_NPI) == {"phone": "new"}
+
+
+def test_expired_entry_is_served_when_registry_fails(tmp_path):
+    registry, clock = FakeRegistry({"phone": "old"}), Clock()
+    cache = _cache(tmp_path, registry, clock)
+    cache.get(VALID_NPI)
+
+    registry.fail = True
+    clock.now += 500
+    assert cache.get(VALID_NPI) == {"phone": "old"}
+
+    with pytest.raises(NpiLookupError):
+        cache.get("1234567893")
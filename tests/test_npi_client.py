@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from backend.external import npi_client
+from backend.external.npi_client import AsyncNpiClient, NpiClient, NpiLookupError
+from backend.external.npi_stub_server import StubConfig, start_stub_server
+
+VALID_NPI = "1679576722"
+FAILING_NPI = "1234567893"
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(npi_client, "_backoff_delay", lambda attempt, retry_after=None: 0.0)
+
+
+def _stub(**kwargs):
+    server, url = start_stub_server(StubConfig(**kwargs))
+    return server, url
+
+
+def test_lookup_picks_location_address_and_primary_taxonomy():
+    server, url = _stub()
+    try:
+        result = NpiClient(base_url=url).lookup(VALID_NPI)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert "Main St" in result["address"]
+    assert result["phone"]
+    assert result["specialty"]
+    assert result["license_expiry"] is None
+
+
+def test_not_found_and_invalid_return_empty():
+    server, url = _stub(not_found_rate=1.0)
+    try:
+        client = NpiClient(base_url=url)
+        assert client.lookup(VALID_NPI) == {}
+        assert client.lookup("1234") == {}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_persistent_failures_raise_after_retries(no_backoff):
+    server, url = _stub(error_rate=1.0)
+    try:
+        with pytest.raises(NpiLookupError) as excinfo:
+            NpiClient(base_url=url, max_retries=2).lookup(VALID_NPI)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert excinfo.value.status_code == 503
+
+
+def test_async_lookup_many_separates_failures(no_backoff):
+    server, url = _stub(failing={FAILING_NPI})
+
+    async def run():
+        async with AsyncNpiClient(base_url=url, max_in_flight=4, max_retries=1) as client:
+            return await client.lookup_many([VALID_NPI, "0000000000", FAILING_NPI])
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert results[VALID_NPI]["specialty"]
+    assert results["0000000000"] == {}
+    failure = results[FAILING_NPI]
+    assert isinstance(failure, NpiLookupError)
+    assert failure.status_code == 500
@@ -0,0 +1,104 @@
+import csv
+import zipfile
+
+from backend.agents.data_validation_agent import DataValidationAgent
+from backend.db import NppesRecord, Provider
+from backend.external.nppes_ingest import ingest_nppes_file, lookup_local_npi
+
+NPI_A = "1679576722"
+NPI_B = "1234567893"
+
+COLUMNS = [
+    "NPI",
+    "Entity Type Code",
+    "Provider First Line Business Mailing Address",
+    "Provider Business Mailing Address City Name",
+    "Provider Business Mailing Address State Name",
+    "Provider Business Mailing Address Postal Code",
+    "Provider Business Mailing Address Telephone Number",
+    "Provider First Line Business Practice Location Address",
+    "Provider Business Practice Location Address City Name",
+    "Provider Business Practice Location Address State Name",
+    "Provider Business Practice Location Address Postal Code",
+    "Provider Business Practice Location Address Telephone Number",
+    "Healthcare Provider Taxonomy Code_1",
+    "Provider License Number_1",
+    "Healthcare Provider Primary Taxonomy Switch_1",
+    "Healthcare Provider Taxonomy Code_2",
+    "Provider License Number_2",
+    "Healthcare Provider Primary Taxonomy Switch_2",
+    "NPI Deactivation Date",
+    "NPI Reactivation Date",
+]
+
+
+def _row(npi, location="1 Clinic Rd", phone="2175550100", deactivated=""):
+    return {
+        "NPI": npi,
+        "Entity Type Code": "1",
+        "Provider First Line Business Mailing Address": "PO Box 9",
+        "Provider Business Mailing Address City Name": "SPRINGFIELD",
+        "Provider Business Mailing Address State Name": "IL",
+        "Provider Business Mailing Address Postal Code": "62701",
+        "Provider Business Mailing Address Telephone Number": "2175550199",
+        "Provider First Line Business Practice Location Address": location,
+        "Provider Business Practice Location Address City Name": "SPRINGFIELD",
+        "Provider Business Practice Location Address State Name": "IL",
+        "Provider Business Practice Location Address Postal Code": "62701",
+        "Provider Business Practice Location Address Telephone Number": phone,
+        "Healthcare Provider Taxonomy Code_1": "208D00000X",
+        "Provider License Number_1": "036-000001",
+        "Healthcare Provider Primary Taxonomy Switch_1": "N",
+        "Healthcare Provider Taxonomy Code_2": "207RC0000X",
+        "Provider License Number_2": "036-000002",
+        "Healthcare Provider Primary Taxonomy Switch_2": "Y",
+        "NPI Deactivation Date": deactivated,
+        "NPI Reactivation Date": "",
+    }
+
+
+def _write_csv(path, rows):
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def test_full_then_incremental_ingest(db_session, tmp_path):
+    full = _write_csv(tmp_path / "npidata_pfile_full.csv", [_row(NPI_A), _row(NPI_B), _row("123")])
+    archive = tmp_path / "NPPES_Data_Dissemination.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.write(full, "npidata_pfile_20240101-20240131.csv")
+
+    stats = ingest_nppes_file(db_session, archive, {"207RC0000X": "Cardiovascular Disease"}, chunk_size=1)
+    assert stats == {"rows": 3, "upserted": 2, "skipped": 1}
+
+    record = lookup_local_npi(db_session, NPI_A)
+    assert record["address"] == "1 Clinic Rd, SPRINGFIELD, IL, 62701"
+    assert record["phone"] == "2175550100"
+    assert record["specialty"] == "Cardiovascular Disease"
+    assert record["license_no"] == "036-000002"
+
+    weekly = _write_csv(tmp_path / "npidata_pfile_weekly.csv", [_row(NPI_A, location="9 New St"), _row(NPI_B, deactivated="01/15/2024")])
+    field_size_limit = csv.field_size_limit()
+    ingest_nppes_file(db_session, weekly)
+    assert csv.field_size_limit() == field_size_limit
+
+    assert db_session.query(NppesRecord).count() == 2
+    assert lookup_local_npi(db_session, NPI_A)["address"].startswith("9 New St")
+    # Ingested without --taxonomy: the display name from the full load stays.
+    assert lookup_local_npi(db_session, NPI_A)["specialty"] == "Cardiovascular Disease"
+    assert lookup_local_npi(db_session, NPI_B) == {}
+
+
+def test_validation_agent_reads_local_nppes(db_session, tmp_path):
+    ingest_nppes_file(db_session, _write_csv(tmp_path / "full.csv", [_row(NPI_A)]))
+    provider = Provider(external_id=NPI_A, name="Dr. Local")
+    db_session.add(provider)
+    db_session.commit()
+
+    agent = DataValidationAgent(use_local_nppes=True)
+    sources = agent._fetch_sources(provider)
+
+    assert sources["npi"]["phone"] == "2175550100"
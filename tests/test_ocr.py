@@ -0,0 +1,220 @@
+import os
+import time
+
+import pytest
+
+from PIL import Image, ImageDraw
+
+from backend import ocr
+from backend.agents import extract_from_pdfs
+from backend.db import Document, Provider
+from backend.ocr import OcrPool, OcrResult, estimate_skew, preprocess, words_from_data
+
+
+def _lined_page(size=(800, 600)):
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(60, size[1] - 60, 40):
+        draw.rectangle([60, y, size[0] - 60, y + 8], fill=0)
+    return image
+
+
+def test_preprocess_grayscale_dpi_and_downscale():
+    image = Image.new("RGB", (400, 200), "white")
+    image.info["dpi"] = (150, 150)
+    out = preprocess(image, target_dpi=300, max_side=4000)
+    assert out.mode == "L"
+    assert out.size == (800, 400)
+
+    huge = Image.new("RGB", (6000, 3000), "white")
+    assert max(preprocess(huge, max_side=2000).size) == 2000
+
+
+def test_estimate_skew_levels_rotated_text_lines():
+    skewed = _lined_page().rotate(3, resample=Image.BICUBIC, expand=True, fillcolor=255)
+    assert abs(estimate_skew(skewed) + 3) <= 1.0
+    assert estimate_skew(_lined_page()) == 0.0
+
+
+def test_words_from_data_skips_layout_rows():
+    data = {
+        "text": ["", "LICENSE", "  ", "A-123"],
+        "conf": ["-1", "91", "-1", "87.5"],
+        "left": [0, 10, 0, 80],
+        "top": [0, 5, 0, 5],
+        "width": [0, 60, 0, 40],
+        "height": [0, 12, 0, 12],
+    }
+    words = words_from_data(data)
+    assert [w["text"] for w in words] == ["LICENSE", "A-123"]
+    assert words[1] == {"text": "A-123", "conf": 87.5, "left": 80, "top": 5, "width": 40, "height": 12}
+
+
+def slow_job(path, timeout):
+    if path == "hang":
+        time.sleep(30)
+    return OcrResult(text=path, confidence=0.9)
+
+
+def test_hung_document_is_timed_out_and_pool_recovers():
+    # Leaves room for a fresh worker to import this module.
+    pool = OcrPool(workers=1, timeout=1.5, job=slow_job, grace=1)
+    try:
+        started = time.monotonic()
+        results = pool.run_many(["hang", "ok-after"])
+        assert time.monotonic() - started < 15
+        assert results["hang"].error == "timeout"
+        assert results["ok-after"].text == "ok-after"
+        assert pool.run("again").ok
+    finally:
+        pool.close()
+
+
+def crash_job(path, timeout):
+    time.sleep(0.2)
+    if path == "crash":
+        os._exit(1)
+    return OcrResult(text=path, confidence=0.9)
+
+
+def test_crashed_worker_resubmits_remaining_documents_together(mocker):
+    pool = OcrPool(workers=2, timeout=5, job=crash_job, grace=1)
+    rounds = mocker.spy(pool, "_run_round")
+    paths = ["crash"] + [f"doc-{i}" for i in range(8)]
+    try:
+        results = pool.run_many(paths)
+        assert results["crash"].error.startswith("BrokenProcessPool")
+        assert all(results[p].text == p for p in paths[1:])
+        # One retry round for everything left, not one round per document.
+        assert rounds.call_count == 2
+    finally:
+        pool.close()
+
+
+def test_extract_from_pdfs_uses_pool_results(db_session, tmp_path, monkeypatch):
+    path = tmp_path / "scan.png"
+    Image.new("RGB", (10, 10), "white").save(path)
+    providers = [Provider(external_id=f"O{i}", name=f"Dr. O{i}") for i in range(2)]
+    db_session.add_all(providers)
+    db_session.commit()
+    db_session.add_all(
+        [
+            Document(provider_id=providers[0].id, doc_type="license", path=str(path)),
+            Document(provider_id=providers[1].id, doc_type="license", path=str(tmp_path / "missing.png")),
+        ]
+    )
+    db_session.commit()
+
+    jobs = []
+
+    def fake_job(p, timeout):
+        jobs.append(p)
+        return OcrResult(text="STATE MEDICAL BOARD", confidence=0.83)
+
+    monkeypatch.setattr(ocr, "_pool", OcrPool(workers=0, job=fake_job))
+    extracted = extract_from_pdfs(db_session, [p.id for p in providers])
+
+    assert jobs == [str(path)]
+    assert extracted == {
+        providers[0].id: {"license_no": None, "expiry_date": None, "name": None, "field_confidences": {}, "ocr_confidence": 0.83}
+    }
+    doc = db_session.query(Document).filter_by(provider_id=providers[0].id).one()
+    assert doc.ocr_text == "STATE MEDICAL BOARD"
+
+
+def test_unchanged_documents_are_not_ocred_again(db_session, tmp_path, monkeypatch):
+    path = tmp_path / "license.png"
+    Image.new("RGB", (10, 10), "white").save(path)
+    provider = Provider(external_id="FP1", name="Dr. Print")
+    db_session.add(provider)
+    db_session.commit()
+    db_session.add(Document(provider_id=provider.id, doc_type="license", path=str(path)))
+    db_session.commit()
+
+    jobs = []
+
+    def fake_job(p, timeout):
+        jobs.append(p)
+        return OcrResult(text=f"run {len(jobs)}", confidence=0.9)
+
+    monkeypatch.setattr(ocr, "_pool", OcrPool(workers=0, job=fake_job))
+    monkeypatch.setattr("backend.agents.legacy.ocr_version", lambda: "v1")
+
+    extract_from_pdfs(db_session, [provider.id])
+    assert extract_from_pdfs(db_session, [provider.id])[provider.id]["ocr_confidence"] == 0.9
+    assert len(jobs) == 1
+
+    # Same bytes with a new mtime: hashed, not OCRed.
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    extract_from_pdfs(db_session, [provider.id])
+    assert len(jobs) == 1
+
+    Image.new("RGB", (12, 12), "black").save(path)
+    extract_from_pdfs(db_session, [provider.id])
+    assert len(jobs) == 2
+
+    monkeypatch.setattr("backend.agents.legacy.ocr_version", lambda: "v2")
+    extract_from_pdfs(db_session, [provider.id])
+    doc = db_session.query(Document).one()
+    assert len(jobs) == 3
+    assert (doc.ocr_text, doc.ocr_version) == ("run 3", "v2")
+
+
+def _fake_tesseract(pages_text, seen):
+    def image_to_data(image, **kwargs):
+        text = pages_text[len(seen)]
+        seen.append(image.size)
+        words = text.split()
+        return {
+            "text": words,
+            "conf": ["90" if i % 2 else "70" for i in range(len(words))],
+            "left": [0] * len(words),
+            "top": [0] * len(words),
+            "width": [10] * len(words),
+            "height": [10] * len(words),
+        }
+
+    return image_to_data
+
+
+def test_multipage_document_stops_at_license_page(tmp_path, monkeypatch):
+    path = tmp_path / "packet.tiff"
+    frames = [Image.new("L", (200 + 10 * i, 100), 255) for i in range(4)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    seen = []
+    pages_text = ["Credentialing packet cover", "Board certificate", "Medical License No A-123456 Expires 06/30/2027", "Malpractice"]
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", _fake_tesseract(pages_text, seen))
+
+    result = ocr.ocr_document(str(path))
+
+    assert result.ok and result.page == 3
+    assert "A-123456" in result.text
+    assert len(seen) == 3  # page 4 is never rasterized
+    assert result.page_confidences == pytest.approx([0.7667, 0.8, 0.8], abs=1e-3)
+    assert result.confidence == pytest.approx(0.8)
+    assert (result.fields["license_no"], result.fields["expiry_date"]) == ("A-123456", "2027-06-30")
+
+
+def test_document_without_license_page_keeps_most_confident_page(tmp_path, monkeypatch):
+    path = tmp_path / "packet.tiff"
+    frames = [Image.new("L", (100, 100), 255) for _ in range(2)]
+    frames[0].save(path, save_all=True, append_images=frames[1:])
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", _fake_tesseract(["one", "two words"], []))
+
+    result = ocr.ocr_document(str(path))
+    assert (result.page, result.text, result.page_confidences) == (2, "two words", [0.7, 0.8])
+
+
+def test_pdf_pages_are_rasterized_one_at_a_time(tmp_path):
+    fitz = pytest.importorskip("fitz")
+    path = tmp_path / "packet.pdf"
+    pdf = fitz.open()
+    for _ in range(3):
+        pdf.new_page(width=200, height=100)
+    pdf.save(path)
+
+    pages = ocr.iter_pages(str(path), dpi=144)
+    first = next(pages)
+    assert (first.mode, first.size, first.info["dpi"]) == ("L", (400, 200), (144, 144))
+    assert len(list(pages)) == 2
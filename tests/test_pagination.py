@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+
+from backend.db import DriftScore, Provider, ProviderScore
+from backend.pagination import InvalidCursor, decode_cursor, encode_cursor
+from backend.routers.providers import provider_page
+
+
+def _seed(db):
+    # Ties on pcs and providers without scores exercise the id tiebreak and NULL segment.
+    pcs = [70.0, None, 55.5, 70.0, 90.0, None, 55.5, 12.0, 70.0, 33.0, None]
+    for i, value in enumerate(pcs):
+        provider = Provider(
+            external_id=f"P{i}",
+            name=f"Dr. Page {i}",
+            specialty="Cardiology" if i % 2 else "Pediatrics",
+            last_verified_at=datetime(2024, 1, 1 + i),
+        )
+        db.add(provider)
+        db.flush()
+        if value is not None:
+            db.add(ProviderScore(provider_id=provider.id, pcs=value, band="HIGH" if value >= 70 else "LOW"))
+            db.add(DriftScore(provider_id=provider.id, score=value / 100, bucket="High" if i % 3 == 0 else "Low"))
+    db.commit()
+
+
+def _walk(db, sort, limit=3, **filters):
+    items, cursor, pages = [], None, 0
+    while True:
+        page = provider_page(db, cursor=cursor, limit=limit, sort=sort, **filters)
+        items += page["items"]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+@pytest.mark.parametrize("sort,field", [("pcs", "pcs"), ("-pcs", "pcs"), ("drift", "drift_score"), ("-drift", "drift_score")])
+def test_pages_cover_every_provider_once_in_order(db_session, sort, field):
+    _seed(db_session)
+    items, pages = _walk(db_session, sort)
+
+    descending = sort.startswith("-")
+    expected = sorted(
+        items,
+        key=lambda i: (i[field] is not None, i[field] or 0, i["id"]),
+        reverse=descending,
+    )
+    assert [i["id"] for i in items] == [i["id"] for i in expected]
+    assert len(items) == db_session.query(Provider).count() == 11
+    assert pages == 4
+
+
+def test_filters_combine_with_pagination(db_session):
+    _seed(db_session)
+    items, _ = _walk(db_session, "-pcs", limit=2, pcs_band=["HIGH"], specialty="Pediatrics")
+    assert [(i["pcs"], i["specialty"]) for i in items] == [(90.0, "Pediatrics"), (70.0, "Pediatrics"), (70.0, "Pediatrics")]
+
+    items, _ = _walk(
+        db_session, "id", drift_bucket=["High"], verified_after=datetime(2024, 1, 2), verified_before=datetime(2024, 1, 10)
+    )
+    assert [i["external_id"] for i in items] == ["P3", "P6"]
+
+
+def test_cursor_is_bound_to_its_sort():
+    cursor = encode_cursor("pcs", 55.5, 7)
+    assert decode_cursor(cursor, "pcs") == (55.5, 7)
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, "-pcs")
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor", "pcs")
+
+
+def test_list_endpoint_returns_pages(api_client, file_session):
+    with file_session() as db:
+        _seed(db)
+
+    first = api_client.get("/providers", params={"limit": 5, "sort": "-pcs"}).json()
+    assert [i["pcs"] for i in first["items"]] == [90.0, 70.0, 70.0, 70.0, 55.5]
+    second = api_client.get("/providers", params={"limit": 5, "sort": "-pcs", "cursor": first["next_cursor"]}).json()
+    assert [i["pcs"] for i in second["items"]] == [55.5, 33.0, 12.0, None, None]
+
+    assert api_client.get("/providers", params={"sort": "pcs", "cursor": first["next_cursor"]}).status_code == 400
+    assert api_client.get("/providers", params={"sort": "name"}).status_code == 422
+    assert api_client.get("/providers", params={"limit": 0}).status_code == 422
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import event
+
+from backend.db import AuditLog, DriftScore, FieldConfidence, Provider, ProviderScore
+
+
+@pytest.fixture
+def provider_id(file_session):
+    with file_session() as db:
+        provider = Provider(external_id="H1", name="Dr. History")
+        db.add(provider)
+        db.flush()
+        db.add(ProviderScore(provider_id=provider.id, pcs=81.0, band="AMBER"))
+        db.add(DriftScore(provider_id=provider.id, score=0.2, bucket="Low"))
+        db.add_all(
+            AuditLog(provider_id=provider.id, field_name="phone", new_value=str(i), action="auto_update")
+            for i in range(120)
+        )
+        db.add_all(FieldConfidence(provider_id=provider.id, field_name="phone", confidence=i / 10) for i in range(7))
+        db.commit()
+        return provider.id
+
+
+def test_profile_is_one_query_and_excludes_history(api_client, file_engine, provider_id):
+    statements = []
+    event.listen(file_engine, "before_cursor_execute", lambda conn, cur, stmt, *a: statements.append(stmt))
+    body = api_client.get(f"/providers/{provider_id}").json()
+    assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+    assert body["score"]["band"] == "AMBER" and body["drift"]["bucket"] == "Low"
+    assert "audit_log" not in body
+
+
+def test_audit_and_qa_history_are_paginated_newest_first(api_client, provider_id):
+    values, cursor, pages = [], None, 0
+    while True:
+        params = {"cursor": cursor} if cursor else {}
+        page = api_client.get(f"/providers/{provider_id}/audit", params=params).json()
+        values += [item["new_value"] for item in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == 3  # default page size 50
+    assert values == [str(i) for i in reversed(range(120))]
+
+    qa = api_client.get(f"/providers/{provider_id}/qa", params={"limit": 5}).json()
+    assert [item["confidence"] for item in qa["items"]] == [0.6, 0.5, 0.4, 0.3, 0.2]
+    rest = api_client.get(f"/providers/{provider_id}/qa", params={"limit": 5, "cursor": qa["next_cursor"]}).json()
+    assert [item["confidence"] for item in rest["items"]] == [0.1, 0.0]
+    assert rest["next_cursor"] is None
+
+    assert api_client.get(f"/providers/{provider_id}/audit", params={"cursor": "bogus"}).status_code == 400
+    assert api_client.get("/providers/999999/audit").status_code == 404
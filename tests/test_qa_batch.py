@@ -0,0 +1,84 @@
+import random
+
+from backend.agents import _confidence_for_candidates, qa_evaluate, qa_evaluate_batch
+from backend.db import FieldConfidence, ManualReviewItem, Provider
+from backend.utils.normalize import normalize_value
+
+SOURCES = ["npi", "state_board", "hospital", "maps", "original", "ocr_scan"]
+
+
+def _reference_confidence(candidates, field=None):
+    # The per-call implementation the batch engine must reproduce exactly.
+    if not candidates:
+        return {"best": None, "confidence": 0.0, "sources": []}
+    scores = {"npi": 1.0, "state_board": 0.9, "hospital": 0.7, "maps": 0.5, "original": 0.3}
+    grouped = {}
+    for c in candidates:
+        key = normalize_value(field, c["value"])
+        weight = scores.get(c["source"], 0.2)
+        if key not in grouped:
+            grouped[key] = {"value": c["value"], "sources": [], "score": 0.0, "top": weight}
+        elif weight > grouped[key]["top"]:
+            grouped[key]["value"] = c["value"]
+            grouped[key]["top"] = weight
+        grouped[key]["sources"].append(c["source"])
+        grouped[key]["score"] += weight
+    best = max(grouped.values(), key=lambda x: x["score"])
+    max_possible = sum(sorted(scores.values(), reverse=True)[: len(best["sources"])] or [1.0])
+    return {"best": best["value"], "confidence": min(1.0, best["score"] / max_possible), "sources": best["sources"]}
+
+
+def test_confidence_matches_reference_exactly():
+    rng = random.Random(42)
+    values = {
+        "phone": ["555-123-4567", "(555) 123-4567", "555 999 0000", "+1 555 123 4567"],
+        "address": ["1 Main Street", "1 MAIN ST.", "2 Oak Ave"],
+        "specialty": ["Cardiology", "cardiologist", "Dermatology"],
+    }
+    for _ in range(500):
+        field = rng.choice(list(values))
+        cands = [
+            {"source": rng.choice(SOURCES), "value": rng.choice(values[field])} for _ in range(rng.randint(1, 8))
+        ]
+        assert _confidence_for_candidates(cands, field) == _reference_confidence(cands, field)
+
+
+def test_batch_matches_per_provider_results(db_session):
+    providers = [
+        Provider(external_id=f"Q{i}", name=f"Dr. Q{i}", phone="555-0000", specialty="Cardiology") for i in range(3)
+    ]
+    db_session.add_all(providers)
+    db_session.commit()
+
+    def items():
+        return [
+            (
+                p.id,
+                {
+                    "candidates": {
+                        "phone": [{"source": "npi", "value": f"555-000{i}"}, {"source": "maps", "value": f"555-000{i}"}],
+                        "specialty": [{"source": "maps", "value": "Dermatology"}, {"source": "original", "value": "Cardiology"}],
+                    }
+                },
+                {"affiliations": ["General Hospital"]} if i == 0 else {},
+            )
+            for i, p in enumerate(providers)
+        ]
+
+    single = {pid: qa_evaluate(db_session, pid, ext, enr) for pid, ext, enr in items()}
+    single_confidences = [(c.provider_id, c.field_name, c.confidence, c.sources) for c in db_session.query(FieldConfidence).order_by(FieldConfidence.id)]
+    db_session.query(FieldConfidence).delete()
+    for item in db_session.query(ManualReviewItem):
+        db_session.delete(item)
+    db_session.commit()
+
+    batched = qa_evaluate_batch(db_session, items())
+    batch_confidences = [(c.provider_id, c.field_name, c.confidence, c.sources) for c in db_session.query(FieldConfidence).order_by(FieldConfidence.id)]
+
+    assert batch_confidences == single_confidences
+    assert len(batch_confidences) == 15
+    for pid in single:
+        assert batched[pid]["auto_updates"] == single[pid]["auto_updates"]
+        assert batched[pid]["explanation_inputs"] == single[pid]["explanation_inputs"]
+        assert [m.field_name for m in batched[pid]["manual_reviews"]] == [m.field_name for m in single[pid]["manual_reviews"]]
+    assert db_session.query(ManualReviewItem).count() == 3
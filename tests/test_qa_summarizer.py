@@ -1,7 +1,9 @@
 from backend.llm.qa_summarizer import summarize_qa_decision
 
 def test_qa_summarizer_prompt_structure(mocker):
-    mocker.patch(
+    # Take the LLM path regardless of which backend or API key is configured.
+    mocker.patch("backend.llm.qa_summarizer.llm_available", return_value=True)
+    call = mocker.patch(
         "backend.llm.qa_summarizer.call_gemini",
         return_value="Chosen because multiple reliable sources agree."
     )
@@ -20,4 +22,10 @@ def test_qa_summarizer_prompt_structure(mocker):
 
     result = summarize_qa_decision(payload)
 
-    assert "Chosen because" in result
+    assert result == "Chosen because multiple reliable sources agree."
+    prompt = call.call_args.args[0]
+    assert "Field: phone" in prompt
+    assert "Current value: 123" in prompt
+    assert "{'source': 'npi', 'value': '456'}" in prompt
+    assert "Chosen value: 456" in prompt
+    assert "Decision: auto_update" in prompt
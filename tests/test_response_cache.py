@@ -0,0 +1,70 @@
+import threading
+import time
+
+from backend.llm.response_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalized_prompts_share_an_entry_per_model(tmp_path):
+    cache = ResponseCache(path=tmp_path / "llm.sqlite", ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "answer"
+
+    assert cache.get_or_compute("m1", "Field: phone\n   Candidates: [1]\n", compute) == "answer"
+    assert cache.get_or_compute("m1", "  Field:   phone\n\nCandidates: [1]", compute) == "answer"
+    assert cache.get_or_compute("m2", "Field: phone\nCandidates: [1]", compute) == "answer"
+
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_ttl_and_size_bound(tmp_path):
+    clock = Clock()
+    cache = ResponseCache(path=tmp_path / "llm.sqlite", ttl=60, max_entries=2, clock=clock)
+    for i in range(3):
+        clock.now += 1
+        cache.get_or_compute("m", f"prompt {i}", lambda i=i: f"r{i}")
+    cache.evict()
+    assert cache.stats()["entries"] == 2
+
+    clock.now += 61
+    assert cache.get_or_compute("m", "prompt 2", lambda: "fresh") == "fresh"
+
+
+def test_concurrent_identical_requests_make_one_call(tmp_path):
+    cache = ResponseCache(path=tmp_path / "llm.sqlite")
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(2)
+        return "shared"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("m", "same prompt", compute)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["shared"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
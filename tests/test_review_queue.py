@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from sqlalchemy import event
+
+from backend.db import AuditLog, ManualReviewItem, Provider
+from backend.review_queue import claim_items, decide, list_items
+from backend.search import search_providers
+from backend.stats_snapshot import get_stats_snapshot
+
+
+def _seed(db, count=30):
+    provider = Provider(external_id="R1", name="Dr. Review", phone="000")
+    db.add(provider)
+    db.flush()
+    db.add_all(
+        ManualReviewItem(provider_id=provider.id, field_name="phone", current_value="000", suggested_value=f"555-{i:04d}")
+        for i in range(count)
+    )
+    db.add(ManualReviewItem(provider_id=provider.id, field_name="phone", status="approved"))
+    db.commit()
+    return provider
+
+
+def test_claims_are_disjoint_renewable_and_expire(db_session):
+    _seed(db_session, count=8)
+    alice = [i.id for i in claim_items(db_session, "alice", 3)]
+    bob = [i.id for i in claim_items(db_session, "bob", 3)]
+    assert len(alice) == len(bob) == 3 and not set(alice) & set(bob)
+
+    # Claiming again renews the reviewer's own items first.
+    assert [i.id for i in claim_items(db_session, "alice", 3)] == alice
+
+    expired = [i.id for i in claim_items(db_session, "carol", 2, lease=timedelta(seconds=-1))]
+    assert [i.id for i in claim_items(db_session, "dave", 5)] == expired
+
+
+def test_concurrent_claims_never_overlap(file_session):
+    with file_session() as db:
+        _seed(db, count=30)
+
+    def claim(name):
+        with file_session() as db:
+            return [i.id for i in claim_items(db, name, 5)]
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        batches = list(pool.map(claim, [f"r{i}" for i in range(6)]))
+    claimed = [item_id for batch in batches for item_id in batch]
+    assert len(claimed) == len(set(claimed)) == 30
+
+
+def test_bulk_decisions_are_one_transaction_with_audit_rows(file_engine, file_session):
+    with file_session() as db:
+        provider_id = _seed(db, count=30).id
+        pending = [i.id for i in db.query(ManualReviewItem).filter_by(status="pending").order_by(ManualReviewItem.id)]
+        claim_items(db, "bob", 1)  # bob holds pending[0]
+
+    commits = []
+    event.listen(file_engine, "commit", lambda conn: commits.append(1))
+    with file_session() as db:
+        applied, skipped = decide(db, pending + [999999], "approve", reviewer="alice")
+    assert len(commits) == 1
+    assert applied == pending[1:]
+    assert skipped == [pending[0], 999999]
+
+    with file_session() as db:
+        assert db.get(Provider, provider_id).phone == "555-0029"
+        audit = db.query(AuditLog).filter_by(action="manual_approve", actor="alice").count()
+        assert audit == 29
+        assert get_stats_snapshot(db).pending_reviews == 1
+
+        again, skipped = decide(db, pending[1:3], "reject")
+        assert again == [] and skipped == pending[1:3]
+
+
+def test_queue_endpoints(api_client, file_session):
+    with file_session() as db:
+        _seed(db, count=5)
+
+    page = api_client.get("/manual-review", params={"limit": 3}).json()
+    assert [i["status"] for i in page["items"]] == ["pending"] * 3
+    rest = api_client.get("/manual-review", params={"limit": 3, "cursor": page["next_cursor"]}).json()
+    assert len(rest["items"]) == 2 and rest["next_cursor"] is None
+    assert len(api_client.get("/manual-review", params={"status": "all"}).json()["items"]) == 6
+
+    claimed = api_client.post("/manual-review/claim", params={"reviewer": "alice", "limit": 2}).json()["items"]
+    first = claimed[0]["id"]
+    assert claimed[0]["claimed_by"] == "alice"
+
+    assert api_client.post(f"/manual-review/{first}/approve", params={"reviewer": "bob"}).status_code == 409
+    assert api_client.post(f"/manual-review/{first}/approve", params={"reviewer": "alice"}).status_code == 200
+    assert api_client.post(f"/manual-review/{first}/reject", params={"reviewer": "alice"}).status_code == 409
+    assert api_client.post("/manual-review/999999/reject").status_code == 404
+
+    ids = [i["id"] for i in page["items"] + rest["items"]]
+    result = api_client.post("/manual-review/bulk/reject", json={"ids": ids, "reviewer": "bob"}).json()
+    assert result["skipped"] == [first, claimed[1]["id"]]
+    assert api_client.post("/manual-review/bulk/approve", json={"ids": []}).status_code == 422
+    assert [i["id"] for i in api_client.get("/manual-review").json()["items"]] == [claimed[1]["id"]]
+
+
+def test_approved_values_are_reindexed_for_search(db_session):
+    provider = _seed(db_session, count=0)
+    item = ManualReviewItem(
+        provider_id=provider.id, field_name="address", current_value=None, suggested_value="12 Ring Road, Nagpur"
+    )
+    db_session.add(item)
+    db_session.commit()
+    assert search_providers(db_session, "nagpur") == []
+
+    assert decide(db_session, [item.id], "approve")[0] == [item.id]
+    assert [r["provider_id"] for r in search_providers(db_session, "nagpur")] == [provider.id]
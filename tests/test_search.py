@@ -0,0 +1,134 @@
+import json
+import os
+
+import pytest
+
+from backend import search
+from backend.db import Provider, ProviderEnrichment
+from backend.external.source_store import SourceStore
+from backend.search import (
+    fts_query,
+    index_providers,
+    init_search_index,
+    rebuild_search_index,
+    refresh_directory_rows,
+    search_providers,
+)
+
+DIRECTORY = {
+    "S1": {"address": "Ruby Hall Clinic, Pune", "bio": "Pediatric cardiologist treating congenital heart disease."},
+    "S2": {"address": "Jupiter Hospital, Pune", "services": "Adult cardiology, echocardiography"},
+    "S3": {"about": "Children's clinic in Mumbai offering pediatric care."},
+}
+
+
+@pytest.fixture
+def directory(tmp_path, monkeypatch):
+    path = tmp_path / "hospital_directory.json"
+    path.write_text(json.dumps(DIRECTORY), encoding="utf-8")
+    store = SourceStore(path, index_dir=tmp_path / "index")
+    monkeypatch.setattr(search, "HOSPITAL_DIR", store)
+    return store
+
+
+def _seed(db_session):
+    providers = [
+        Provider(external_id="S1", name="Dr. Asha Kulkarni", specialty="Pediatrics", address="Koregaon Park, Pune"),
+        Provider(external_id="S2", name="Dr. Vikram Rao", specialty="Cardiology", address="Baner, Pune"),
+        Provider(external_id="S3", name="Dr. Neha Shah", specialty="Pediatrics", address="Andheri, Mumbai"),
+    ]
+    db_session.add_all(providers)
+    db_session.commit()
+    db_session.add(
+        ProviderEnrichment(provider_id=providers[2].id, fields={"summary": "Neonatal specialist", "certifications": ["PALS"]})
+    )
+    db_session.commit()
+    assert rebuild_search_index(db_session) == 3
+    return providers
+
+
+def test_ranked_search_across_profile_directory_and_enrichment(db_session, directory):
+    asha, vikram, neha = _seed(db_session)
+
+    results = search_providers(db_session, "pediatric cardiology Pune")
+    assert [r["provider_id"] for r in results] == [asha.id]
+    assert "[Pediatric]" in results[0]["snippet"] or "[Pune]" in results[0]["snippet"]
+
+    # Specialty matches outrank a passing mention in a bio.
+    assert [r["provider_id"] for r in search_providers(db_session, "cardiology")][0] == vikram.id
+    assert [r["provider_id"] for r in search_providers(db_session, "PALS")] == [neha.id]
+    assert [r["provider_id"] for r in search_providers(db_session, "kulk")] == [asha.id]
+
+
+def test_query_syntax_is_not_interpreted(db_session, directory):
+    _seed(db_session)
+    assert fts_query('cardio" OR name:* (') == '"cardio"* "or"* "name"*'
+    assert search_providers(db_session, 'NEAR("pune") -- *') == []
+    assert search_providers(db_session, "  !!  ") == []
+
+
+def test_index_providers_replaces_changed_rows(db_session, directory):
+    asha, _, _ = _seed(db_session)
+    asha.address = "Nashik Road, Nashik"
+    db_session.commit()
+
+    assert search_providers(db_session, "nashik") == []
+    assert index_providers(db_session, [asha.id]) == 1
+    db_session.commit()
+    assert [r["provider_id"] for r in search_providers(db_session, "nashik")] == [asha.id]
+    assert len(search_providers(db_session, "pediatrics")) == 2
+
+
+def test_common_terms_rank_a_bounded_candidate_set(db_session, directory, monkeypatch):
+    asha, vikram, _ = _seed(db_session)
+    assert search_providers(db_session, "cardiology")[0]["provider_id"] == vikram.id
+
+    # Two providers match; with a cap of one only the lowest id is ranked.
+    monkeypatch.setattr(search, "SEARCH_MAX_CANDIDATES", 1)
+    assert [r["provider_id"] for r in search_providers(db_session, "cardiology", limit=1)] == [asha.id]
+    # The cap never hides results from the requested page.
+    assert [r["provider_id"] for r in search_providers(db_session, "cardiology", limit=2)] == [vikram.id, asha.id]
+    assert [r["provider_id"] for r in search_providers(db_session, "cardiology", limit=1, offset=1)] == [asha.id]
+
+
+def test_search_endpoint(api_client, file_session, directory):
+    with file_session() as db:
+        asha, _, _ = _seed(db)
+        asha_name = asha.name
+
+    body = api_client.get("/search", params={"q": "pediatric pune", "limit": 5}).json()
+    assert body["query"] == "pediatric pune"
+    assert body["results"][0]["name"] == asha_name
+    assert api_client.get("/search", params={"q": ""}).status_code == 422
+
+
+def test_startup_indexes_existing_providers(file_session, directory, monkeypatch):
+    monkeypatch.setattr(search, "SessionLocal", file_session)
+    with file_session() as db:
+        db.add(Provider(external_id="S1", name="Dr. Asha Kulkarni", specialty="Pediatrics"))
+        db.commit()
+
+    init_search_index()
+    with file_session() as db:
+        assert [r["name"] for r in search_providers(db, "asha")] == ["Dr. Asha Kulkarni"]
+        db.add(Provider(external_id="S9", name="Dr. Late Arrival"))
+        db.commit()
+
+    init_search_index()
+    with file_session() as db:
+        assert [r["name"] for r in search_providers(db, "arrival")] == ["Dr. Late Arrival"]
+
+
+def test_directory_changes_are_reindexed(db_session, directory):
+    asha, vikram, _ = _seed(db_session)
+    assert refresh_directory_rows(db_session) == 0
+
+    changed = dict(DIRECTORY, S2={"bio": "Sports medicine and knee arthroscopy."})
+    directory.source_path.write_text(json.dumps(changed), encoding="utf-8")
+    os.utime(directory.source_path, ns=(1, 1))
+    directory.reload()
+
+    assert refresh_directory_rows(db_session) == 3
+    db_session.commit()
+    assert [r["provider_id"] for r in search_providers(db_session, "arthroscopy")] == [vikram.id]
+    assert [r["provider_id"] for r in search_providers(db_session, "echocardiography")] == []
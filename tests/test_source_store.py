@@ -0,0 +1,63 @@
+import json
+import os
+
+from backend.external.source_store import SourceStore, get_store, iter_json_object
+
+
+def test_iter_json_object_streams_across_chunk_boundaries(tmp_path):
+    data = {f"P{i:03d}": {"phone": f"022-{i:08d}", "rank": i * 1.5, "tags": ["a", "b"]} for i in range(200)}
+    path = tmp_path / "dir.json"
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    assert dict(iter_json_object(path, chunk_size=7)) == data
+
+
+def test_source_store_lookup_and_hot_reload(tmp_path):
+    path = tmp_path / "state_board.json"
+    path.write_text(json.dumps({"P001": {"license_no": "LIC-1"}}), encoding="utf-8")
+    store = SourceStore(path, index_dir=tmp_path / "index")
+
+    assert store.get("P001") == {"license_no": "LIC-1"}
+    assert store.get("missing", {}) == {}
+    assert len(store) == 1
+
+    path.write_text(json.dumps({"P001": {"license_no": "LIC-2"}, "P002": {}}), encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert store.reload() is True
+
+    assert store.get("P001") == {"license_no": "LIC-2"}
+    assert len(store) == 2
+    assert list(store.keys()) == ["P001", "P002"]
+    assert len(list((tmp_path / "index").glob("state_board.*.sqlite"))) == 1
+
+
+def test_reload_listeners_hear_about_swaps_only(tmp_path):
+    path = tmp_path / "hospital.json"
+    path.write_text(json.dumps({"P001": {}}), encoding="utf-8")
+    store = SourceStore(path, index_dir=tmp_path / "index")
+    swaps = []
+    store.add_reload_listener(lambda s: swaps.append(s.fingerprint))
+
+    first = store.fingerprint
+    assert store.reload() is False
+    path.write_text(json.dumps({"P001": {}, "P002": {}}), encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert store.reload() is True
+    assert swaps == [store.fingerprint] and store.fingerprint != first
+
+
+def test_vanished_index_and_source_read_as_empty(tmp_path):
+    path = tmp_path / "state_board.json"
+    path.write_text(json.dumps({"P001": {"license_no": "LIC-1"}}), encoding="utf-8")
+    store = SourceStore(path, index_dir=tmp_path / "index")
+    assert store.get("P001") == {"license_no": "LIC-1"}
+
+    path.unlink()
+    for index in (tmp_path / "index").glob("*.sqlite"):
+        index.unlink()
+    assert store._open(tmp_path / "index" / "state_board.gone.sqlite") is None
+    assert store.get("P001", {}) == {}
+
+
+def test_get_store_is_shared():
+    assert get_store("state_board.json") is get_store("state_board.json")
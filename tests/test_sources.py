@@ -0,0 +1,93 @@
+import threading
+import time
+
+from backend.agents.data_validation_agent import DataValidationAgent
+from backend.db import Provider
+from backend.external.sources import (
+    ProviderSnapshot,
+    SourceAdapter,
+    SourceFetcher,
+    register_source,
+    source_weight,
+    unregister_source,
+)
+
+SNAPSHOT = ProviderSnapshot(id=1, external_id="P001", phone="555-0001")
+
+
+def _sleeper(seconds, payload):
+    def fetch(snapshot):
+        time.sleep(seconds)
+        return payload
+
+    return fetch
+
+
+def test_sources_fan_out_in_parallel_and_keep_order():
+    fetcher = SourceFetcher(max_workers=4, deadline=2)
+    adapters = [
+        SourceAdapter(name="slow_a", fetch=_sleeper(0.3, {"phone": "a"}), weight=0.5),
+        SourceAdapter(name="inline", fetch=lambda s: {"phone": s.phone}, weight=0.5, run_inline=True),
+        SourceAdapter(name="slow_b", fetch=_sleeper(0.3, {"phone": "b"}), weight=0.5),
+    ]
+    started = time.monotonic()
+    results = fetcher.fetch_all(SNAPSHOT, adapters)
+
+    assert time.monotonic() - started < 0.55
+    assert list(results) == ["slow_a", "inline", "slow_b"]
+    assert results["inline"] == {"phone": "555-0001"}
+
+
+def test_late_and_failing_sources_contribute_nothing():
+    def boom(snapshot):
+        raise RuntimeError("registry down")
+
+    fetcher = SourceFetcher(max_workers=4, deadline=0.3)
+    results = fetcher.fetch_all(
+        SNAPSHOT,
+        [
+            SourceAdapter(name="late", fetch=_sleeper(1.0, {"phone": "late"}), weight=0.5),
+            SourceAdapter(name="own_timeout", fetch=_sleeper(1.0, {"phone": "x"}), weight=0.5, timeout=0.1),
+            SourceAdapter(name="broken", fetch=boom, weight=0.5),
+            SourceAdapter(name="fast", fetch=_sleeper(0.01, {"phone": "ok"}), weight=0.5),
+        ],
+    )
+    assert results == {"late": {}, "own_timeout": {}, "broken": {}, "fast": {"phone": "ok"}}
+
+
+def test_hedged_request_wins_over_slow_primary():
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(snapshot):
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(1.0 if first else 0.05)
+        return {"phone": "slow" if first else "hedge"}
+
+    fetcher = SourceFetcher(max_workers=4, deadline=2)
+    started = time.monotonic()
+    results = fetcher.fetch_all(SNAPSHOT, [SourceAdapter(name="npi_like", fetch=fetch, weight=1.0, hedge_after=0.1)])
+
+    assert results == {"npi_like": {"phone": "hedge"}}
+    assert time.monotonic() - started < 0.6
+    assert len(calls) == 2
+
+
+def test_registered_source_feeds_agent_candidates(db_session):
+    register_source(SourceAdapter(name="state_api", fetch=lambda s: {"phone": "555-7777"}, weight=0.85, run_inline=True))
+    try:
+        provider = Provider(external_id="NOPE", name="Dr. New", phone="555-0000")
+        db_session.add(provider)
+        db_session.commit()
+
+        agent = DataValidationAgent()
+        sources = agent._fetch_sources(provider)
+        candidates = agent._gather_candidates(provider, sources)
+
+        assert "npi" not in sources
+        assert [(c.source, c.score_hint) for c in candidates["phone"]] == [("original", 0.4), ("state_api", 0.85)]
+        assert source_weight("unknown") == 0.3
+    finally:
+        unregister_source("state_api")
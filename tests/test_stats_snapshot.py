@@ -0,0 +1,72 @@
+from backend.db import (
+    Document,
+    DriftScore,
+    ManualReviewItem,
+    Provider,
+    ProviderScore,
+    StatsSnapshot,
+    ValidationRun,
+)
+from backend.stats_snapshot import get_stats_snapshot, refresh_stats, stats_payload
+
+
+def _seed(db):
+    providers = [Provider(external_id=f"ST{i}", name=f"Dr. Stat {i}") for i in range(5)]
+    db.add_all(providers)
+    db.flush()
+    for provider, pcs, bucket in zip(providers, [40.0, 50.0, 69.9, 70.0, 95.0], ["Low", "Low", "High", "Medium", "Other"]):
+        db.add(ProviderScore(provider_id=provider.id, pcs=pcs))
+        db.add(DriftScore(provider_id=provider.id, score=0.5, bucket=bucket))
+    db.add(Document(provider_id=providers[0].id, doc_type="license", ocr_confidence=0.8))
+    db.add(Document(provider_id=providers[1].id, doc_type="license"))
+    db.add_all(
+        [ManualReviewItem(provider_id=providers[0].id, field_name="phone", status=s) for s in ("pending", "pending", "approved")]
+    )
+    for i in range(7):
+        db.add(ValidationRun(run_type="daily", count_processed=i, auto_updates=i, manual_reviews=1))
+    db.commit()
+    return providers
+
+
+def test_snapshot_aggregates_in_one_row(db_session):
+    _seed(db_session)
+    row = refresh_stats(db_session)
+    db_session.commit()
+
+    assert db_session.query(StatsSnapshot).count() == 1
+    assert row.scored_providers == 5
+    assert row.avg_pcs == (40.0 + 50.0 + 69.9 + 70.0 + 95.0) / 5
+    assert row.pcs_distribution == {"0-50": 1, "50-70": 2, "70-90": 1, "90-100": 1}
+    assert row.drift_distribution == {"Low": 2, "Medium": 1, "High": 1}
+    assert row.pending_reviews == 2
+    assert (row.document_count, row.avg_ocr_confidence) == (2, 0.4)
+    assert len(row.trend) == 5
+    assert row.latest_run["type"] == "daily"
+
+    payload = stats_payload(row)
+    assert set(payload) >= {"latest_run", "avg_pcs", "drift_distribution", "pcs_distribution", "trend"}
+
+
+def test_snapshot_is_built_on_first_read_and_served_until_refreshed(db_session):
+    assert get_stats_snapshot(db_session).scored_providers == 0
+    _seed(db_session)
+    assert get_stats_snapshot(db_session).scored_providers == 0
+
+    refresh_stats(db_session)
+    db_session.commit()
+    assert get_stats_snapshot(db_session).scored_providers == 5
+
+
+def test_manual_review_action_refreshes_pending_count(api_client, file_session):
+    with file_session() as db:
+        _seed(db)
+        refresh_stats(db)
+        db.commit()
+        item_id = db.query(ManualReviewItem).filter_by(status="pending").first().id
+
+    assert api_client.get("/stats").json()["pending_reviews"] == 2
+    assert api_client.post(f"/manual-review/{item_id}/reject").status_code == 200
+    stats = api_client.get("/stats").json()
+    assert stats["pending_reviews"] == 1
+    assert stats["drift_distribution"] == {"Low": 2, "Medium": 1, "High": 1}
+    assert api_client.get("/reports/latest").headers["content-type"] == "application/pdf"